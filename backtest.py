@@ -0,0 +1,239 @@
+import argparse
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from chok_generator import FREQUENCY_SETTINGS, generate_dataset_values
+from random_state import DEFAULT_SEED
+
+# Ряды для ARIMA - как в financial_dataset_monthly_VAR_Arima.xlsx
+ARIMA_COLUMNS = ('Материалы', 'Готовая продукция', 'Запасы', 'ЧОК')
+# Для VAR 'Запасы' исключены: это сумма Материалов и Готовой продукции,
+# и система с ними вырождена
+VAR_COLUMNS = ('Материалы', 'Готовая продукция', 'ЧОК')
+
+
+def _require_statsmodels(model):
+    try:
+        import statsmodels  # noqa: F401
+    except ImportError:
+        raise ImportError(f"Для модели '{model}' установите пакет: pip install statsmodels")
+
+
+def rolling_origins(n_obs, initial, step=1):
+    """
+    Точки начала прогноза: число наблюдений, известных к моменту прогноза
+
+    Первая точка - initial, далее с шагом step, пока есть хотя бы одно
+    фактическое значение для сравнения.
+    """
+    return np.arange(initial, n_obs, step)
+
+
+def _forecast_naive(values, origins, horizon, options):
+    """Прогноз последним известным значением (без обучения)"""
+    forecasts = np.repeat(values[origins - 1][:, None, :], horizon, axis=1)
+    return forecasts, 0
+
+
+def _forecast_arima(values, origins, horizon, options):
+    """
+    ARIMA по каждому ряду
+
+    Модель оценивается заново раз в refit_every точек; между переоценками
+    состояние фильтра дополняется новыми наблюдениями (results.append) с
+    прежними параметрами - это во много раз дешевле полной оценки.
+    """
+    _require_statsmodels('arima')
+    from statsmodels.tsa.arima.model import ARIMA
+
+    order = options.get('order', (1, 1, 1))
+    trend = options.get('trend', 't')
+    seasonal_order = options.get('seasonal_order', (0, 0, 0, 0))
+    refit_every = options.get('refit_every', 12)
+
+    forecasts = np.empty((len(origins), horizon, values.shape[1]))
+    fits = 0
+    for j in range(values.shape[1]):
+        series = values[:, j]
+        results = fitted_at = previous = None
+        for i, origin in enumerate(origins):
+            if results is None or origin - fitted_at >= refit_every:
+                results = ARIMA(series[:origin], order=order, trend=trend, seasonal_order=seasonal_order).fit()
+                fitted_at = origin
+                fits += 1
+            else:
+                results = results.append(series[previous:origin])
+            previous = origin
+            forecasts[i, :, j] = results.forecast(horizon)
+    return forecasts, fits
+
+
+def _forecast_var(values, origins, horizon, options):
+    """
+    VAR по всем рядам вместе (по умолчанию - на первых разностях)
+
+    Коэффициенты переоцениваются раз в refit_every точек; в остальных
+    точках прогноз строится с прежними коэффициентами от новых наблюдений.
+    """
+    _require_statsmodels('var')
+    from statsmodels.tsa.api import VAR
+
+    lags = options.get('lags', 2)
+    trend = options.get('trend', 'c')
+    difference = options.get('difference', True)
+    refit_every = options.get('refit_every', 12)
+
+    data = np.diff(values, axis=0) if difference else values
+    shift = 1 if difference else 0
+    forecasts = np.empty((len(origins), horizon, values.shape[1]))
+    results = fitted_at = None
+    fits = 0
+    for i, origin in enumerate(origins):
+        end = origin - shift
+        if results is None or origin - fitted_at >= refit_every:
+            results = VAR(data[:end]).fit(lags, trend=trend)
+            fitted_at = origin
+            fits += 1
+        forecast = results.forecast(data[end - results.k_ar:end], horizon)
+        forecasts[i] = values[origin - 1] + np.cumsum(forecast, axis=0) if difference else forecast
+    return forecasts, fits
+
+
+# Модели: имя -> функция (values, origins, horizon, options) -> (прогнозы, число оценок)
+MODELS = {
+    'naive': _forecast_naive,
+    'arima': _forecast_arima,
+    'var': _forecast_var,
+}
+
+
+def forecast_errors(values, origins, forecasts):
+    """
+    Ошибки прогнозов по горизонтам одной векторной операцией
+
+    Фактические значения для всех точек и горизонтов выбираются индексом
+    (n_origins, horizon); горизонты за пределами данных не учитываются.
+    Возвращает (mae, mape), каждый - массив (horizon, n_series); MAPE в процентах.
+    """
+    horizon = forecasts.shape[1]
+    index = origins[:, None] + np.arange(horizon)
+    valid = index < len(values)
+    actual = values[np.minimum(index, len(values) - 1)]
+    error = np.where(valid[:, :, None], np.abs(forecasts - actual), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent = error / np.abs(actual) * 100
+    with warnings.catch_warnings():
+        # Горизонт без фактических значений дает пустое среднее
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmean(error, axis=0), np.nanmean(percent, axis=0)
+
+
+def backtest(values, columns=None, model='arima', horizon=12, initial=60, step=1, **options):
+    """
+    Бэктест с расширяющимся окном (rolling origin) для одного набора
+
+    Параметры:
+    - values: DataFrame generate_dataset или массив (n_dates, n_series)
+    - columns: ряды (по умолчанию ARIMA_COLUMNS для ARIMA, VAR_COLUMNS для VAR)
+    - model: модель из MODELS ('naive', 'arima', 'var')
+    - horizon: горизонт прогноза
+    - initial: длина первого обучающего окна
+    - step: шаг между точками начала прогноза
+    - options: параметры модели (order, trend, seasonal_order, lags,
+      difference, refit_every)
+
+    Возвращает словарь: origins, forecasts (n_origins, horizon, n_series),
+    mae и mape (horizon, n_series), columns, fits, seconds.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Неизвестная модель: {model}. Допустимые значения: {tuple(MODELS)}")
+    if hasattr(values, 'columns'):
+        columns = list(columns or (VAR_COLUMNS if model == 'var' else ARIMA_COLUMNS))
+        values = values[columns].to_numpy(dtype=float)
+    values = np.asarray(values, dtype=float)
+
+    start = time.perf_counter()
+    origins = rolling_origins(len(values), initial, step)
+    with warnings.catch_warnings():
+        # Предупреждения statsmodels о сходимости на коротких окнах
+        warnings.simplefilter('ignore')
+        forecasts, fits = MODELS[model](values, origins, horizon, options)
+    mae, mape = forecast_errors(values, origins, forecasts)
+    return {'origins': origins, 'forecasts': forecasts, 'mae': mae, 'mape': mape, 'columns': columns,
+            'fits': fits, 'seconds': time.perf_counter() - start}
+
+
+def _backtest_scenario(task):
+    """Генерирует сценарий и выполняет бэктест в процессе-исполнителе"""
+    index, seed_sequence, params, model, columns, options = task
+    values, all_columns, _ = generate_dataset_values(seed=seed_sequence, **params)
+    columns = list(columns or (VAR_COLUMNS if model == 'var' else ARIMA_COLUMNS))
+    selected = values[:, [all_columns.index(column) for column in columns]]
+    result = backtest(selected, model=model, **options)
+    return index, result['mae'], result['mape'], result['fits'], columns
+
+
+def backtest_scenarios(count, model='arima', seed=DEFAULT_SEED, n_workers=None, columns=None,
+                       horizon=12, initial=60, step=1, dataset_params=None, **options):
+    """
+    Бэктест на множестве синтетических сценариев в пуле процессов
+
+    Каждый сценарий генерируется в исполнителе из собственного потока
+    SeedSequence(seed).spawn(count), поэтому результат воспроизводим.
+
+    Возвращает словарь: mae и mape (count, horizon, n_series), columns,
+    fits (общее число оценок моделей), seconds, fits_per_second.
+    """
+    if count < 1:
+        raise ValueError(f"Количество сценариев должно быть положительным: {count}")
+    dataset_params = dict({'freq': 'M'}, **(dataset_params or {}))
+    options = dict(options, horizon=horizon, initial=initial, step=step)
+    seed_sequences = np.random.SeedSequence(seed).spawn(count)
+    tasks = [(i, seed_sequences[i], dataset_params, model, columns, options) for i in range(count)]
+
+    start = time.perf_counter()
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        results = list(map(_backtest_scenario, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(_backtest_scenario, tasks, chunksize=max(1, count // (n_workers * 4))))
+    elapsed = time.perf_counter() - start
+
+    fits = sum(result[3] for result in results)
+    return {
+        'mae': np.stack([result[1] for result in results]),
+        'mape': np.stack([result[2] for result in results]),
+        'columns': results[0][4] if results else columns,
+        'fits': fits,
+        'seconds': elapsed,
+        'fits_per_second': fits / elapsed if elapsed else float('inf'),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бэктест ARIMA/VAR на синтетических наборах ЧОК")
+    parser.add_argument('--model', choices=tuple(MODELS), default='arima', help="модель")
+    parser.add_argument('--count', type=int, default=20, help="количество сценариев")
+    parser.add_argument('--freq', choices=tuple(FREQUENCY_SETTINGS), default='M', help="частота индекса")
+    parser.add_argument('--horizon', type=int, default=12, help="горизонт прогноза")
+    parser.add_argument('--initial', type=int, default=60, help="длина первого обучающего окна")
+    parser.add_argument('--step', type=int, default=1, help="шаг точек начала прогноза")
+    parser.add_argument('--refit-every', type=int, default=12, help="переоценка модели раз в N точек")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="корневое зерно")
+    parser.add_argument('--workers', type=int, default=None, help="количество процессов")
+    args = parser.parse_args()
+
+    result = backtest_scenarios(args.count, args.model, seed=args.seed, n_workers=args.workers,
+                                horizon=args.horizon, initial=args.initial, step=args.step,
+                                refit_every=args.refit_every, dataset_params={'freq': args.freq})
+    print(f"Сценариев: {args.count}, оценок моделей: {result['fits']}, время: {result['seconds']:.2f} с "
+          f"({result['fits_per_second']:.1f} оценок/с)")
+    print(f"\n{'Горизонт':>8} " + ' '.join(f"{column[:18]:>20}" for column in result['columns']))
+    mape = np.nanmean(result['mape'], axis=0)
+    for h in range(mape.shape[0]):
+        print(f"{h + 1:>8} " + ' '.join(f"{value:>19.2f}%" for value in mape[h]))
@@ -0,0 +1,98 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chok_generator import FREQUENCY_SETTINGS, generate_dataset
+from excel_export import EXCEL_MAX_ROWS, write_workbook
+from long_format import build_long_format
+from output_sinks import DEFAULT_OUTPUT_DIR
+from random_state import DEFAULT_SEED
+
+
+def _export_job(task):
+    """
+    Пишет одну книгу в процессе-исполнителе
+
+    Задание содержит либо готовую таблицу, либо параметры generate_dataset -
+    тогда набор генерируется в исполнителе и не передается между процессами.
+    """
+    name, source, freq, file_path, engine, max_rows = task
+    start = time.perf_counter()
+    if isinstance(source, dict):
+        df = generate_dataset(**source)
+        freq = source.get('freq', 'D')
+    else:
+        df = source
+    settings = FREQUENCY_SETTINGS[freq]
+    df_long = build_long_format(df)
+    write_workbook(df, file_path, sheet_name=settings['sheet_name'], date_format=settings['date_format'],
+                   engine=engine, df_long=df_long, max_rows=max_rows)
+    return {'name': name, 'file': file_path, 'rows': len(df) + len(df_long),
+            'seconds': time.perf_counter() - start}
+
+
+def export_workbooks(jobs, output_dir=None, engine='openpyxl', n_workers=None, max_rows=EXCEL_MAX_ROWS, freq='D'):
+    """
+    Записывает много книг Excel параллельно в пуле процессов
+
+    Запись openpyxl упирается в GIL, поэтому книги пишутся отдельными
+    процессами. Каждая книга содержит широкий лист и длинный лист
+    (Дата, Статья, Контрагент, Сумма); листы длиннее max_rows делятся на
+    несколько листов.
+
+    Параметры:
+    - jobs: словарь {имя файла без расширения: таблица или словарь
+      параметров generate_dataset}; параметры выгоднее таблиц - набор
+      генерируется в исполнителе без передачи между процессами
+    - output_dir: каталог вывода (по умолчанию DEFAULT_OUTPUT_DIR)
+    - engine: движок записи из excel_export.ENGINES
+    - n_workers: число процессов (по умолчанию os.cpu_count())
+    - max_rows: предельное число строк листа (None - не делить)
+    - freq: частота готовых таблиц - имя листа и формат дат берутся из
+      FREQUENCY_SETTINGS (для параметров generate_dataset - из их freq)
+
+    Возвращает (список результатов по книгам {name, file, rows, seconds},
+    общую скорость в строках в секунду).
+    """
+    output_dir = DEFAULT_OUTPUT_DIR if output_dir is None else output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(name, source, freq, os.path.join(output_dir, name + '.xlsx'), engine, max_rows)
+             for name, source in jobs.items()]
+
+    start = time.perf_counter()
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or len(tasks) <= 1:
+        results = [_export_job(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as executor:
+            results = list(executor.map(_export_job, tasks))
+    elapsed = time.perf_counter() - start
+    rows = sum(result['rows'] for result in results)
+    return results, rows / elapsed if elapsed else float('inf')
+
+
+def export_panel(panel, output_dir=None, prefix='financial_dataset_', **options):
+    """Пишет по книге на каждое юрлицо панели (panel.Panel) через export_workbooks"""
+    jobs = {f"{prefix}{i + 1:03d}": panel.entity_frame(i) for i in range(panel.n_entities)}
+    return export_workbooks(jobs, output_dir, freq=panel.freq, **options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Параллельная запись книг Excel для многих наборов ЧОК")
+    parser.add_argument('--count', type=int, default=8, help="количество книг (наборов с разными зернами)")
+    parser.add_argument('--freq', choices=tuple(FREQUENCY_SETTINGS), default='M', help="частота индекса")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="зерно первого набора")
+    parser.add_argument('--engine', default='openpyxl', help="движок записи Excel")
+    parser.add_argument('--workers', type=int, default=None, help="количество процессов")
+    parser.add_argument('--max-rows', type=int, default=EXCEL_MAX_ROWS, help="предельное число строк листа")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help="каталог вывода")
+    args = parser.parse_args()
+
+    jobs = {f"financial_dataset_{args.freq}_{i + 1:03d}": {'freq': args.freq, 'seed': args.seed + i}
+            for i in range(args.count)}
+    results, rows_per_second = export_workbooks(jobs, args.output_dir, engine=args.engine,
+                                                n_workers=args.workers, max_rows=args.max_rows)
+    for result in results:
+        print(f"{result['file']}: {result['rows']} строк, {result['seconds']:.2f} с")
+    print(f"Книг: {len(results)}, строк: {sum(r['rows'] for r in results)}, скорость: {rows_per_second:,.0f} строк/с")
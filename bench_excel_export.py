@@ -0,0 +1,57 @@
+import argparse
+import os
+import tempfile
+import time
+
+from excel_export import ENGINES, write_workbook
+from long_format import build_long_format
+
+
+def benchmark_engines(df, engines=ENGINES, repeat=1, sheet_name='Данные ЧОК', date_format='dd.mm.yyyy'):
+    """
+    Замеряет время записи одной и той же книги разными движками
+
+    Возвращает словарь {движок: лучшее время в секундах}. Недоступные
+    движки (не установлен пакет) пропускаются с сообщением.
+    """
+    df_long = build_long_format(df)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for engine in engines:
+            file_path = os.path.join(tmp_dir, f"bench_{engine}.xlsx")
+            timings = []
+            try:
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    write_workbook(df, file_path, sheet_name=sheet_name, date_format=date_format,
+                                   engine=engine, df_long=df_long)
+                    timings.append(time.perf_counter() - start)
+            except ImportError as e:
+                print(f"{engine}: пропущен ({e})")
+                continue
+            results[engine] = min(timings)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение движков экспорта в Excel")
+    parser.add_argument('--monthly', action='store_true', help="использовать помесячный набор (dataset2.py)")
+    parser.add_argument('--repeat', type=int, default=1, help="количество повторов для каждого движка")
+    args = parser.parse_args()
+
+    if args.monthly:
+        import dataset2 as dataset
+        sheet_name, date_format = 'Данные ЧОК помесячно', 'mm.yyyy'
+    else:
+        import dataset
+        sheet_name, date_format = 'Данные ЧОК', 'dd.mm.yyyy'
+
+    print("Генерация набора данных...")
+    df = dataset.generate_dataset()
+    print(f"Строк: {len(df)}, столбцов: {len(df.columns)}, строк в длинной таблице: {len(df) * (len(df.columns) - 1)}")
+
+    results = benchmark_engines(df, repeat=args.repeat, sheet_name=sheet_name, date_format=date_format)
+    baseline = results.get('openpyxl')
+    for engine, seconds in results.items():
+        speedup = f" (x{baseline / seconds:.1f})" if baseline else ""
+        print(f"{engine:>10}: {seconds:.2f} с{speedup}")
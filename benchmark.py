@@ -0,0 +1,220 @@
+import argparse
+import datetime as dt
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from working_calendar import WorkingDayCalendar
+from series_engine import generate_series
+from random_state import DEFAULT_SEED, spawn_generators
+from counterparties import DEBTOR_NAMES, CREDITOR_NAMES, random_weights, counterparty_matrix
+from chok_generator import (DEFAULT_SERIES_SPEC, DEFAULT_START_DATE, FREQUENCY_SETTINGS, SERIES_ORDER,
+                            assemble_values, generate_dataset, make_date_index)
+from date_index import build_date_index
+from long_format import build_long_format
+
+# Этапы в порядке конвейера dataset.py / dataset2.py
+STAGES = ('calendar', 'date_index', 'series', 'counterparties', 'totals', 'generate_dataset',
+          'long_format', 'export_xlsx', 'export_parquet')
+
+# Замедление относительно эталона, считающееся регрессией, и минимальная
+# абсолютная разница (короткие этапы слишком шумные)
+DEFAULT_THRESHOLD = 1.25
+MIN_DELTA_SECONDS = 0.01
+
+
+def _names(default, count, label):
+    if count is None or count == len(default):
+        return list(default)
+    return [f"{label} {i + 1}" for i in range(count)]
+
+
+def build_stages(freq='D', years=10, counterparties=None, engine='openpyxl', seed=DEFAULT_SEED, tmp_dir=None):
+    """
+    Готовит замеряемые функции этапов для одного варианта входных данных
+
+    Входы каждого этапа вычисляются заранее, поэтому замер этапа не
+    включает предыдущие этапы. Возвращает словарь {этап: функция без
+    аргументов}; этапы экспорта пропускаются, если не задан tmp_dir.
+    """
+    start_date = DEFAULT_START_DATE
+    end_date = dt.date(start_date.year + years - 1, 12, 31)
+    settings = FREQUENCY_SETTINGS[freq]
+    debtor_names = _names(DEBTOR_NAMES, counterparties, 'Дебитор')
+    creditor_names = _names(CREDITOR_NAMES, counterparties, 'Кредитор')
+
+    dates = make_date_index(freq, start_date, end_date)
+    params = {key: [DEFAULT_SERIES_SPEC[name][key] for name in SERIES_ORDER]
+              for key in ('base_value', 'trend_factor', 'seasonal_amplitude', 'noise_level')}
+
+    def series():
+        return generate_series(dates, freq=freq, seed=spawn_generators(seed, len(SERIES_ORDER)), **params)
+
+    materials, finished_goods, total_receivables, total_payables = series()
+
+    debtor_rng, creditor_rng = spawn_generators(seed, 2)
+    debtor_weights = random_weights(len(debtor_names), seed=debtor_rng)
+    creditor_weights = random_weights(len(creditor_names), seed=creditor_rng)
+
+    def blocks():
+        # Как в DatasetGenerator.generate_values: матрицы без DataFrame
+        return (counterparty_matrix(total_receivables, debtor_weights, settings['debtor_period']),
+                counterparty_matrix(total_payables, creditor_weights, settings['creditor_period']))
+
+    debtors, creditors = blocks()
+
+    def dataset():
+        return generate_dataset(freq, start_date, end_date, debtor_names=debtor_names,
+                                creditor_names=creditor_names, seed=seed)
+
+    stages = {
+        'calendar': lambda: WorkingDayCalendar().working_days(start_date, end_date),
+        # Без кэша make_date_index: иначе замеряется попадание в кэш
+        'date_index': lambda: build_date_index(freq, start_date, end_date),
+        'series': series,
+        'counterparties': blocks,
+        'totals': lambda: assemble_values(materials, finished_goods, debtors, creditors),
+        'generate_dataset': dataset,
+    }
+    df = dataset()
+    stages['long_format'] = lambda: build_long_format(df)
+
+    if tmp_dir is not None:
+        from excel_export import write_workbook
+        from output_sinks import export_dataset
+        df_long = build_long_format(df)
+        stages['export_xlsx'] = lambda: write_workbook(
+            df, os.path.join(tmp_dir, 'bench.xlsx'), sheet_name=settings['sheet_name'],
+            date_format=settings['date_format'], engine=engine, df_long=df_long)
+        stages['export_parquet'] = lambda: export_dataset(df, 'bench', output_dir=tmp_dir, formats=('parquet',))
+    return stages
+
+
+def measure(func, repeat=3, memory=True):
+    """
+    Лучшее из repeat времен выполнения и пиковая память (МБ по tracemalloc)
+
+    Память замеряется отдельным запуском: трассировка заметно замедляет код.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    result = {'seconds': min(timings), 'mean_seconds': float(np.mean(timings))}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(freqs=('D', 'M'), years=(10,), counterparties=(None,), stages=STAGES, engine='openpyxl',
+                   repeat=3, memory=True, verbose=True):
+    """
+    Замеряет этапы для всех сочетаний частоты, числа лет и числа контрагентов
+
+    Возвращает словарь с описанием окружения и списком результатов
+    {case, stage, seconds, mean_seconds, peak_mb}.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        export = any(stage.startswith('export') for stage in stages)
+        for freq, n_years, n_counterparties in itertools.product(freqs, years, counterparties):
+            case = {'freq': freq, 'years': n_years, 'counterparties': n_counterparties or len(DEBTOR_NAMES)}
+            available = build_stages(freq, n_years, n_counterparties, engine, tmp_dir=tmp_dir if export else None)
+            for stage in stages:
+                try:
+                    result = dict(case=case, stage=stage, **measure(available[stage], repeat, memory))
+                except ImportError as e:
+                    if verbose:
+                        print(f"{stage}: пропущен ({e})")
+                    continue
+                results.append(result)
+                if verbose:
+                    print(format_result(result))
+    return {
+        'created': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'engine': engine,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def _case_label(case):
+    return f"{case['freq']} {case['years']} л. {case['counterparties']} контр."
+
+
+def format_result(result):
+    memory = f", пик {result['peak_mb']:.1f} МБ" if 'peak_mb' in result else ""
+    return f"{_case_label(result['case']):<22} {result['stage']:<17} {result['seconds']:8.3f} с{memory}"
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Сравнивает результаты с эталонным отчетом
+
+    Возвращает список регрессий (case, stage, seconds, baseline, ratio):
+    этапы, которые стали медленнее в threshold раз и больше чем на
+    MIN_DELTA_SECONDS.
+    """
+    reference = {(json.dumps(r['case'], sort_keys=True), r['stage']): r['seconds'] for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        base = reference.get((json.dumps(result['case'], sort_keys=True), result['stage']))
+        if base is None:
+            continue
+        seconds = result['seconds']
+        if seconds > base * threshold and seconds - base > MIN_DELTA_SECONDS:
+            regressions.append({'case': result['case'], 'stage': result['stage'], 'seconds': seconds,
+                                'baseline': base, 'ratio': seconds / base})
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Замеры времени и памяти этапов генерации и экспорта ЧОК")
+    parser.add_argument('--freqs', nargs='+', choices=tuple(FREQUENCY_SETTINGS), default=['D', 'M'],
+                        help="частоты (D - dataset.py, M - dataset2.py)")
+    parser.add_argument('--years', nargs='+', type=int, default=[10], help="длины периода в годах")
+    parser.add_argument('--counterparties', nargs='+', type=int, default=[None],
+                        help="число дебиторов и кредиторов (по умолчанию - стандартные списки)")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help="замеряемые этапы")
+    parser.add_argument('--engine', default='openpyxl', help="движок записи Excel")
+    parser.add_argument('--repeat', type=int, default=3, help="количество повторов")
+    parser.add_argument('--no-memory', action='store_true', help="не замерять пиковую память")
+    parser.add_argument('--output', default=None, help="файл JSON для результатов")
+    parser.add_argument('--compare', default=None, help="эталонный файл JSON для поиска регрессий")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="допустимое замедление, раз")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.freqs, args.years, args.counterparties, args.stages, args.engine,
+                            args.repeat, not args.no_memory)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Результаты записаны: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"РЕГРЕССИЯ {_case_label(r['case'])} {r['stage']}: {r['seconds']:.3f} с "
+                  f"против {r['baseline']:.3f} с (x{r['ratio']:.2f})")
+        if regressions:
+            sys.exit(1)
+        print("Регрессий нет")
@@ -1,31 +1,47 @@
-import pandas as pd
+import argparse
 import os
 
-def check_excel_columns():
+from excel_loader import REQUIRED_COLUMNS, check_directory, check_file, print_report
+
+# Каталог с книгами по умолчанию - как output_sinks.DEFAULT_OUTPUT_DIR
+# (модуль не импортируется: он загружает pandas)
+DEFAULT_DIR = os.environ.get('CHOK_OUTPUT_DIR', r"C:\OrangeDM_book_TS")
+
+def check_excel_columns(file_path=None, all_sheets=False):
     """Проверяет наличие столбцов 'ЧОК' и 'Запасы' в Excel-файле"""
-    file_path = os.path.join(r"C:\OrangeDM_book_TS", "financial_dataset.xlsx")
+    if file_path is None:
+        file_path = os.path.join(DEFAULT_DIR, "financial_dataset.xlsx")
     
     if not os.path.exists(file_path):
         print(f"Файл {file_path} не найден!")
         return
     
     print(f"Чтение файла {file_path}...")
-    df = pd.read_excel(file_path)
-    
-    print(f"\nСписок всех столбцов в Excel-файле:")
-    for i, col in enumerate(df.columns, 1):
-        print(f"{i}. {col}")
-    
-    print("\nПроверка наличия нужных столбцов:")
-    if 'Запасы' in df.columns:
-        print(f"Столбец 'Запасы' найден. Первые 5 значений: {df['Запасы'].head().tolist()}")
-    else:
-        print("Столбец 'Запасы' НЕ найден!")
-    
-    if 'ЧОК' in df.columns:
-        print(f"Столбец 'ЧОК' найден. Первые 5 значений: {df['ЧОК'].head().tolist()}")
-    else:
-        print("Столбец 'ЧОК' НЕ найден!")
+    # Читаются только заголовок и первые строки, а не весь лист
+    result = check_file(file_path, REQUIRED_COLUMNS, all_sheets=all_sheets)
+    print_report(result, list_columns=True)
+    return result
+
+def check_excel_directory(directory=DEFAULT_DIR, pattern='financial_dataset*.xlsx', all_sheets=False, max_workers=None):
+    """Проверяет все книги financial_dataset*.xlsx в каталоге параллельно"""
+    results = check_directory(directory, pattern, REQUIRED_COLUMNS, all_sheets=all_sheets, max_workers=max_workers)
+    if not results:
+        print(f"В каталоге {directory} нет файлов {pattern}")
+    for result in results:
+        print_report(result)
+    if results:
+        print(f"\nПроверено файлов: {len(results)}, суммарное время чтения: {sum(r['seconds'] for r in results):.3f} с")
+    return results
 
 if __name__ == "__main__":
-    check_excel_columns()
+    parser = argparse.ArgumentParser(description="Проверка столбцов 'Запасы' и 'ЧОК' в книгах Excel")
+    parser.add_argument('path', nargs='?', default=None, help="файл .xlsx или каталог (по умолчанию financial_dataset.xlsx)")
+    parser.add_argument('--pattern', default='financial_dataset*.xlsx', help="шаблон имен файлов для каталога")
+    parser.add_argument('--all-sheets', action='store_true', help="проверять все листы")
+    parser.add_argument('--workers', type=int, default=None, help="количество процессов для каталога")
+    args = parser.parse_args()
+    
+    if args.path is not None and os.path.isdir(args.path):
+        check_excel_directory(args.path, args.pattern, args.all_sheets, args.workers)
+    else:
+        check_excel_columns(args.path, args.all_sheets)
@@ -0,0 +1,184 @@
+import argparse
+import datetime as dt
+import importlib
+import os
+import sys
+import time
+
+_STARTED = time.perf_counter()
+
+# Модули генератора (pandas, openpyxl) импортируются только в обработчике
+# выбранной команды, поэтому разбор аргументов и --help не платят за их
+# загрузку; series_engine (только numpy) нужен для списка частот
+from series_engine import FREQUENCIES  # noqa: E402
+
+_IMPORT_SECONDS = {}
+
+
+def _lazy(name):
+    """Импортирует модуль при первом обращении и запоминает время импорта"""
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        _IMPORT_SECONDS[name] = time.perf_counter() - start
+    return module
+
+
+def _print_paths(paths):
+    for files in paths.values():
+        for file_path in files:
+            print(f"Данные успешно экспортированы в файл: {file_path}")
+
+
+def cmd_generate(args):
+    """Генерирует набор данных и записывает его во всех форматах"""
+    chok_generator = _lazy('chok_generator')
+    settings = chok_generator.FREQUENCY_SETTINGS[args.freq]
+    # Умолчания берутся из модулей генератора, чтобы не дублировать их здесь
+    random_state = _lazy('random_state')
+    params = dict(
+        freq=args.freq,
+        start_date=args.start or chok_generator.DEFAULT_START_DATE,
+        end_date=args.end or chok_generator.DEFAULT_END_DATE,
+        debtor_names=chok_generator.read_names(args.debtors_file) if args.debtors_file else None,
+        creditor_names=chok_generator.read_names(args.creditors_file) if args.creditors_file else None,
+        seed=random_state.DEFAULT_SEED if args.seed is None else args.seed
+    )
+    name = args.name or settings['filename']
+    if args.no_cache:
+        output_sinks = _lazy('output_sinks')
+        df = chok_generator.generate_dataset(**params)
+        print(f"Строк: {len(df)}, столбцов: {len(df.columns)}")
+        paths = output_sinks.export_dataset(df, name, args.output_dir, args.formats, sheet_name=settings['sheet_name'],
+                                            date_format=settings['date_format'], engine=args.engine)
+    else:
+        dataset_cache = _lazy('dataset_cache')
+        paths = dataset_cache.cached_export_dataset(name, args.output_dir, args.formats,
+                                                    cache=dataset_cache.DatasetCache(args.cache_dir),
+                                                    engine=args.engine, **params)
+    _print_paths(paths)
+    return 0
+
+
+def cmd_export(args):
+    """Перезаписывает готовые наборы (.xlsx, .parquet, .feather) в других форматах"""
+    if args.name and len(args.paths) > 1:
+        raise SystemExit("--name можно задать только для одного файла")
+    chok_validator = _lazy('chok_validator')
+    output_sinks = _lazy('output_sinks')
+    chok_generator = _lazy('chok_generator')
+    date_index = _lazy('date_index')
+    for path in args.paths:
+        df, _ = chok_validator.load_dataset(path)
+        # Частота определяется так же, как в check (chok_validator)
+        settings = chok_generator.FREQUENCY_SETTINGS[args.freq or date_index.infer_freq(df['Дата'])]
+        name = args.name or os.path.splitext(os.path.basename(path))[0]
+        paths = output_sinks.export_dataset(df, name, args.output_dir, args.formats, sheet_name=settings['sheet_name'],
+                                            date_format=settings['date_format'], engine=args.engine)
+        _print_paths(paths)
+    return 0
+
+
+def cmd_check(args):
+    """Проверяет наборы: инварианты ЧОК или (--columns-only) только заголовки книг"""
+    failed = False
+    if args.columns_only:
+        # Только заголовок и первые строки книги: openpyxl без pandas
+        excel_loader = _lazy('excel_loader')
+        for path in args.paths:
+            result = excel_loader.check_file(path, all_sheets=args.all_sheets)
+            excel_loader.print_report(result)
+            failed = failed or bool(result['error']) or any(info['missing'] for info in result['sheets'].values())
+        return 1 if failed else 0
+
+    chok_validator = _lazy('chok_validator')
+    tolerance = chok_validator.DEFAULT_TOLERANCE if args.tolerance is None else args.tolerance
+    for path in args.paths:
+        start = time.perf_counter()
+        df, df_long = chok_validator.load_dataset(path)
+        loaded = time.perf_counter()
+        issues = chok_validator.validate_dataset(df, df_long, tolerance, args.freq)
+        print(f"\n{path}: строк {len(df)}, длинная таблица: {'нет' if df_long is None else len(df_long)} "
+              f"(чтение {loaded - start:.2f} с, проверка {time.perf_counter() - loaded:.2f} с)")
+        chok_validator.print_issues(issues)
+        failed = failed or bool(issues)
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Генерация, экспорт и проверка наборов данных ЧОК")
+    parser.add_argument('--timing', action='store_true', help="вывести время импорта модулей и выполнения (stderr)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="сгенерировать набор данных")
+    generate.add_argument('--freq', choices=FREQUENCIES, default='D', help="частота индекса")
+    generate.add_argument('--start', type=dt.date.fromisoformat, default=None,
+                          help="начало периода (ГГГГ-ММ-ДД, по умолчанию 2015-01-01)")
+    generate.add_argument('--end', type=dt.date.fromisoformat, default=None,
+                          help="конец периода (ГГГГ-ММ-ДД, по умолчанию 2024-12-31)")
+    generate.add_argument('--debtors-file', help="файл со списком дебиторов")
+    generate.add_argument('--creditors-file', help="файл со списком кредиторов")
+    generate.add_argument('--seed', type=int, default=None, help="зерно генератора (по умолчанию DEFAULT_SEED)")
+    generate.add_argument('--name', help="имя файла без расширения")
+    generate.add_argument('--cache-dir', default=None, help="каталог кэша наборов данных")
+    generate.add_argument('--no-cache', action='store_true', help="не использовать кэш")
+    generate.set_defaults(handler=cmd_generate)
+
+    export = commands.add_parser('export', help="записать готовые наборы в других форматах")
+    export.add_argument('paths', nargs='+', help="файлы .xlsx, .parquet или .feather (широкая таблица)")
+    export.add_argument('--freq', choices=FREQUENCIES, default=None, help="частота (по умолчанию определяется)")
+    export.add_argument('--name', help="имя файла без расширения (по умолчанию как у исходного)")
+    export.set_defaults(handler=cmd_export)
+
+    for command in (generate, export):
+        command.add_argument('--output-dir', default=None,
+                             help="каталог вывода (по умолчанию CHOK_OUTPUT_DIR или C:\\OrangeDM_book_TS)")
+        command.add_argument('--formats', nargs='+', default=['xlsx'],
+                             help="форматы вывода: xlsx parquet feather")
+        command.add_argument('--engine', default='openpyxl', help="движок записи Excel")
+        command.add_argument('--profile', nargs='?', const=True, default=None,
+                             help="замерять этапы; с путем - записать отчет JSON в файл")
+        command.add_argument('--profile-memory', action='store_true', help="замерять также память (медленнее)")
+
+    check = commands.add_parser('check', help="проверить наборы данных")
+    check.add_argument('paths', nargs='+', help="файлы .xlsx, .parquet или .feather (широкая таблица)")
+    check.add_argument('--columns-only', action='store_true',
+                       help="проверить только наличие столбцов 'Запасы' и 'ЧОК' в книгах .xlsx (быстро)")
+    check.add_argument('--all-sheets', action='store_true', help="с --columns-only: проверять все листы")
+    check.add_argument('--tolerance', type=float, default=None, help="допуск в рублях (по умолчанию 0.01)")
+    check.add_argument('--freq', choices=FREQUENCIES, default=None, help="частота (по умолчанию определяется)")
+    check.set_defaults(handler=cmd_check)
+    return parser
+
+
+def print_timing(started=_STARTED, file=sys.stderr):
+    """Печатает время импорта модулей команд и общее время от запуска CLI"""
+    total = time.perf_counter() - started
+    imports = sum(_IMPORT_SECONDS.values())
+    for name, seconds in sorted(_IMPORT_SECONDS.items(), key=lambda item: -item[1]):
+        print(f"импорт {name:<20} {seconds:8.3f} с", file=file)
+    print(f"импорт модулей: {imports:.3f} с, выполнение: {total - imports:.3f} с, всего: {total:.3f} с", file=file)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'check' and args.columns_only:
+        other = [path for path in args.paths if not path.lower().endswith('.xlsx')]
+        if other:
+            parser.error(f"--columns-only проверяет только книги .xlsx: {', '.join(other)}")
+    profile = getattr(args, 'profile', None) or getattr(args, 'profile_memory', False)
+    if profile:
+        instrumentation = _lazy('instrumentation')
+        instrumentation.configure(args.profile or True, memory=args.profile_memory)
+    code = args.handler(args)
+    if profile:
+        instrumentation.print_summary()
+    if args.timing:
+        print_timing()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from date_index import make_date_index
+from series_engine import generate_series, to_datetime64
+from random_state import DEFAULT_SEED, spawn_generators
+from counterparties import DEBTOR_NAMES, CREDITOR_NAMES, random_weights, counterparty_matrix
+
+# Параметры рядов по умолчанию: начальное значение, годовой рост,
+# амплитуда сезонности, уровень шума
+DEFAULT_SERIES_SPEC = {
+    'Материалы': {'base_value': 5_000_000, 'trend_factor': 0.08, 'seasonal_amplitude': 0.15, 'noise_level': 0.02},
+    'Готовая продукция': {'base_value': 7_000_000, 'trend_factor': 0.1, 'seasonal_amplitude': 0.2, 'noise_level': 0.03},
+    'ДЗ': {'base_value': 10_000_000, 'trend_factor': 0.12, 'seasonal_amplitude': 0.1, 'noise_level': 0.04},
+    'КЗ': {'base_value': 8_000_000, 'trend_factor': 0.07, 'seasonal_amplitude': 0.12, 'noise_level': 0.03},
+}
+
+# Порядок рядов в пакете (совпадает с порядком генерации в dataset.py / dataset2.py)
+SERIES_ORDER = ('Материалы', 'Готовая продукция', 'ДЗ', 'КЗ')
+
+# Настройки частот: делители колебаний долей контрагентов sin(j / period),
+# имя листа, формат дат Excel и имя файла по умолчанию
+FREQUENCY_SETTINGS = {
+    'D': {'debtor_period': 30, 'creditor_period': 45, 'sheet_name': 'Данные ЧОК',
+          'date_format': 'dd.mm.yyyy', 'filename': 'financial_dataset'},
+    'W': {'debtor_period': 6, 'creditor_period': 9, 'sheet_name': 'Данные ЧОК понедельно',
+          'date_format': 'dd.mm.yyyy', 'filename': 'financial_dataset_weekly'},
+    'M': {'debtor_period': 3, 'creditor_period': 4, 'sheet_name': 'Данные ЧОК помесячно',
+          'date_format': 'mm.yyyy', 'filename': 'financial_dataset_monthly'},
+    'Q': {'debtor_period': 1, 'creditor_period': 1.5, 'sheet_name': 'Данные ЧОК поквартально',
+          'date_format': 'mm.yyyy', 'filename': 'financial_dataset_quarterly'},
+}
+
+DEFAULT_START_DATE = dt.date(2015, 1, 1)
+DEFAULT_END_DATE = dt.date(2024, 12, 31)
+
+# Примерное число значений в одной части при генерации частями
+DEFAULT_CHUNK_CELLS = 2_000_000
+
+
+def assemble_values(materials, finished_goods, debtors, creditors):
+    """
+    Собирает массив набора без 'Дата': базовые ряды, блоки контрагентов и итоги
+
+    Итоги ДЗ/КЗ суммируются по непрерывным строкам блоков, поэтому итог
+    строки не зависит от числа строк (генерация частями дает те же итоги).
+    """
+    receivables = debtors.sum(axis=1)
+    payables = creditors.sum(axis=1)
+    inventory = materials + finished_goods
+    working_capital = inventory + receivables - payables
+    return np.column_stack([materials, finished_goods, debtors, creditors,
+                            receivables, payables, inventory, working_capital])
+
+
+class DatasetGenerator:
+    """
+    Генератор набора данных ЧОК с состоянием
+
+    Хранит параметры рядов, доли контрагентов, независимые потоки шума
+    базовых рядов и позицию: дату начала тренда и число уже
+    сгенерированных периодов. Последовательные вызовы generate для
+    смежных участков индекса дают те же значения, что и генерация всего
+    периода одним вызовом.
+
+    Параметры - как у generate_dataset (без границ периода).
+    """
+
+    def __init__(self, freq='D', series_spec=None, debtor_names=None, creditor_names=None, seed=DEFAULT_SEED):
+        self.settings = FREQUENCY_SETTINGS.get(freq)
+        if self.settings is None:
+            raise ValueError(f"Неизвестная частота: {freq}. Допустимые значения: {tuple(FREQUENCY_SETTINGS)}")
+        self.freq = freq
+        self.spec = dict(DEFAULT_SERIES_SPEC, **(series_spec or {}))
+        self.debtor_names = list(DEBTOR_NAMES if debtor_names is None else debtor_names)
+        self.creditor_names = list(CREDITOR_NAMES if creditor_names is None else creditor_names)
+
+        # Независимые потоки: доли дебиторов, доли кредиторов и шум каждого
+        # базового ряда, чтобы ряды не зависели от числа контрагентов
+        debtor_rng, creditor_rng, *self.series_rngs = spawn_generators(seed, 2 + len(SERIES_ORDER))
+
+        # Доли контрагентов
+        self.debtor_weights = random_weights(len(self.debtor_names), seed=debtor_rng)
+        self.creditor_weights = random_weights(len(self.creditor_names), seed=creditor_rng)
+
+        # Позиция: дата начала тренда, последняя дата и число сгенерированных периодов
+        self.origin = None
+        self.last_date = None
+        self.position = 0
+
+    @property
+    def columns(self):
+        """Столбцы набора без 'Дата' в порядке generate_values"""
+        return (['Материалы', 'Готовая продукция']
+                + [f"ДЗ: {name}" for name in self.debtor_names]
+                + [f"КЗ: {name}" for name in self.creditor_names]
+                + ['Дебиторская задолженность ИТОГО', 'Кредиторская задолженность ИТОГО', 'Запасы', 'ЧОК'])
+
+    @traced(rows=lambda result: result.shape[0])
+    def generate_values(self, dates):
+        """
+        Генерирует следующие периоды для дат dates в виде массива NumPy
+
+        Возвращает массив (n_dates, len(columns)) без столбца 'Дата'; даты
+        должны продолжать ранее сгенерированные. Значения совпадают с generate.
+        """
+        dates = to_datetime64(dates)
+        if len(dates) and self.last_date is not None and dates[0] <= self.last_date:
+            raise ValueError(f"Даты должны продолжать набор: {dates[0]} не позже {self.last_date}")
+        if self.origin is None and len(dates):
+            self.origin = dates[0]
+
+        # Все четыре базовых ряда - одним пакетным вызовом (4 x n_dates)
+        params = {key: [self.spec[name][key] for name in SERIES_ORDER]
+                  for key in ('base_value', 'trend_factor', 'seasonal_amplitude', 'noise_level')}
+        materials, finished_goods, total_receivables, total_payables = generate_series(
+            dates, freq=self.freq, seed=self.series_rngs, origin=self.origin, **params
+        )
+
+        # Блоки контрагентов - внешние произведения итогов на доли
+        debtors = counterparty_matrix(total_receivables, self.debtor_weights,
+                                      self.settings['debtor_period'], self.position)
+        creditors = counterparty_matrix(total_payables, self.creditor_weights,
+                                        self.settings['creditor_period'], self.position)
+
+        self.position += len(dates)
+        if len(dates):
+            self.last_date = dates[-1]
+        return assemble_values(materials, finished_goods, debtors, creditors)
+
+    @traced()
+    def generate(self, dates):
+        """
+        Генерирует следующие периоды для дат dates
+
+        Даты должны продолжать ранее сгенерированные. Индекс результата -
+        номера периодов от начала набора.
+        """
+        dates = to_datetime64(dates)
+        index = pd.RangeIndex(self.position, self.position + len(dates))
+        df = pd.DataFrame(self.generate_values(dates), columns=self.columns, index=index)
+        df.insert(0, 'Дата', pd.to_datetime(dates))
+        return df
+
+    def iter_chunks(self, dates, chunk_size=None):
+        """
+        Генерирует периоды dates частями по chunk_size (по умолчанию около
+        DEFAULT_CHUNK_CELLS значений в части)
+        """
+        if chunk_size is None:
+            n_columns = 7 + len(self.debtor_names) + len(self.creditor_names)
+            chunk_size = max(1, DEFAULT_CHUNK_CELLS // n_columns)
+        for start in range(0, len(dates), chunk_size):
+            yield self.generate(dates[start:start + chunk_size])
+
+    def state(self):
+        """
+        Состояние генератора в виде словаря, сериализуемого в JSON
+
+        Включает параметры, доли контрагентов, позицию и состояния потоков
+        шума; from_state восстанавливает генератор, продолжающий ряды с того
+        же места.
+        """
+        return {
+            'freq': self.freq,
+            'series_spec': self.spec,
+            'debtor_names': self.debtor_names,
+            'creditor_names': self.creditor_names,
+            'debtor_weights': self.debtor_weights.tolist(),
+            'creditor_weights': self.creditor_weights.tolist(),
+            'origin': None if self.origin is None else str(self.origin),
+            'last_date': None if self.last_date is None else str(self.last_date),
+            'position': self.position,
+            'series_rngs': [rng.bit_generator.state for rng in self.series_rngs],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Восстанавливает генератор из словаря state()"""
+        generator = cls.__new__(cls)
+        generator.freq = state['freq']
+        generator.settings = FREQUENCY_SETTINGS[generator.freq]
+        generator.spec = state['series_spec']
+        generator.debtor_names = list(state['debtor_names'])
+        generator.creditor_names = list(state['creditor_names'])
+        generator.debtor_weights = np.array(state['debtor_weights'])
+        generator.creditor_weights = np.array(state['creditor_weights'])
+        generator.origin = None if state['origin'] is None else np.datetime64(state['origin'], 'D')
+        generator.last_date = None if state['last_date'] is None else np.datetime64(state['last_date'], 'D')
+        generator.position = state['position']
+        generator.series_rngs = []
+        for rng_state in state['series_rngs']:
+            bit_generator = getattr(np.random, rng_state['bit_generator'])()
+            bit_generator.state = rng_state
+            generator.series_rngs.append(np.random.Generator(bit_generator))
+        return generator
+
+
+@traced()
+def generate_dataset(freq='D', start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE,
+                     series_spec=None, debtor_names=None, creditor_names=None, seed=DEFAULT_SEED):
+    """
+    Генерирует набор данных ЧОК любой частоты
+
+    Параметры:
+    - freq: частота индекса ('D' - рабочие дни, 'W', 'M', 'Q')
+    - start_date, end_date: границы периода
+    - series_spec: параметры рядов Материалы / Готовая продукция / ДЗ / КЗ
+      (словарь как DEFAULT_SERIES_SPEC; недостающие ряды берутся по умолчанию)
+    - debtor_names: список дебиторов (по умолчанию DEBTOR_NAMES)
+    - creditor_names: список кредиторов (по умолчанию CREDITOR_NAMES)
+    - seed: зерно или numpy.random.Generator; при одинаковых параметрах и
+      зерне результат совпадает (None - случайное зерно)
+    """
+    generator = DatasetGenerator(freq, series_spec, debtor_names, creditor_names, seed)
+    return generator.generate(make_date_index(freq, start_date, end_date))
+
+
+def generate_dataset_values(freq='D', start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE,
+                            series_spec=None, debtor_names=None, creditor_names=None, seed=DEFAULT_SEED):
+    """
+    Генерирует набор данных ЧОК без pandas
+
+    Параметры - как у generate_dataset. Возвращает (values, columns, dates):
+    массив значений (n_dates, n_columns) без столбца 'Дата', имена столбцов
+    и индекс datetime64[D]. Значения совпадают с generate_dataset; подходит
+    для массовой генерации панелей (сценарии, бэктесты).
+    """
+    generator = DatasetGenerator(freq, series_spec, debtor_names, creditor_names, seed)
+    dates = make_date_index(freq, start_date, end_date)
+    return generator.generate_values(dates), generator.columns, dates
+
+
+def iter_dataset_chunks(freq='D', start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE,
+                        series_spec=None, debtor_names=None, creditor_names=None, seed=DEFAULT_SEED,
+                        chunk_size=None):
+    """
+    Генерирует набор данных частями, упорядоченными по времени
+
+    В памяти одновременно находится только одна часть; склеенные части
+    совпадают с результатом generate_dataset с теми же параметрами.
+
+    Параметры - как у generate_dataset, а также:
+    - chunk_size: число периодов в части (по умолчанию подбирается так,
+      чтобы часть содержала около DEFAULT_CHUNK_CELLS значений)
+    """
+    generator = DatasetGenerator(freq, series_spec, debtor_names, creditor_names, seed)
+    return generator.iter_chunks(make_date_index(freq, start_date, end_date), chunk_size)
+
+
+def read_names(file_path):
+    """Читает список контрагентов из текстового файла (одно имя в строке)"""
+    with open(file_path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    # Единственный интерфейс командной строки - chok_cli; запуск модуля
+    # равносилен 'python chok_cli.py generate ...'
+    import sys
+
+    from chok_cli import main
+
+    sys.exit(main(['generate'] + sys.argv[1:]))
@@ -0,0 +1,240 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from working_calendar import RU_CALENDAR
+from date_index import infer_freq
+from long_format import LONG_COLUMNS, column_mapping
+from excel_export import LONG_SHEET_NAME
+from compact import to_rubles
+
+REQUIRED_COLUMNS = [
+    'Дата', 'Материалы', 'Готовая продукция',
+    'Дебиторская задолженность ИТОГО', 'Кредиторская задолженность ИТОГО', 'Запасы', 'ЧОК'
+]
+
+# Допуск по умолчанию - одна копейка
+DEFAULT_TOLERANCE = 0.01
+
+# Сколько нарушающих строк показывать в отчете
+MAX_EXAMPLES = 5
+
+
+def _issue(check, mask=None, dates=None, error=None, message=None):
+    """Описание нарушения инварианта (или None, если нарушений нет)"""
+    if mask is not None:
+        count = int(np.count_nonzero(mask))
+        if count == 0:
+            return None
+        issue = {'check': check, 'violations': count}
+        if dates is not None:
+            issue['examples'] = [str(d)[:10] for d in dates[mask][:MAX_EXAMPLES]]
+        if error is not None:
+            issue['max_error'] = float(np.max(error[mask]))
+        return issue
+    return {'check': check, 'violations': 1, 'message': message}
+
+
+def _check_identity(check, left, right, tolerance, dates):
+    error = np.abs(left - right)
+    return _issue(check, error > tolerance, dates, error)
+
+
+def validate_wide(df, tolerance=DEFAULT_TOLERANCE, freq=None, calendar=RU_CALENDAR):
+    """
+    Проверяет инварианты широкой таблицы ЧОК векторными операциями
+
+    - наличие обязательных столбцов;
+    - ДЗ/КЗ ИТОГО равны сумме столбцов 'ДЗ:'/'КЗ:';
+    - Запасы = Материалы + Готовая продукция;
+    - ЧОК = Запасы + ДЗ ИТОГО - КЗ ИТОГО;
+    - суммы неотрицательны и конечны;
+    - даты строго возрастают и являются рабочими днями ('D'),
+      понедельниками ('W') или первыми числами месяцев ('M') и кварталов ('Q');
+      частота по умолчанию определяется по датам (date_index.infer_freq).
+
+    Возвращает список нарушений (пустой, если набор корректен).
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        return [_issue('Обязательные столбцы', message=f"Отсутствуют столбцы: {missing}")]
+
+    issues = []
+    dates = df['Дата'].to_numpy().astype('datetime64[D]')
+
+    def column(name):
+        return df[name].to_numpy(dtype=float)
+
+    for prefix, total in (('ДЗ:', 'Дебиторская задолженность ИТОГО'), ('КЗ:', 'Кредиторская задолженность ИТОГО')):
+        parts = [c for c in df.columns if c.startswith(prefix)]
+        parts_sum = df[parts].to_numpy(dtype=float).sum(axis=1) if parts else np.zeros(len(df))
+        issues.append(_check_identity(f"{total} = сумма '{prefix}'", column(total), parts_sum, tolerance, dates))
+
+    issues.append(_check_identity('Запасы = Материалы + Готовая продукция', column('Запасы'),
+                                  column('Материалы') + column('Готовая продукция'), tolerance, dates))
+    issues.append(_check_identity('ЧОК = Запасы + ДЗ - КЗ', column('ЧОК'),
+                                  column('Запасы') + column('Дебиторская задолженность ИТОГО')
+                                  - column('Кредиторская задолженность ИТОГО'), tolerance, dates))
+
+    # Все суммы, кроме ЧОК (может быть отрицательным), неотрицательны и конечны
+    amounts = df[[c for c in df.columns if c not in ('Дата', 'ЧОК')]].to_numpy(dtype=float)
+    issues.append(_issue('Суммы неотрицательны и конечны', ~(np.isfinite(amounts) & (amounts >= -tolerance)).all(axis=1), dates))
+
+    if len(dates) > 1:
+        not_increasing = np.concatenate([[False], np.diff(dates).astype('int64') <= 0])
+        issues.append(_issue('Даты строго возрастают', not_increasing, dates))
+
+    # По одной дате частоту не определить - проверка дат пропускается
+    freq = freq or (infer_freq(dates) if len(dates) > 1 else None)
+    if freq == 'D' and len(dates):
+        working = np.isin(dates, calendar.working_days(dates.min(), dates.max()))
+        issues.append(_issue('Даты - рабочие дни', ~working, dates))
+    elif freq == 'W':
+        # 1970-01-01 - четверг: (дни + 3) % 7 - номер дня недели с понедельника
+        issues.append(_issue('Даты - понедельники', (dates.astype('int64') + 3) % 7 != 0, dates))
+    elif freq in ('M', 'Q'):
+        months = dates.astype('datetime64[M]')
+        issues.append(_issue('Даты - первые числа месяцев', dates != months.astype('datetime64[D]'), dates))
+        if freq == 'Q':
+            issues.append(_issue('Даты - месяцы начала кварталов', months.astype('int64') % 3 != 0, dates))
+
+    return [issue for issue in issues if issue is not None]
+
+
+def _label_codes(values, labels):
+    """Номера подписей values в индексе labels (-1 - неизвестная подпись)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Сопоставляются только категории, а не каждая строка
+        category_codes = np.append(labels.get_indexer(values.cat.categories), -1)
+        return category_codes[values.cat.codes.to_numpy()]
+    return labels.get_indexer(values.astype(str))
+
+
+def validate_long(df, df_long, tolerance=DEFAULT_TOLERANCE):
+    """
+    Проверяет, что длинная таблица (Дата, Статья, Контрагент, Сумма) совпадает с широкой
+
+    Каждой строке длинной таблицы сопоставляется целочисленный ключ
+    (номер даты * число столбцов + номер столбца широкой таблицы), после чего
+    пропуски, дубликаты, лишние строки и расхождения сумм находятся
+    операциями над массивами ключей без слияния строковых таблиц.
+    """
+    missing = [column for column in LONG_COLUMNS if column not in df_long.columns]
+    if missing:
+        return [_issue('Столбцы длинной таблицы', message=f"Отсутствуют столбцы: {missing}")]
+
+    mapping = column_mapping(df.columns)
+    n_columns = len(mapping)
+    wide_dates = df['Дата'].to_numpy().astype('datetime64[D]')
+    expected = df[mapping['Столбец'].tolist()].to_numpy(dtype=float).ravel()
+
+    # Номер столбца широкой таблицы по паре (Статья, Контрагент)
+    articles = pd.Index(pd.unique(mapping['Статья']))
+    counterparties = pd.Index(pd.unique(mapping['Контрагент']))
+    lookup = np.full((len(articles), len(counterparties)), -1)
+    lookup[articles.get_indexer(mapping['Статья']), counterparties.get_indexer(mapping['Контрагент'])] = np.arange(n_columns)
+
+    article_codes = _label_codes(df_long['Статья'], articles)
+    counterparty_codes = _label_codes(df_long['Контрагент'], counterparties)
+    column_idx = np.where((article_codes >= 0) & (counterparty_codes >= 0),
+                          lookup[article_codes, counterparty_codes], -1)
+
+    long_dates = df_long['Дата'].to_numpy().astype('datetime64[D]')
+    if len(wide_dates):
+        # Даты широкой таблицы упорядочены (проверяется в validate_wide)
+        date_idx = np.minimum(np.searchsorted(wide_dates, long_dates), len(wide_dates) - 1)
+        known = (column_idx >= 0) & (wide_dates[date_idx] == long_dates)
+    else:
+        date_idx = np.zeros(len(long_dates), dtype='int64')
+        known = np.zeros(len(long_dates), dtype=bool)
+
+    keys = date_idx[known] * n_columns + column_idx[known]
+    counts = np.bincount(keys, minlength=len(expected))
+    error = np.abs(expected[keys] - df_long['Сумма'].to_numpy(dtype=float)[known])
+
+    issues = [
+        _issue('Ключи длинной таблицы уникальны', counts > 1, np.repeat(wide_dates, n_columns)),
+        _issue('Строки широкой таблицы есть в длинной', counts == 0, np.repeat(wide_dates, n_columns)),
+        _issue('Лишние строки в длинной таблице', ~known, long_dates),
+        _issue('Суммы длинной таблицы совпадают с широкой', error > tolerance, long_dates[known], error),
+    ]
+    return [issue for issue in issues if issue is not None]
+
+
+def validate_dataset(df, df_long=None, tolerance=DEFAULT_TOLERANCE, freq=None, calendar=RU_CALENDAR):
+    """Проверяет широкую таблицу и, если передана, соответствие ей длинной таблицы"""
+    # Суммы в копейках или float32 (compact_frame) проверяются в рублях
+    df = to_rubles(df)
+    if df_long is not None:
+        df_long = to_rubles(df_long)
+    issues = validate_wide(df, tolerance, freq, calendar)
+    if df_long is not None and all(column in df.columns for column in REQUIRED_COLUMNS):
+        issues += validate_long(df, df_long, tolerance)
+    return issues
+
+
+def load_dataset(file_path):
+    """
+    Загружает широкую и длинную таблицы из книги Excel или колоночных файлов
+
+    - .xlsx: первый лист - широкая таблица, лист 'Данные ЧОК (4 столбца)' -
+      длинная (если есть); листы продолжения ' (2)', ' (3)' ... добавляются;
+    - .parquet/.feather: длинная таблица ищется в файле с суффиксом '_long'.
+
+    Возвращает (df, df_long или None).
+    """
+    if file_path.endswith('.xlsx'):
+        from excel_loader import read_columns, read_header
+        sheets = list(read_header(file_path))
+
+        def read_sheet(name):
+            parts = [sheet for sheet in sheets if sheet == name or re.fullmatch(re.escape(name) + r' \(\d+\)', sheet)]
+            return pd.concat([read_columns(file_path, sheet_name=part) for part in parts], ignore_index=True)
+
+        return read_sheet(sheets[0]), read_sheet(LONG_SHEET_NAME) if LONG_SHEET_NAME in sheets else None
+
+    from output_sinks import LONG_SUFFIX, read_columnar
+    base, ext = os.path.splitext(file_path)
+    df = read_columnar(file_path)
+    long_path = base + LONG_SUFFIX + ext
+    return df, read_columnar(long_path) if os.path.exists(long_path) else None
+
+
+def print_issues(issues):
+    if not issues:
+        print("Все проверки пройдены")
+        return
+    for issue in issues:
+        details = [f"нарушений: {issue['violations']}"]
+        if 'max_error' in issue:
+            details.append(f"макс. отклонение: {issue['max_error']:.2f}")
+        if 'examples' in issue:
+            details.append(f"примеры: {', '.join(issue['examples'])}")
+        if 'message' in issue:
+            details.append(issue['message'])
+        print(f"ОШИБКА [{issue['check']}] " + '; '.join(details))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Проверка инвариантов наборов данных ЧОК")
+    parser.add_argument('paths', nargs='+', help="файлы .xlsx, .parquet или .feather (широкая таблица)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="допуск в рублях")
+    parser.add_argument('--freq', choices=('D', 'W', 'M', 'Q'), default=None, help="частота (по умолчанию определяется)")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.paths:
+        start = time.perf_counter()
+        df, df_long = load_dataset(path)
+        loaded = time.perf_counter()
+        issues = validate_dataset(df, df_long, args.tolerance, args.freq)
+        print(f"\n{path}: строк {len(df)}, длинная таблица: {'нет' if df_long is None else len(df_long)} "
+              f"(чтение {loaded - start:.2f} с, проверка {time.perf_counter() - loaded:.2f} с)")
+        print_issues(issues)
+        failed = failed or bool(issues)
+    sys.exit(1 if failed else 0)
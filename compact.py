@@ -0,0 +1,127 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Компактные представления сумм:
+# 'kopecks' - int64 в копейках: точные итоги, 8 байт на значение
+# 'float32' - рубли float32: вдвое меньше памяти, ~7 значащих цифр
+#             (около рубля на десятках миллионов), итоги приближенные
+AMOUNT_MODES = ('kopecks', 'float32')
+
+TOTAL_COLUMNS = ('Дебиторская задолженность ИТОГО', 'Кредиторская задолженность ИТОГО', 'Запасы', 'ЧОК')
+LABEL_COLUMNS = ('Статья', 'Контрагент')
+
+
+def amount_columns(df):
+    """Столбцы сумм: все, кроме даты и подписей"""
+    return [column for column in df.columns if column != 'Дата' and column not in LABEL_COLUMNS]
+
+
+def to_kopecks(values):
+    """Рубли (с точностью до копеек) -> int64 копейки"""
+    return np.rint(np.asarray(values, dtype=float) * 100).astype(np.int64)
+
+
+def recompute_totals(values, columns):
+    """
+    Пересчитывает итоговые столбцы массива (n_dates, n_columns) из составляющих
+
+    Для целых копеек итоги точные: ИТОГО - сумма столбцов 'ДЗ:'/'КЗ:',
+    Запасы = Материалы + Готовая продукция, ЧОК = Запасы + ДЗ - КЗ.
+    Массив изменяется на месте; отсутствующие столбцы пропускаются.
+    """
+    position = {column: i for i, column in enumerate(columns)}
+    if not all(column in position for column in TOTAL_COLUMNS + ('Материалы', 'Готовая продукция')):
+        return values
+    for prefix, total in (('ДЗ:', TOTAL_COLUMNS[0]), ('КЗ:', TOTAL_COLUMNS[1])):
+        parts = [i for i, column in enumerate(columns) if column.startswith(prefix)]
+        values[:, position[total]] = values[:, parts].sum(axis=1)
+    values[:, position['Запасы']] = values[:, position['Материалы']] + values[:, position['Готовая продукция']]
+    values[:, position['ЧОК']] = (values[:, position['Запасы']] + values[:, position[TOTAL_COLUMNS[0]]]
+                                  - values[:, position[TOTAL_COLUMNS[1]]])
+    return values
+
+
+def compact_values(values, columns, amounts='kopecks'):
+    """Компактное представление массива значений (как у generate_dataset_values)"""
+    if amounts == 'kopecks':
+        return recompute_totals(to_kopecks(values), columns)
+    if amounts == 'float32':
+        return np.asarray(values, dtype=np.float32)
+    raise ValueError(f"Неизвестное представление сумм: {amounts}. Допустимые значения: {AMOUNT_MODES}")
+
+
+def compact_frame(df, amounts='kopecks'):
+    """
+    Возвращает компактную копию широкой или длинной таблицы ЧОК
+
+    - суммы: int64 копейки (итоги пересчитываются точно) или float32;
+    - текстовые столбцы (Статья, Контрагент) - категориальные;
+    - даты не меняются: в pandas нет единицы datetime64[D], а datetime64
+      любой единицы занимает 8 байт.
+
+    Обратное преобразование - to_rubles.
+    """
+    if amounts not in AMOUNT_MODES:
+        raise ValueError(f"Неизвестное представление сумм: {amounts}. Допустимые значения: {AMOUNT_MODES}")
+    columns = amount_columns(df)
+    result = df.copy()
+    if columns:
+        values = compact_values(df[columns].to_numpy(dtype=float), columns, amounts)
+        result[columns] = pd.DataFrame(values, columns=columns, index=df.index)
+    for column in LABEL_COLUMNS:
+        if column in result.columns and not isinstance(result[column].dtype, pd.CategoricalDtype):
+            result[column] = result[column].astype('category')
+    return result
+
+
+def to_rubles(df):
+    """
+    Возвращает таблицу с суммами float64 в рублях
+
+    Копейки делятся на 100 (результат совпадает с округлением до копеек),
+    float32 расширяется. Таблица с суммами float64 возвращается без копирования.
+    """
+    columns = [column for column in amount_columns(df) if df[column].dtype != np.float64]
+    if not columns:
+        return df
+    result = df.copy()
+    for column in columns:
+        values = df[column].to_numpy()
+        result[column] = values / 100 if np.issubdtype(values.dtype, np.integer) else values.astype(np.float64)
+    return result
+
+
+def memory_footprint(frames):
+    """Память таблиц в байтах (с учетом строк в object-столбцах): {имя: байт}"""
+    return {name: int(frame.memory_usage(index=True, deep=True).sum()) for name, frame in frames.items()}
+
+
+def print_footprint(frames, baseline=None):
+    """Печатает память таблиц и, если задан baseline, сокращение относительно него"""
+    footprint = memory_footprint(frames)
+    reference = memory_footprint(baseline) if baseline is not None else {}
+    for name, size in footprint.items():
+        ratio = f" (x{reference[name] / size:.1f} меньше)" if name in reference and size else ""
+        print(f"{name:<25} {size / 1024 ** 2:10.2f} МБ{ratio}")
+
+
+if __name__ == "__main__":
+    from chok_generator import FREQUENCY_SETTINGS, generate_dataset
+    from long_format import build_long_format
+
+    parser = argparse.ArgumentParser(description="Память набора данных ЧОК в обычном и компактном представлении")
+    parser.add_argument('--freq', choices=tuple(FREQUENCY_SETTINGS), default='D', help="частота индекса")
+    parser.add_argument('--amounts', choices=AMOUNT_MODES, default='kopecks', help="представление сумм")
+    args = parser.parse_args()
+
+    df = generate_dataset(args.freq)
+    # Исходное представление: float64 и подписи длинной таблицы строками object
+    baseline = {'Широкая': df, 'Длинная': build_long_format(df).astype({column: object for column in LABEL_COLUMNS})}
+    compact = compact_frame(df, args.amounts)
+
+    print("Обычное представление (float64, object):")
+    print_footprint(baseline)
+    print(f"Компактное представление ({args.amounts}, категории):")
+    print_footprint({'Широкая': compact, 'Длинная': build_long_format(compact)}, baseline)
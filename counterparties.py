@@ -0,0 +1,49 @@
+import numpy as np
+
+from random_state import DEFAULT_SEED, as_generator
+
+# Имена контрагентов по умолчанию
+DEBTOR_NAMES = [
+    "ООО 'ТехноПром'", "АО 'Меркурий'", "ООО 'СтройИнвест'",
+    "ЗАО 'ЭнергоСбыт'", "ООО 'АгроХолдинг'", "ИП Иванов А.А.",
+    "ООО 'МеталлГрупп'", "АО 'ТрансЛогистика'", "ООО 'МедТех'",
+    "ЗАО 'ИТ-Решения'"
+]
+
+CREDITOR_NAMES = [
+    "ООО 'ПоставкаПлюс'", "АО 'ТехноСервис'", "ООО 'СырьеТорг'",
+    "ПАО 'ЭнергоСеть'", "ООО 'ЛогистикаПро'", "АО 'СтальИмпорт'",
+    "ООО 'ХимПром'", "ЗАО 'СтройМатериалы'", "ООО 'ФинансГрупп'",
+    "АО 'ТехИмпорт'"
+]
+
+
+def random_weights(count, low=0.05, high=0.2, seed=DEFAULT_SEED):
+    """
+    Генерирует нормированные случайные доли контрагентов
+
+    seed - зерно или numpy.random.Generator.
+    """
+    weights = as_generator(seed).uniform(low, high, count)
+    return weights / weights.sum()
+
+
+def counterparty_matrix(total, weights, period, offset=0):
+    """
+    Распределяет итоговый ряд по контрагентам одной матричной операцией
+
+    Параметры:
+    - total: итоговый ряд задолженности (длина n_dates)
+    - weights: доли контрагентов (длина n_counterparties)
+    - period: делитель фазы колебаний долей sin(j / period)
+    - offset: номер первого периода j (для генерации частями)
+
+    Возвращает массив (n_dates, n_counterparties), округленный до копеек.
+    Блоки ДЗ и КЗ встраиваются в таблицу набора одним column_stack вместе
+    с итогами (chok_generator.assemble_values), без промежуточного DataFrame.
+    """
+    total = np.asarray(total, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    # Колебание долей во времени одинаково для всех контрагентов
+    oscillation = 1 + 0.1 * np.sin(np.arange(offset, offset + len(total)) / period)
+    return np.round(np.outer(total, weights) * oscillation[:, np.newaxis], 2)
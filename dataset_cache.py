@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+import chok_generator
+from chok_generator import DEFAULT_SERIES_SPEC, FREQUENCY_SETTINGS, generate_dataset
+from counterparties import DEBTOR_NAMES, CREDITOR_NAMES
+from random_state import DEFAULT_SEED
+
+# Версия формата кэша: увеличивается при несовместимых изменениях хранения
+CACHE_FORMAT_VERSION = 1
+
+# Каталог и предельный размер кэша по умолчанию (переопределяются переменными окружения)
+DEFAULT_CACHE_DIR = os.environ.get('CHOK_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'chok_datasets'))
+DEFAULT_MAX_BYTES = int(os.environ.get('CHOK_CACHE_MAX_BYTES', 1024 ** 3))
+
+# Модули, от исходного кода которых зависит результат генерации и экспорта
+GENERATOR_MODULES = ('working_calendar', 'date_index', 'random_state', 'series_engine', 'counterparties',
+                     'chok_generator')
+EXPORT_MODULES = ('long_format', 'compact', 'excel_export', 'output_sinks')
+
+DATASET_FILE = 'dataset.pkl'
+
+_code_versions = {}
+
+
+def code_version(modules=GENERATOR_MODULES):
+    """Хэш исходного кода модулей - ключ кэша меняется при любом изменении генератора"""
+    modules = tuple(modules)
+    version = _code_versions.get(modules)
+    if version is None:
+        digest = hashlib.sha256()
+        for name in modules:
+            __import__(name)
+            with open(sys.modules[name].__file__, 'rb') as f:
+                digest.update(f.read())
+        version = digest.hexdigest()
+        _code_versions[modules] = version
+    return version
+
+
+def dataset_params(freq='D', start_date=chok_generator.DEFAULT_START_DATE, end_date=chok_generator.DEFAULT_END_DATE,
+                   series_spec=None, debtor_names=None, creditor_names=None, seed=DEFAULT_SEED):
+    """Приводит параметры generate_dataset к полному каноническому виду (с умолчаниями)"""
+    return {
+        'freq': freq,
+        'start_date': str(start_date),
+        'end_date': str(end_date),
+        'series_spec': dict(DEFAULT_SERIES_SPEC, **(series_spec or {})),
+        'debtor_names': list(DEBTOR_NAMES if debtor_names is None else debtor_names),
+        'creditor_names': list(CREDITOR_NAMES if creditor_names is None else creditor_names),
+        'seed': seed,
+    }
+
+
+def is_cacheable(seed):
+    """Кэшируются только наборы с явным целочисленным зерном"""
+    return isinstance(seed, int) and not isinstance(seed, bool)
+
+
+class DatasetCache:
+    """
+    Кэш сгенерированных наборов данных на диске с адресацией по содержимому
+
+    Каждая запись - каталог <ключ>, где ключ - SHA-256 от параметров
+    генерации, зерна и версии кода. Запись создается атомарно (через
+    переименование временного каталога). Время изменения каталога
+    обновляется при каждом обращении; при превышении max_bytes удаляются
+    записи, к которым дольше всего не обращались (LRU).
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = DEFAULT_CACHE_DIR if cache_dir is None else cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(payload, modules=GENERATOR_MODULES):
+        """Ключ записи: хэш канонического JSON параметров и версии кода"""
+        payload = {'payload': payload, 'code': code_version(modules), 'format': CACHE_FORMAT_VERSION}
+        text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key):
+        """Возвращает путь к записи и отмечает обращение, либо None"""
+        path = self.entry_path(key)
+        if not os.path.isdir(path):
+            return None
+        os.utime(path)
+        return path
+
+    def store(self, key, write_entry):
+        """
+        Создает запись: write_entry(tmp_dir) записывает файлы во временный
+        каталог, который затем атомарно становится записью кэша
+        """
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp_', dir=self.cache_dir)
+        try:
+            write_entry(tmp_dir)
+            os.replace(tmp_dir, self.entry_path(key))
+        except OSError:
+            # Запись уже создана параллельным процессом
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(self.entry_path(key)):
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        # Только что записанная запись не удаляется, даже если она больше max_bytes:
+        # вызывающий код сразу читает ее файлы
+        self.evict(keep=key)
+        return self.entry_path(key)
+
+    def entries(self):
+        """Список записей (путь, размер в байтах, время последнего обращения)"""
+        result = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith('.tmp_') or not os.path.isdir(path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            result.append((path, size, os.stat(path).st_mtime))
+        return result
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Удаляет самые давние записи, пока кэш больше max_bytes (кроме записи keep)"""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        kept = None if keep is None else self.entry_path(keep)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == kept:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+    def get_dataset(self, key):
+        path = self.lookup(key)
+        if path is None:
+            return None
+        return pd.read_pickle(os.path.join(path, DATASET_FILE))
+
+    def put_dataset(self, key, df):
+        self.store(key, lambda tmp_dir: df.to_pickle(os.path.join(tmp_dir, DATASET_FILE)))
+
+
+def cached_generate_dataset(cache=None, **params):
+    """
+    generate_dataset с кэшем на диске
+
+    При совпадении параметров, зерна и версии кода набор читается из кэша
+    (pickle), иначе генерируется и сохраняется. Наборы без целочисленного
+    зерна (None, Generator) не кэшируются.
+    """
+    if not is_cacheable(params.get('seed', DEFAULT_SEED)):
+        return generate_dataset(**params)
+
+    cache = DatasetCache() if cache is None else cache
+    key = cache.make_key(dataset_params(**params))
+    df = cache.get_dataset(key)
+    if df is None:
+        df = generate_dataset(**params)
+        cache.put_dataset(key, df)
+    return df
+
+
+def cached_export_dataset(name, output_dir=None, formats=('xlsx',), cache=None, engine='openpyxl', **params):
+    """
+    Генерирует и экспортирует набор данных с кэшированием готовых файлов
+
+    Файлы каждого формата (книга Excel, Parquet/Feather) хранятся в кэше под
+    ключом из параметров набора, формата и версии кода экспорта (для xlsx -
+    и движка записи); при попадании они копируются в output_dir без
+    генерации и записи.
+
+    Возвращает словарь {формат: [пути к файлам]}, как output_sinks.export_dataset.
+    """
+    from output_sinks import DEFAULT_OUTPUT_DIR, export_dataset
+
+    output_dir = DEFAULT_OUTPUT_DIR if output_dir is None else output_dir
+    settings = FREQUENCY_SETTINGS[params.get('freq', 'D')]
+    if not is_cacheable(params.get('seed', DEFAULT_SEED)):
+        return export_dataset(generate_dataset(**params), name, output_dir=output_dir, formats=formats, engine=engine,
+                              sheet_name=settings['sheet_name'], date_format=settings['date_format'])
+
+    cache = DatasetCache() if cache is None else cache
+    canonical = dataset_params(**params)
+    os.makedirs(output_dir, exist_ok=True)
+
+    paths = {}
+    df = None
+    for fmt in formats:
+        payload = {'dataset': canonical, 'format': fmt}
+        if fmt == 'xlsx':
+            # Движок влияет только на книгу Excel
+            payload['engine'] = engine
+        key = cache.make_key(payload, GENERATOR_MODULES + EXPORT_MODULES)
+        entry = cache.lookup(key)
+        if entry is None:
+            if df is None:
+                df = cached_generate_dataset(cache=cache, **params)
+
+            def write_entry(tmp_dir):
+                export_dataset(df, 'entry', output_dir=tmp_dir, formats=(fmt,), engine=engine,
+                               sheet_name=settings['sheet_name'], date_format=settings['date_format'])
+
+            entry = cache.store(key, write_entry)
+
+        # Файлы записи называются entry<суффикс>, в каталоге вывода - name<суффикс>
+        paths[fmt] = []
+        for file_name in sorted(os.listdir(entry)):
+            target = os.path.join(output_dir, name + file_name[len('entry'):])
+            shutil.copyfile(os.path.join(entry, file_name), target)
+            paths[fmt].append(target)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Управление кэшем наборов данных ЧОК")
+    parser.add_argument('command', choices=('info', 'clear'), help="info - размер кэша, clear - очистка")
+    parser.add_argument('--cache-dir', default=None, help="каталог кэша")
+    args = parser.parse_args()
+
+    cache = DatasetCache(args.cache_dir)
+    if args.command == 'clear':
+        cache.clear()
+        print(f"Кэш {cache.cache_dir} очищен")
+    else:
+        entries = cache.entries()
+        print(f"Кэш: {cache.cache_dir}")
+        print(f"Записей: {len(entries)}, размер: {sum(size for _, size, _ in entries) / 1024 ** 2:.1f} МБ "
+              f"из {cache.max_bytes / 1024 ** 2:.0f} МБ")
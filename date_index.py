@@ -0,0 +1,86 @@
+import functools
+
+import numpy as np
+
+from instrumentation import traced
+from working_calendar import RU_CALENDAR, _to_day
+from series_engine import FREQUENCIES, to_datetime64
+
+# Сколько различных индексов хранить в кэше
+INDEX_CACHE_SIZE = 256
+
+
+def month_starts(start_date, end_date):
+    """Первые числа месяцев от месяца start_date до end_date включительно (datetime64[D])"""
+    start, end = _to_day(start_date), _to_day(end_date)
+    months = np.arange(start.astype('datetime64[M]'), end.astype('datetime64[M]') + 1)
+    return months.astype('datetime64[D]')
+
+
+def quarter_starts(start_date, end_date):
+    """Первые числа кварталов от квартала start_date до end_date включительно (datetime64[D])"""
+    start, end = _to_day(start_date), _to_day(end_date)
+    month = start.astype('datetime64[M]')
+    first = month - month.astype('int64') % 3
+    return np.arange(first, end.astype('datetime64[M]') + 1, 3).astype('datetime64[D]')
+
+
+def infer_freq(dates):
+    """Определяет частоту индекса ('D', 'W', 'M', 'Q') по медианному шагу дат"""
+    dates = to_datetime64(dates)
+    if len(dates) < 2:
+        raise ValueError("Частоту нельзя определить меньше чем по двум датам")
+    step = np.median(np.diff(dates).astype('int64'))
+    return 'D' if step < 5 else 'W' if step < 20 else 'M' if step < 60 else 'Q'
+
+
+def week_starts(start_date, end_date):
+    """Понедельники от start_date до end_date включительно (datetime64[D])"""
+    start, end = _to_day(start_date), _to_day(end_date)
+    # 1970-01-01 - четверг: (дни + 3) % 7 - номер дня недели с понедельника
+    first = start + (-(start.astype('int64') + 3)) % 7
+    return np.arange(first, end + 1, 7)
+
+
+def build_date_index(freq, start_date, end_date):
+    """
+    Строит индекс дат без кэша (новый изменяемый массив datetime64[D])
+
+    Частоты - как у make_date_index; используется им и замерами
+    построения индекса (benchmark.py).
+    """
+    start, end = _to_day(start_date), _to_day(end_date)
+    if freq == 'D':
+        return RU_CALENDAR.working_days(start, end)
+    if freq == 'W':
+        return week_starts(start, end)
+    if freq == 'M':
+        return month_starts(start, end)
+    if freq == 'Q':
+        return quarter_starts(start, end)
+    raise ValueError(f"Неизвестная частота: {freq}. Допустимые значения: {FREQUENCIES}")
+
+
+@functools.lru_cache(maxsize=INDEX_CACHE_SIZE)
+def _cached_index(freq, start, end):
+    dates = build_date_index(freq, start, end)
+    # Кэшированный массив общий для всех вызовов, поэтому защищен от записи
+    dates.flags.writeable = False
+    return dates
+
+
+@traced()
+def make_date_index(freq, start_date, end_date):
+    """
+    Строит индекс дат указанной частоты в виде массива datetime64[D]
+
+    - 'D': рабочие дни по производственному календарю
+    - 'W': понедельники
+    - 'M': первые числа месяцев, начиная с месяца start_date
+    - 'Q': первые числа кварталов, начиная с квартала start_date
+
+    Индексы строятся арифметикой datetime64 и кэшируются; возвращаемый
+    массив доступен только для чтения.
+    """
+    return _cached_index(freq, _to_day(start_date), _to_day(end_date))
+
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import span, traced
+from long_format import build_long_format
+from compact import to_rubles
+
+AMOUNT_FORMAT = '#,##0.00₽'
+LONG_SHEET_NAME = 'Данные ЧОК (4 столбца)'
+
+# Движки записи:
+# 'openpyxl'   - запись через pandas и последующее форматирование каждой ячейки
+# 'write_only' - потоковая запись openpyxl (write-only), стиль столбца создается один раз
+# 'xlsxwriter' - потоковая запись xlsxwriter с форматами на уровне столбцов
+ENGINES = ('openpyxl', 'write_only', 'xlsxwriter')
+
+# Начало отсчета дат Excel (серийный номер 0)
+EXCEL_EPOCH = np.datetime64('1899-12-30', 'D')
+
+# Предельное число строк листа Excel (вместе с заголовком)
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def _split_sheet(spec, max_rows):
+    """
+    Делит лист на несколько, если строки не помещаются в max_rows
+    (с учетом заголовка); листы продолжения получают суффикс ' (2)', ' (3)' ...
+    """
+    frame = spec['frame']
+    if max_rows is None or len(frame) < max_rows:
+        return [spec]
+    step = max_rows - 1
+    return [
+        dict(spec, name=spec['name'] if part == 0 else f"{spec['name']} ({part + 1})",
+             frame=frame.iloc[start:start + step])
+        for part, start in enumerate(range(0, len(frame), step))
+    ]
+
+
+def _sheet_specs(df, df_long, sheet_name, date_format, max_rows=EXCEL_MAX_ROWS):
+    """Описание листов книги: имя, таблица, ширины и форматы столбцов"""
+    specs = [
+        {
+            'name': sheet_name,
+            'frame': df,
+            'widths': [max(len(str(column)), 15) for column in df.columns],
+            'formats': [date_format if column == 'Дата' else AMOUNT_FORMAT for column in df.columns],
+        },
+        {
+            'name': LONG_SHEET_NAME,
+            'frame': df_long,
+            'widths': [15, 25, 25, 15],  # Дата, Статья, Контрагент, Сумма
+            'formats': [date_format, None, None, AMOUNT_FORMAT],
+        },
+    ]
+    return [part for spec in specs for part in _split_sheet(spec, max_rows)]
+
+
+def _column_values(series):
+    """Значения столбца в виде списка, даты - серийными номерами Excel"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        days = series.to_numpy().astype('datetime64[D]')
+        return ((days - EXCEL_EPOCH).astype('int64')).astype(float).tolist()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(str).tolist()
+    return series.tolist()
+
+
+def _iter_rows(frame):
+    """Построчный обход таблицы без создания объектов pandas на каждую строку"""
+    return zip(*[_column_values(frame[column]) for column in frame.columns])
+
+
+def _write_openpyxl(specs, file_path):
+    """Запись через pandas/openpyxl с форматированием каждой ячейки"""
+    # openpyxl импортируется только при записи книги
+    from openpyxl.styles import Font, Alignment
+    from openpyxl.utils import get_column_letter
+
+    header_font = Font(bold=True)
+    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        for spec in specs:
+            frame = spec['frame']
+            with span('excel_export.write_sheet', rows=len(frame), sheet=spec['name']):
+                frame.to_excel(writer, sheet_name=spec['name'], index=False)
+            worksheet = writer.sheets[spec['name']]
+
+            # Форматируем заголовки
+            for col_idx in range(1, len(frame.columns) + 1):
+                cell = worksheet.cell(row=1, column=col_idx)
+                cell.font = header_font
+                cell.alignment = header_alignment
+
+            # Ширина столбцов
+            for col_idx, width in enumerate(spec['widths'], 1):
+                worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+
+            # Форматы дат и сумм
+            with span('excel_export.format_cells', rows=len(frame), sheet=spec['name']):
+                for col_idx, number_format in enumerate(spec['formats'], 1):
+                    if number_format is None:
+                        continue
+                    for row_idx in range(2, len(frame) + 2):
+                        worksheet.cell(row=row_idx, column=col_idx).number_format = number_format
+
+
+def _write_write_only(specs, file_path):
+    """Потоковая запись openpyxl: строки сразу уходят в файл, стили столбцов создаются один раз"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment
+    from openpyxl.utils import get_column_letter
+
+    header_font = Font(bold=True)
+    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+    workbook = Workbook(write_only=True)
+    for spec in specs:
+        frame = spec['frame']
+        worksheet = workbook.create_sheet(spec['name'])
+
+        # Ширины задаются до первой строки
+        for col_idx, width in enumerate(spec['widths'], 1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+
+        header = []
+        for column in frame.columns:
+            cell = WriteOnlyCell(worksheet, value=str(column))
+            cell.font = header_font
+            cell.alignment = header_alignment
+            header.append(cell)
+        worksheet.append(header)
+
+        # Одна ячейка-шаблон на столбец: формат назначается один раз,
+        # для каждой строки меняется только значение
+        templates = []
+        for number_format in spec['formats']:
+            cell = WriteOnlyCell(worksheet)
+            if number_format is not None:
+                cell.number_format = number_format
+            templates.append(cell)
+
+        with span('excel_export.write_sheet', rows=len(frame), sheet=spec['name']):
+            for values in _iter_rows(frame):
+                for cell, value in zip(templates, values):
+                    cell.value = value
+                worksheet.append(templates)
+
+    with span('excel_export.save'):
+        workbook.save(file_path)
+
+
+def _write_xlsxwriter(specs, file_path):
+    """Потоковая запись xlsxwriter с форматами на уровне столбцов"""
+    try:
+        import xlsxwriter
+    except ImportError:
+        raise ImportError("Для движка 'xlsxwriter' установите пакет: pip install xlsxwriter")
+
+    workbook = xlsxwriter.Workbook(file_path, {'constant_memory': True, 'nan_inf_to_errors': True})
+    header_format = workbook.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter', 'text_wrap': True})
+    formats = {}
+
+    for spec in specs:
+        frame = spec['frame']
+        worksheet = workbook.add_worksheet(spec['name'])
+
+        # Формат столбца применяется ко всем ячейкам без собственного формата
+        for col_idx, (width, number_format) in enumerate(zip(spec['widths'], spec['formats'])):
+            if number_format is not None and number_format not in formats:
+                formats[number_format] = workbook.add_format({'num_format': number_format})
+            worksheet.set_column(col_idx, col_idx, width, formats.get(number_format))
+
+        worksheet.write_row(0, 0, [str(column) for column in frame.columns], header_format)
+        with span('excel_export.write_sheet', rows=len(frame), sheet=spec['name']):
+            for row_idx, values in enumerate(_iter_rows(frame), 1):
+                worksheet.write_row(row_idx, 0, values)
+
+    with span('excel_export.save'):
+        workbook.close()
+
+
+_WRITERS = {
+    'openpyxl': _write_openpyxl,
+    'write_only': _write_write_only,
+    'xlsxwriter': _write_xlsxwriter,
+}
+
+
+@traced(rows=None)
+def write_workbook(df, file_path, sheet_name='Данные ЧОК', date_format='dd.mm.yyyy', engine='openpyxl', df_long=None,
+                   max_rows=EXCEL_MAX_ROWS):
+    """
+    Записывает книгу Excel с листом исходных данных и листом в четырех столбцах
+
+    Параметры:
+    - df: широкая таблица ЧОК
+    - file_path: путь к файлу .xlsx
+    - sheet_name: имя листа с исходными данными
+    - date_format: формат дат Excel ('dd.mm.yyyy' или 'mm.yyyy')
+    - engine: движок записи из ENGINES
+    - df_long: готовая длинная таблица (по умолчанию строится из df)
+    - max_rows: предельное число строк листа; таблицы длиннее делятся на
+      несколько листов (None - не делить)
+    """
+    if engine not in _WRITERS:
+        raise ValueError(f"Неизвестный движок: {engine}. Допустимые значения: {ENGINES}")
+    if df_long is None:
+        df_long = build_long_format(df)
+    # Компактные таблицы (копейки, float32) записываются в рублях
+    df, df_long = to_rubles(df), to_rubles(df_long)
+    _WRITERS[engine](_sheet_specs(df, df_long, sheet_name, date_format, max_rows), file_path)
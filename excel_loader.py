@@ -0,0 +1,130 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Столбцы, наличие которых проверяется по умолчанию
+REQUIRED_COLUMNS = ('Запасы', 'ЧОК')
+
+
+def _open_read_only(file_path):
+    from openpyxl import load_workbook
+    return load_workbook(file_path, read_only=True, data_only=True)
+
+
+def _header_and_rows(worksheet, nrows):
+    """Заголовок листа и первые nrows строк данных (потоково, без чтения всего листа)"""
+    rows = worksheet.iter_rows(min_row=1, max_row=nrows + 1, values_only=True)
+    header = next(rows, ())
+    return list(header), list(rows)
+
+
+def read_header(file_path, sheet_name=None):
+    """
+    Читает только строку заголовков
+
+    Возвращает список столбцов листа sheet_name или, если он не задан,
+    словарь {лист: [столбцы]} для всех листов книги.
+    """
+    workbook = _open_read_only(file_path)
+    try:
+        if sheet_name is not None:
+            return _header_and_rows(workbook[sheet_name], 0)[0]
+        return {worksheet.title: _header_and_rows(worksheet, 0)[0] for worksheet in workbook.worksheets}
+    finally:
+        workbook.close()
+
+
+def _excel_engine():
+    """calamine (если установлен python-calamine) заметно быстрее openpyxl"""
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return 'openpyxl'
+
+
+def read_columns(file_path, columns=None, sheet_name=0, nrows=None, engine=None):
+    """
+    Читает из листа только нужные столбцы и строки
+
+    Параметры:
+    - file_path: путь к книге .xlsx
+    - columns: список столбцов (по умолчанию все)
+    - sheet_name: имя или номер листа
+    - nrows: количество строк данных (по умолчанию все)
+    - engine: движок pandas.read_excel (по умолчанию calamine, если доступен)
+    """
+    import pandas as pd
+    return pd.read_excel(file_path, sheet_name=sheet_name, usecols=columns, nrows=nrows,
+                         engine=engine or _excel_engine())
+
+
+def check_file(file_path, required=REQUIRED_COLUMNS, all_sheets=False, preview=5):
+    """
+    Проверяет наличие столбцов в книге, читая только заголовок и первые строки
+
+    Параметры:
+    - file_path: путь к книге .xlsx
+    - required: проверяемые столбцы
+    - all_sheets: проверять все листы (по умолчанию только первый)
+    - preview: количество первых значений найденных столбцов
+
+    Возвращает словарь с результатами по листам и временем проверки.
+    """
+    start = time.perf_counter()
+    result = {'file': file_path, 'sheets': {}, 'error': None}
+    try:
+        workbook = _open_read_only(file_path)
+        try:
+            worksheets = workbook.worksheets if all_sheets else workbook.worksheets[:1]
+            for worksheet in worksheets:
+                header, rows = _header_and_rows(worksheet, preview)
+                found = {column: header.index(column) for column in required if column in header}
+                result['sheets'][worksheet.title] = {
+                    'columns': header,
+                    'missing': [column for column in required if column not in found],
+                    'preview': {column: [row[idx] for row in rows] for column, idx in found.items()},
+                }
+        finally:
+            workbook.close()
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _check_file_task(args):
+    return check_file(*args)
+
+
+def check_directory(directory, pattern='financial_dataset*.xlsx', required=REQUIRED_COLUMNS,
+                    all_sheets=False, preview=5, max_workers=None):
+    """
+    Проверяет все книги каталога по шаблону параллельно в пуле процессов
+
+    Возвращает список результатов check_file в порядке имен файлов.
+    """
+    files = sorted(glob.glob(os.path.join(directory, pattern)))
+    if len(files) <= 1 or max_workers == 1:
+        return [check_file(file_path, required, all_sheets, preview) for file_path in files]
+    tasks = [(file_path, required, all_sheets, preview) for file_path in files]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_check_file_task, tasks))
+
+
+def print_report(result, list_columns=False):
+    """Печатает результат check_file"""
+    print(f"\nФайл {result['file']} ({result['seconds']:.3f} с)")
+    if result['error']:
+        print(f"Ошибка чтения: {result['error']}")
+        return
+    for sheet, info in result['sheets'].items():
+        print(f"Лист '{sheet}': столбцов {len(info['columns'])}")
+        if list_columns:
+            for i, column in enumerate(info['columns'], 1):
+                print(f"{i}. {column}")
+        for column, values in info['preview'].items():
+            print(f"Столбец '{column}' найден. Первые {len(values)} значений: {values}")
+        for column in info['missing']:
+            print(f"Столбец '{column}' НЕ найден!")
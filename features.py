@@ -0,0 +1,276 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from date_index import infer_freq
+from instrumentation import traced
+from series_engine import to_datetime64
+
+# Наборы признаков по частотам: лаги и окна скользящих статистик в периодах
+# индекса, статистики окна, календарные признаки и отношение к прошлому году
+FEATURE_SETS = {
+    'D': {'lags': (1, 5, 21), 'windows': (5, 21, 63), 'stats': ('mean', 'std'),
+          'calendar': ('month', 'weekday'), 'yoy': True},
+    'W': {'lags': (1, 4, 13), 'windows': (4, 13), 'stats': ('mean', 'std'),
+          'calendar': ('month',), 'yoy': True},
+    'M': {'lags': (1, 3, 12), 'windows': (3, 6, 12), 'stats': ('mean', 'std'),
+          'calendar': ('month',), 'yoy': True},
+    'Q': {'lags': (1, 4), 'windows': (2, 4), 'stats': ('mean', 'std'),
+          'calendar': ('quarter',), 'yoy': True},
+}
+
+# Статистики окна: имя -> (подпись, функция по последней оси окон)
+WINDOW_STATS = {
+    'mean': ('среднее', lambda windows: windows.mean(axis=-1)),
+    'std': ('ст. откл.', lambda windows: windows.std(axis=-1, ddof=1)),
+    'min': ('минимум', lambda windows: windows.min(axis=-1)),
+    'max': ('максимум', lambda windows: windows.max(axis=-1)),
+}
+
+WEEKDAY_NAMES = ('Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс')
+
+# Календарные признаки: имя -> (подписи индикаторов, номер индикатора по датам)
+CALENDAR_FEATURES = {
+    'month': ([f"Месяц {month}" for month in range(1, 13)],
+              lambda dates: dates.astype('datetime64[M]').astype('int64') % 12),
+    'quarter': ([f"Квартал {quarter}" for quarter in range(1, 5)],
+                lambda dates: dates.astype('datetime64[M]').astype('int64') % 12 // 3),
+    # 1970-01-01 - четверг: (дни + 3) % 7 - номер дня недели с понедельника
+    'weekday': ([f"День недели: {name}" for name in WEEKDAY_NAMES],
+                lambda dates: (dates.astype('int64') + 3) % 7),
+}
+
+
+def default_targets(columns):
+    """Ряды для признаков по умолчанию: ЧОК, Запасы и все столбцы 'ДЗ:'/'КЗ:'"""
+    return ([column for column in ('ЧОК', 'Запасы') if column in columns]
+            + [column for column in columns if column.startswith(('ДЗ:', 'КЗ:'))])
+
+
+def year_ago(dates):
+    """Та же дата годом ранее (29 февраля -> 28 февраля)"""
+    months = dates.astype('datetime64[M]')
+    previous = months - 12
+    same_day = previous.astype('datetime64[D]') + (dates - months.astype('datetime64[D]'))
+    return np.minimum(same_day, (previous + 1).astype('datetime64[D]') - 1)
+
+
+def feature_names(targets, spec):
+    """Имена признаков в порядке столбцов build_features"""
+    names = []
+    for lag in spec['lags']:
+        names += [f"{column} (лаг {lag})" for column in targets]
+    for window in spec['windows']:
+        for stat in spec['stats']:
+            names += [f"{column} ({WINDOW_STATS[stat][0]} {window})" for column in targets]
+    if spec['yoy']:
+        names += [f"{column} (г/г)" for column in targets]
+    for feature in spec['calendar']:
+        names += CALENDAR_FEATURES[feature][0]
+    return names
+
+
+def _compute(values, dates, spec, start):
+    """
+    Признаки строк values[start:] по всем рядам сразу
+
+    Строки до start - история: они нужны для лагов, окон и сравнения с
+    прошлым годом, но признаки для них не возвращаются. Лаги и окна,
+    выходящие за начало истории, дают NaN.
+    """
+    n_rows, n_series = values.shape
+    blocks = []
+    for lag in spec['lags']:
+        block = np.full((n_rows, n_series), np.nan)
+        if lag < n_rows:
+            block[lag:] = values[:n_rows - lag]
+        blocks.append(block[start:])
+    for window in spec['windows']:
+        # Окна - представление массива без копирования: (n_rows - window + 1, n_series, window)
+        windows = sliding_window_view(values, window, axis=0) if n_rows >= window else None
+        for stat in spec['stats']:
+            block = np.full((n_rows, n_series), np.nan)
+            if windows is not None:
+                block[window - 1:] = WINDOW_STATS[stat][1](windows)
+            blocks.append(block[start:])
+    if spec['yoy']:
+        # Последняя дата индекса, не позже той же даты годом ранее
+        position = np.searchsorted(dates, year_ago(dates[start:]), side='right') - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            block = values[start:] / values[np.maximum(position, 0)]
+        block[position < 0] = np.nan
+        blocks.append(block)
+    for feature in spec['calendar']:
+        labels, codes = CALENDAR_FEATURES[feature]
+        blocks.append(np.eye(len(labels))[codes(dates[start:])])
+    return np.hstack(blocks) if blocks else np.empty((n_rows - start, 0))
+
+
+class FeatureBuilder:
+    """
+    Построитель признаков с состоянием
+
+    Хранит объявленный набор признаков и хвост истории рядов, достаточный
+    для лагов, окон и сравнения с прошлым годом. Последовательные вызовы
+    update для смежных участков индекса дают те же признаки, что и один
+    вызов для всего периода, поэтому признаки можно досчитывать по мере
+    дописывания новых периодов (DatasetGenerator.iter_chunks, append_dataset).
+
+    Параметры:
+    - columns: столбцы массива значений (как DatasetGenerator.columns)
+    - freq: частота индекса - определяет набор признаков по умолчанию
+    - feature_set: изменения набора признаков (словарь как FEATURE_SETS[freq])
+    - targets: ряды для признаков (по умолчанию default_targets(columns))
+    """
+
+    def __init__(self, columns, freq='D', feature_set=None, targets=None):
+        if freq not in FEATURE_SETS:
+            raise ValueError(f"Неизвестная частота: {freq}. Допустимые значения: {tuple(FEATURE_SETS)}")
+        self.freq = freq
+        self.spec = dict(FEATURE_SETS[freq], **(feature_set or {}))
+        unknown = ([stat for stat in self.spec['stats'] if stat not in WINDOW_STATS]
+                   + [feature for feature in self.spec['calendar'] if feature not in CALENDAR_FEATURES])
+        if unknown:
+            raise ValueError(f"Неизвестные признаки: {unknown}. Допустимые значения: "
+                             f"{tuple(WINDOW_STATS)}, {tuple(CALENDAR_FEATURES)}")
+        self.columns = list(columns)
+        self.targets = list(default_targets(self.columns) if targets is None else targets)
+        self.positions = [self.columns.index(column) for column in self.targets]
+        self.names = feature_names(self.targets, self.spec)
+
+        # История: последние значения рядов и их даты
+        self.history = np.empty((0, len(self.targets)))
+        self.history_dates = np.empty(0, dtype='datetime64[D]')
+
+    @property
+    def depth(self):
+        """Число последних периодов, нужных для лагов и окон"""
+        return max(max(self.spec['lags'], default=0), max(self.spec['windows'], default=1) - 1)
+
+    @traced(rows=lambda result: result.shape[0])
+    def update(self, values, dates):
+        """
+        Признаки следующих периодов
+
+        values - массив (n_dates, len(columns)), dates - их даты, продолжающие
+        ранее переданные. Возвращает массив (n_dates, len(names)).
+        """
+        dates = to_datetime64(dates)
+        if len(dates) and len(self.history_dates) and dates[0] <= self.history_dates[-1]:
+            raise ValueError(f"Даты должны продолжать набор: {dates[0]} не позже {self.history_dates[-1]}")
+        values = np.asarray(values, dtype=float)[:, self.positions]
+        start = len(self.history)
+        all_values = np.concatenate([self.history, values])
+        all_dates = np.concatenate([self.history_dates, dates])
+        features = _compute(all_values, all_dates, self.spec, start)
+
+        # Оставляем историю для следующих периодов: окна/лаги и даты не ранее года назад
+        keep = len(all_dates) - self.depth
+        if self.spec['yoy'] and len(all_dates):
+            position = np.searchsorted(all_dates, year_ago(all_dates[-1:]), side='right')[0] - 1
+            keep = min(keep, max(position, 0))
+        keep = max(keep, 0)
+        self.history = all_values[keep:].copy()
+        self.history_dates = all_dates[keep:].copy()
+        return features
+
+    def update_frame(self, df):
+        """Признаки следующих периодов для широкой таблицы (с 'Дата'); индекс - как у df"""
+        features = self.update(df[self.columns].to_numpy(dtype=float), df['Дата'])
+        return pd.DataFrame(features, columns=self.names, index=df.index)
+
+    def state(self):
+        """Состояние в виде словаря, сериализуемого в JSON (набор признаков и история)"""
+        return {
+            'freq': self.freq,
+            'feature_set': {key: list(value) if isinstance(value, tuple) else value for key, value in self.spec.items()},
+            'columns': self.columns,
+            'targets': self.targets,
+            'history': self.history.tolist(),
+            'history_dates': [str(date) for date in self.history_dates],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Восстанавливает построитель из словаря state()"""
+        builder = cls(state['columns'], state['freq'], state['feature_set'], state['targets'])
+        builder.history = np.array(state['history'], dtype=float).reshape(-1, len(builder.targets))
+        builder.history_dates = np.array(state['history_dates'], dtype='datetime64[D]')
+        return builder
+
+
+def build_features(values, dates, columns, freq='D', feature_set=None, targets=None):
+    """
+    Строит признаки для массива значений (как у generate_dataset_values)
+
+    Возвращает (массив признаков (n_dates, n_features), имена признаков).
+    """
+    builder = FeatureBuilder(columns, freq, feature_set, targets)
+    return builder.update(values, dates), builder.names
+
+
+@traced()
+def add_features(df, freq=None, feature_set=None, targets=None):
+    """
+    Добавляет признаки к широкой таблице ЧОК
+
+    Подходит для наборов generate_dataset, dataset.py (рабочие дни) и
+    dataset2.py (месяцы). Частота по умолчанию определяется по датам.
+
+    Признаки (для каждого ряда из targets):
+    - '<ряд> (лаг L)' - значение L периодов назад;
+    - '<ряд> (среднее W)', '<ряд> (ст. откл. W)' - статистики окна из W
+      последних периодов, включая текущий;
+    - '<ряд> (г/г)' - отношение к значению на ту же дату год назад
+      (последняя дата индекса не позже нее);
+    - индикаторы месяца, квартала или дня недели.
+    Где истории недостаточно, признак равен NaN.
+    """
+    freq = infer_freq(df['Дата']) if freq is None else freq
+    columns = [column for column in df.columns if column != 'Дата']
+    builder = FeatureBuilder(columns, freq, feature_set, targets)
+    return pd.concat([df, builder.update_frame(df)], axis=1)
+
+
+def iter_features(chunks, freq='D', feature_set=None, targets=None):
+    """
+    Добавляет признаки к потоку частей широкой таблицы
+
+    Части должны идти по времени (iter_dataset_chunks,
+    DatasetGenerator.iter_chunks); склеенный результат совпадает с
+    add_features для всего набора.
+    """
+    builder = None
+    for chunk in chunks:
+        if builder is None:
+            columns = [column for column in chunk.columns if column != 'Дата']
+            builder = FeatureBuilder(columns, freq, feature_set, targets)
+        yield pd.concat([chunk, builder.update_frame(chunk)], axis=1)
+
+
+def generate_dataset_features(freq='D', feature_set=None, targets=None, **params):
+    """Генерирует набор данных ЧОК (параметры generate_dataset) и добавляет к нему признаки"""
+    from chok_generator import generate_dataset
+
+    return add_features(generate_dataset(freq=freq, **params), freq, feature_set, targets)
+
+
+if __name__ == "__main__":
+    from chok_generator import FREQUENCY_SETTINGS, generate_dataset
+
+    parser = argparse.ArgumentParser(description="Признаки для прогнозирования по набору данных ЧОК")
+    parser.add_argument('--freq', choices=tuple(FREQUENCY_SETTINGS), default='D', help="частота индекса")
+    parser.add_argument('--output', help="файл Parquet для набора с признаками")
+    args = parser.parse_args()
+
+    df = generate_dataset(args.freq)
+    start = time.perf_counter()
+    result = add_features(df, args.freq)
+    print(f"Строк: {len(result)}, признаков: {len(result.columns) - len(df.columns)}, "
+          f"время: {time.perf_counter() - start:.3f} с")
+    if args.output:
+        result.to_parquet(args.output, index=False)
+        print(f"Данные успешно экспортированы в файл: {args.output}")
@@ -0,0 +1,159 @@
+import argparse
+import datetime as dt
+import glob
+import json
+import os
+import time
+
+from chok_generator import DEFAULT_END_DATE, DEFAULT_START_DATE, FREQUENCY_SETTINGS, DatasetGenerator, make_date_index
+from output_sinks import DEFAULT_OUTPUT_DIR, LONG_SUFFIX
+from random_state import DEFAULT_SEED
+from streaming import write_chunks
+
+# Файл состояния генератора рядом с данными: <имя>_state.json
+STATE_SUFFIX = '_state.json'
+
+
+def state_path(name, output_dir=None):
+    output_dir = DEFAULT_OUTPUT_DIR if output_dir is None else output_dir
+    return os.path.join(output_dir, name + STATE_SUFFIX)
+
+
+def data_marks(name, output_dir=None, formats=('parquet',)):
+    """
+    Точка отката данных набора: размеры файлов CSV и число частей Parquet
+
+    Ключи - имена файлов и каталогов в output_dir.
+    """
+    output_dir = DEFAULT_OUTPUT_DIR if output_dir is None else output_dir
+    marks = {}
+    for suffix in ('', LONG_SUFFIX):
+        if 'csv' in formats:
+            path = os.path.join(output_dir, name + suffix + '.csv')
+            marks[os.path.basename(path)] = os.path.getsize(path) if os.path.exists(path) else 0
+        if 'parquet' in formats:
+            path = os.path.join(output_dir, name + suffix + '.parquet')
+            marks[os.path.basename(path)] = len(glob.glob(os.path.join(path, 'part-*.parquet')))
+    return marks
+
+
+def rollback(output_dir, marks):
+    """
+    Отбрасывает данные, записанные после точки отката data_marks
+
+    Прерванное дописывание оставляет части без сохраненного состояния;
+    без отката следующий запуск записал бы эти строки повторно.
+    """
+    output_dir = DEFAULT_OUTPUT_DIR if output_dir is None else output_dir
+    for name, mark in marks.items():
+        path = os.path.join(output_dir, name)
+        if name.endswith('.csv'):
+            if mark == 0 and os.path.exists(path):
+                # Файл без заголовка: следующая запись создаст его заново
+                os.remove(path)
+            elif os.path.exists(path) and os.path.getsize(path) > mark:
+                os.truncate(path, mark)
+        else:
+            for part in glob.glob(os.path.join(path, 'part-*.parquet')):
+                if int(os.path.basename(part)[len('part-'):-len('.parquet')]) >= mark:
+                    os.remove(part)
+
+
+def save_state(path, generator, formats, start_date, marks):
+    """
+    Атомарно записывает состояние генератора, список форматов, начало
+    периода и точку отката данных (после того как данные записаны)
+    """
+    tmp_path = path + '.tmp'
+    state = {'formats': list(formats), 'start_date': str(start_date), 'marks': marks,
+             'generator': generator.state()}
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def load_state(path):
+    """Возвращает (DatasetGenerator, состояние набора) из файла состояния"""
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    return DatasetGenerator.from_state(state['generator']), state
+
+
+def create_dataset(name, output_dir=None, formats=('parquet',), chunk_size=None, freq='D',
+                   start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE,
+                   series_spec=None, debtor_names=None, creditor_names=None, seed=DEFAULT_SEED):
+    """
+    Создает набор данных, который можно продолжать через append_dataset
+
+    Данные пишутся частями (streaming.write_chunks) в CSV или каталоги
+    Parquet, рядом сохраняется состояние генератора <имя>_state.json.
+
+    Возвращает (словарь {формат: [пути]}, число строк).
+    """
+    generator = DatasetGenerator(freq, series_spec, debtor_names, creditor_names, seed)
+    dates = make_date_index(freq, start_date, end_date)
+    result = write_chunks(generator.iter_chunks(dates, chunk_size), name, output_dir, formats)
+    save_state(state_path(name, output_dir), generator, formats, start_date, data_marks(name, output_dir, formats))
+    return result
+
+
+def append_dataset(name, end_date, output_dir=None, chunk_size=None):
+    """
+    Дописывает в набор периоды после последней сохраненной даты по end_date
+
+    Генератор восстанавливается из <имя>_state.json (уровень тренда, доли
+    контрагентов, положение потоков шума), поэтому новые строки совпадают
+    с теми, что дала бы полная генерация до end_date, а время работы
+    пропорционально числу новых строк. Широкая и длинная таблицы
+    дополняются во всех форматах набора. Набор, созданный за пустой
+    период, дописывается с начала этого периода.
+
+    Состояние сохраняется только после записи данных; данные прерванного
+    дописывания отбрасываются при следующем запуске (rollback).
+
+    Возвращает (словарь {формат: [пути]}, число новых строк).
+    """
+    path = state_path(name, output_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Нет состояния набора {path}: создайте набор через create_dataset")
+    generator, state = load_state(path)
+    formats = state['formats']
+    rollback(output_dir, state['marks'])
+
+    if generator.last_date is None:
+        dates = make_date_index(generator.freq, state['start_date'], end_date)
+    else:
+        dates = make_date_index(generator.freq, generator.last_date.astype(dt.date) + dt.timedelta(days=1), end_date)
+        dates = dates[dates > generator.last_date]
+    if not len(dates):
+        return {fmt: [] for fmt in formats}, 0
+
+    result = write_chunks(generator.iter_chunks(dates, chunk_size), name, output_dir, formats, append=True)
+    save_state(path, generator, formats, state['start_date'], data_marks(name, output_dir, formats))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Создание и дополнение наборов данных ЧОК новыми периодами")
+    parser.add_argument('command', choices=('create', 'append'), help="create - новый набор, append - дописать периоды")
+    parser.add_argument('--name', default='financial_dataset_incremental', help="имя набора")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help="каталог набора")
+    parser.add_argument('--freq', choices=tuple(FREQUENCY_SETTINGS), default='D', help="частота индекса (create)")
+    parser.add_argument('--start', type=dt.date.fromisoformat, default=DEFAULT_START_DATE, help="начало периода (create)")
+    parser.add_argument('--end', type=dt.date.fromisoformat, default=None,
+                        help="конец периода (по умолчанию: create - 2024-12-31, append - сегодня)")
+    parser.add_argument('--formats', nargs='+', default=['parquet'], help="форматы: csv parquet (create)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="зерно генератора (create)")
+    parser.add_argument('--chunk-size', type=int, default=None, help="число периодов в части")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'create':
+        paths, rows = create_dataset(args.name, args.output_dir, args.formats, args.chunk_size, freq=args.freq,
+                                     start_date=args.start, end_date=args.end or DEFAULT_END_DATE, seed=args.seed)
+    else:
+        paths, rows = append_dataset(args.name, args.end or dt.date.today(), args.output_dir, args.chunk_size)
+    print(f"Строк записано: {rows}, время: {time.perf_counter() - start:.2f} с")
+    for fmt, files in paths.items():
+        for file_path in files:
+            print(f"Данные: {file_path}")
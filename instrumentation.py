@@ -0,0 +1,217 @@
+import atexit
+import functools
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+# Переменные окружения:
+# CHOK_PROFILE=1 - включить замеры; CHOK_PROFILE=<путь.json> - также
+# записать отчет в файл при завершении процесса
+# CHOK_PROFILE_MEMORY=1 - дополнительно замерять память (tracemalloc, медленнее)
+PROFILE_ENV = 'CHOK_PROFILE'
+MEMORY_ENV = 'CHOK_PROFILE_MEMORY'
+
+logger = logging.getLogger('chok.profile')
+
+_enabled = False
+_memory = False
+_spans = []
+_stack = []
+
+
+def enabled():
+    return _enabled
+
+
+def enable(memory=False):
+    """Включает запись замеров (memory=True - с приращением и пиком памяти)"""
+    global _enabled, _memory
+    _enabled = True
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+
+def reset():
+    """Удаляет накопленные замеры"""
+    _spans.clear()
+
+
+class _NullSpan:
+    """Пустой участок: используется, когда замеры выключены"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Замер участка: время, число строк и (при включенной памяти)
+    приращение и пик памяти по tracemalloc
+
+    Дополнительные поля (например, rows) задаются аргументами span(...)
+    или методом set внутри блока.
+    """
+
+    def __init__(self, name, fields):
+        self.record = dict(name=name, **fields)
+
+    def set(self, **fields):
+        self.record.update(fields)
+
+    def __enter__(self):
+        self.record['depth'] = len(_stack)
+        self.record['parent'] = _stack[-1].record['name'] if _stack else None
+        _stack.append(self)
+        if _memory:
+            current, self._outer_peak = tracemalloc.get_traced_memory()
+            self._memory_start = current
+            self._inner_peak = current
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record['seconds'] = time.perf_counter() - self._start
+        _stack.pop()
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Пик вложенных участков сброшен reset_peak, поэтому учитывается отдельно
+            peak = max(peak, self._inner_peak)
+            self.record['memory_delta_mb'] = (current - self._memory_start) / 1024 ** 2
+            self.record['memory_peak_mb'] = (peak - self._memory_start) / 1024 ** 2
+            if _stack:
+                _stack[-1]._inner_peak = max(_stack[-1]._inner_peak, peak, self._outer_peak)
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+        _spans.append(self.record)
+        return False
+
+
+def span(name, **fields):
+    """
+    Контекстный менеджер замера участка
+
+        with span('export.save', rows=len(df)) as s:
+            ...
+            s.set(sheets=2)
+
+    При выключенных замерах возвращает пустой объект без накладных расходов.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, fields)
+
+
+def _default_rows(result):
+    """Число строк результата: длина таблицы, массива или списка"""
+    shape = getattr(result, 'shape', None)
+    if shape:
+        return int(shape[0])
+    return len(result) if isinstance(result, list) else None
+
+
+def traced(name=None, rows=_default_rows):
+    """
+    Декоратор замера функции
+
+    Имя участка по умолчанию - модуль.функция; rows(result) определяет число
+    строк результата (по умолчанию длина таблицы, списка или ряда).
+    При выключенных замерах добавляет только одну проверку флага.
+    """
+    def decorator(func):
+        # Имя модуля берется из файла, чтобы при запуске скрипта не было '__main__'
+        module = os.path.splitext(os.path.basename(func.__code__.co_filename))[0]
+        span_name = name or f"{module}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(span_name, {}) as s:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    s.set(rows=rows(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def summary():
+    """Сводка по участкам: число вызовов, суммарное и максимальное время, строки, память"""
+    result = {}
+    for record in _spans:
+        item = result.setdefault(record['name'], {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0})
+        item['calls'] += 1
+        item['seconds'] += record['seconds']
+        item['max_seconds'] = max(item['max_seconds'], record['seconds'])
+        item['rows'] += record.get('rows') or 0
+        if 'memory_peak_mb' in record:
+            item['memory_peak_mb'] = max(item.get('memory_peak_mb', 0.0), record['memory_peak_mb'])
+            item['memory_delta_mb'] = item.get('memory_delta_mb', 0.0) + record['memory_delta_mb']
+    return result
+
+
+def report():
+    """Отчет для выгрузки: сводка и список всех замеров в порядке завершения"""
+    return {'pid': os.getpid(), 'created': time.time(), 'summary': summary(), 'spans': list(_spans)}
+
+
+def write_report(file_path):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(report(), f, ensure_ascii=False, indent=2)
+
+
+def log_summary(log=logger, level=logging.INFO):
+    """Пишет сводку в журнал одной JSON-строкой на участок"""
+    for name, item in summary().items():
+        log.log(level, json.dumps(dict(span=name, **item), ensure_ascii=False))
+
+
+def print_summary():
+    items = summary()
+    if not items:
+        return
+    print(f"\n{'Участок':<45} {'вызовов':>8} {'время, с':>10} {'строк':>10}")
+    for name, item in sorted(items.items(), key=lambda pair: -pair[1]['seconds']):
+        memory = f"  пик {item['memory_peak_mb']:.1f} МБ" if 'memory_peak_mb' in item else ""
+        print(f"{name:<45} {item['calls']:>8} {item['seconds']:>10.3f} {item['rows'] or '':>10}{memory}")
+
+
+def configure(profile=None, memory=None):
+    """
+    Включает замеры по флагу командной строки или переменным окружения
+
+    profile: None - по CHOK_PROFILE; True - включить; строка - включить и
+    записать JSON-отчет в этот файл при завершении процесса.
+    """
+    profile = os.environ.get(PROFILE_ENV) if profile is None else profile
+    if memory is None:
+        memory = os.environ.get(MEMORY_ENV, '') not in ('', '0')
+    if profile in (None, False, '', '0'):
+        return
+    enable(memory)
+    if isinstance(profile, str) and profile not in ('1', 'true'):
+        atexit.register(write_report, profile)
+
+
+configure()
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+
+LONG_COLUMNS = ['Дата', 'Статья', 'Контрагент', 'Сумма']
+
+
+def column_mapping(columns):
+    """
+    Строит таблицу соответствия столбец -> (Статья, Контрагент)
+
+    Столбец 'Дата' пропускается. Правила совпадают с листом
+    'Данные ЧОК (4 столбца)':
+    - 'ДЗ: <имя>' -> ('Дебиторская задолженность', <имя>)
+    - 'КЗ: <имя>' -> ('Кредиторская задолженность', <имя>)
+    - '... ИТОГО' -> (соответствующая статья, 'ИТОГО')
+    - прочие столбцы -> (имя столбца, 'Н/Д')
+    """
+    rows = []
+    for column in columns:
+        if column == 'Дата':  # Пропускаем столбец с датами
+            continue
+
+        if column.startswith('ДЗ:'):
+            статья = 'Дебиторская задолженность'
+            контрагент = column[3:].strip()  # Убираем префикс "ДЗ: "
+        elif column.startswith('КЗ:'):
+            статья = 'Кредиторская задолженность'
+            контрагент = column[3:].strip()  # Убираем префикс "КЗ: "
+        elif column == 'Дебиторская задолженность ИТОГО':
+            статья = 'Дебиторская задолженность'
+            контрагент = 'ИТОГО'
+        elif column == 'Кредиторская задолженность ИТОГО':
+            статья = 'Кредиторская задолженность'
+            контрагент = 'ИТОГО'
+        else:
+            статья = column
+            контрагент = 'Н/Д'  # Не применимо
+        rows.append((column, статья, контрагент))
+
+    return pd.DataFrame(rows, columns=['Столбец', 'Статья', 'Контрагент'])
+
+
+@traced()
+def build_long_format(df, mapping=None):
+    """
+    Преобразует широкую таблицу ЧОК в длинную (Дата, Статья, Контрагент, Сумма) за один проход
+
+    Строки упорядочены по дате, внутри даты - в порядке столбцов широкой
+    таблицы. Статья и Контрагент хранятся как категориальные столбцы,
+    поэтому память под подписи не растет с числом дат.
+
+    Параметры:
+    - df: широкая таблица с столбцом 'Дата'
+    - mapping: таблица соответствия из column_mapping (по умолчанию строится по df)
+    """
+    if mapping is None:
+        mapping = column_mapping(df.columns)
+
+    n_dates = len(df)
+    n_columns = len(mapping)
+
+    # Значения по строкам: для каждой даты подряд идут все столбцы
+    # (тип сумм сохраняется, в том числе копейки int64 из compact_frame)
+    values = df[mapping['Столбец'].tolist()].to_numpy().ravel()
+    dates = np.repeat(df['Дата'].to_numpy(), n_columns)
+
+    # Коды категорий повторяются для каждой даты без копирования строк
+    статья = pd.Categorical(mapping['Статья'], categories=pd.unique(mapping['Статья']))
+    контрагент = pd.Categorical(mapping['Контрагент'], categories=pd.unique(mapping['Контрагент']))
+
+    return pd.DataFrame({
+        'Дата': dates,
+        'Статья': pd.Categorical.from_codes(np.tile(статья.codes, n_dates), статья.categories),
+        'Контрагент': pd.Categorical.from_codes(np.tile(контрагент.codes, n_dates), контрагент.categories),
+        'Сумма': values
+    })
@@ -0,0 +1,115 @@
+import os
+
+import pandas as pd
+
+from excel_export import write_workbook
+from instrumentation import span, traced
+from long_format import build_long_format
+
+# Каталог по умолчанию для всех выходных файлов (переопределяется переменной окружения)
+DEFAULT_OUTPUT_DIR = os.environ.get('CHOK_OUTPUT_DIR', r"C:\OrangeDM_book_TS")
+
+# Суффикс файла с длинной таблицей (Дата, Статья, Контрагент, Сумма) для колоночных форматов
+LONG_SUFFIX = '_long'
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"Для формата '{fmt}' установите пакет: pip install pyarrow")
+
+
+def _write_xlsx(df, df_long, base_path, options):
+    """Книга Excel с двумя листами"""
+    file_path = base_path + '.xlsx'
+    write_workbook(
+        df, file_path,
+        sheet_name=options.get('sheet_name', 'Данные ЧОК'),
+        date_format=options.get('date_format', 'dd.mm.yyyy'),
+        engine=options.get('engine', 'openpyxl'),
+        df_long=df_long
+    )
+    return [file_path]
+
+
+def _write_parquet(df, df_long, base_path, options):
+    """Широкая и длинная таблицы в Parquet (категории сохраняются как словари)"""
+    _require_pyarrow('parquet')
+    paths = [base_path + '.parquet', base_path + LONG_SUFFIX + '.parquet']
+    compression = options.get('compression', 'snappy')
+    df.to_parquet(paths[0], index=False, compression=compression)
+    df_long.to_parquet(paths[1], index=False, compression=compression)
+    return paths
+
+
+def _write_feather(df, df_long, base_path, options):
+    """Широкая и длинная таблицы в Feather без сжатия (пригодны для memory-map)"""
+    _require_pyarrow('feather')
+    paths = [base_path + '.feather', base_path + LONG_SUFFIX + '.feather']
+    compression = options.get('compression', 'uncompressed')
+    df.to_feather(paths[0], compression=compression)
+    df_long.to_feather(paths[1], compression=compression)
+    return paths
+
+
+# Реестр приемников: формат -> функция (df, df_long, base_path, options) -> список путей
+SINKS = {
+    'xlsx': _write_xlsx,
+    'parquet': _write_parquet,
+    'feather': _write_feather,
+}
+
+
+def register_sink(fmt, writer):
+    """Регистрирует дополнительный формат вывода"""
+    SINKS[fmt] = writer
+
+
+@traced(rows=None)
+def export_dataset(df, name, output_dir=None, formats=('xlsx',), **options):
+    """
+    Сохраняет набор данных ЧОК во всех запрошенных форматах
+
+    Длинная таблица строится один раз и переиспользуется всеми приемниками.
+
+    Параметры:
+    - df: широкая таблица из generate_dataset
+    - name: имя файла без расширения (например, 'financial_dataset')
+    - output_dir: каталог вывода (по умолчанию DEFAULT_OUTPUT_DIR)
+    - formats: форматы из SINKS ('xlsx', 'parquet', 'feather')
+    - options: параметры приемников (sheet_name, date_format, engine, compression)
+
+    Возвращает словарь {формат: [пути к файлам]}.
+    """
+    unknown = [fmt for fmt in formats if fmt not in SINKS]
+    if unknown:
+        raise ValueError(f"Неизвестные форматы: {unknown}. Допустимые значения: {tuple(SINKS)}")
+
+    output_dir = DEFAULT_OUTPUT_DIR if output_dir is None else output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    base_path = os.path.join(output_dir, name)
+
+    df_long = build_long_format(df)
+    paths = {}
+    for fmt in formats:
+        with span(f'output_sinks.{fmt}', rows=len(df)):
+            paths[fmt] = SINKS[fmt](df, df_long, base_path, options)
+    return paths
+
+
+def read_columnar(file_path, columns=None):
+    """
+    Читает широкую или длинную таблицу из Parquet/Feather
+
+    Читаются только столбцы из columns (по умолчанию все). Feather-файлы
+    открываются через memory-map.
+    """
+    if file_path.endswith('.feather'):
+        _require_pyarrow('feather')
+        from pyarrow import feather
+        return feather.read_table(file_path, columns=columns, memory_map=True).to_pandas()
+    if file_path.endswith('.parquet'):
+        _require_pyarrow('parquet')
+        return pd.read_parquet(file_path, columns=columns, memory_map=True)
+    raise ValueError(f"Неподдерживаемый формат файла: {file_path}")
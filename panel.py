@@ -0,0 +1,310 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from chok_generator import (DEFAULT_END_DATE, DEFAULT_SERIES_SPEC, DEFAULT_START_DATE, FREQUENCY_SETTINGS,
+                            SERIES_ORDER, make_date_index)
+from counterparties import DEBTOR_NAMES, CREDITOR_NAMES
+from random_state import DEFAULT_SEED, spawn_generators
+from series_engine import generate_series
+
+# Уровни свода: юрлицо, сегмент, группа в целом
+LEVELS = ('Юрлицо', 'Сегмент', 'Группа')
+GROUP_NAME = 'Группа'
+
+# Статьи длинной таблицы в порядке column_mapping
+ARTICLES = ['Материалы', 'Готовая продукция', 'Дебиторская задолженность', 'Кредиторская задолженность',
+            'Запасы', 'ЧОК']
+MATERIALS, FINISHED_GOODS, RECEIVABLES, PAYABLES, INVENTORY, WORKING_CAPITAL = range(len(ARTICLES))
+
+
+class Panel:
+    """
+    Набор данных ЧОК группы компаний: куб (юрлицо x дата x статья)
+
+    Атрибуты:
+    - entities: таблица юрлиц (Юрлицо, Сегмент)
+    - freq: частота индекса
+    - dates: индекс datetime64[D]
+    - materials, finished_goods: массивы (n_entities, n_dates)
+    - debtors, creditors: массивы (n_entities, n_dates, n_slots) сумм по
+      контрагентам каждого юрлица
+    - debtor_codes, creditor_codes: номера контрагентов слотов в
+      counterparties (n_entities, n_slots)
+    - counterparties: индекс всех контрагентов (внешние и юрлица группы)
+    """
+
+    def __init__(self, entities, freq, dates, materials, finished_goods, debtors, creditors,
+                 debtor_codes, creditor_codes, counterparties):
+        self.entities = entities
+        self.freq = freq
+        self.dates = dates
+        self.materials = materials
+        self.finished_goods = finished_goods
+        self.debtors = debtors
+        self.creditors = creditors
+        self.debtor_codes = debtor_codes
+        self.creditor_codes = creditor_codes
+        self.counterparties = counterparties
+
+    @property
+    def n_entities(self):
+        return len(self.entities)
+
+    def entity_frame(self, entity):
+        """Широкая таблица одного юрлица (номер или имя) в формате generate_dataset"""
+        if not isinstance(entity, (int, np.integer)):
+            entity = self.entities.index[self.entities['Юрлицо'] == entity][0]
+        names = self.counterparties
+        df = pd.DataFrame({
+            'Дата': pd.to_datetime(self.dates),
+            'Материалы': self.materials[entity],
+            'Готовая продукция': self.finished_goods[entity],
+        })
+        debtors = pd.DataFrame(self.debtors[entity], columns=[f"ДЗ: {names[c]}" for c in self.debtor_codes[entity]])
+        creditors = pd.DataFrame(self.creditors[entity],
+                                 columns=[f"КЗ: {names[c]}" for c in self.creditor_codes[entity]])
+        df = pd.concat([df, debtors, creditors], axis=1)
+        df['Дебиторская задолженность ИТОГО'] = self.debtors[entity].sum(axis=1)
+        df['Кредиторская задолженность ИТОГО'] = self.creditors[entity].sum(axis=1)
+        df['Запасы'] = df['Материалы'] + df['Готовая продукция']
+        df['ЧОК'] = df['Запасы'] + df['Дебиторская задолженность ИТОГО'] - df['Кредиторская задолженность ИТОГО']
+        return df
+
+    def _labels(self):
+        """Категории контрагентов длинной таблицы: Н/Д, контрагенты, ИТОГО"""
+        return pd.Index(['Н/Д'] + self.counterparties.tolist() + ['ИТОГО'])
+
+    def to_long(self):
+        """
+        Длинная таблица (Юрлицо, Дата, Статья, Контрагент, Сумма) по всем юрлицам
+
+        Строится одной операцией над кубом: строки упорядочены по юрлицу,
+        дате и статье, подписи - категориальные столбцы.
+        """
+        n_debtors, n_creditors = self.debtor_codes.shape[1], self.creditor_codes.shape[1]
+        receivables = self.debtors.sum(axis=2)
+        payables = self.creditors.sum(axis=2)
+        inventory = self.materials + self.finished_goods
+        values = np.concatenate([
+            self.materials[:, :, None], self.finished_goods[:, :, None], self.debtors, self.creditors,
+            np.stack([receivables, payables, inventory, inventory + receivables - payables], axis=2)
+        ], axis=2)
+
+        articles = np.array([MATERIALS, FINISHED_GOODS] + [RECEIVABLES] * n_debtors + [PAYABLES] * n_creditors
+                            + [RECEIVABLES, PAYABLES, INVENTORY, WORKING_CAPITAL])
+        # Номера подписей: 0 - Н/Д, 1.. - контрагенты, последний - ИТОГО
+        total_code = len(self.counterparties) + 1
+        counterparty_codes = np.concatenate([
+            np.zeros((self.n_entities, 2), dtype=np.int64),
+            self.debtor_codes + 1, self.creditor_codes + 1,
+            np.full((self.n_entities, 2), total_code), np.zeros((self.n_entities, 2), dtype=np.int64)
+        ], axis=1)
+        return _long_frame('Юрлицо', self.entities['Юрлицо'], np.arange(self.n_entities), self.dates,
+                           values, articles, counterparty_codes, self._labels())
+
+    def unit_codes(self, level):
+        """Номер единицы свода для каждого юрлица и названия единиц"""
+        if level == 'Юрлицо':
+            return np.arange(self.n_entities), pd.Index(self.entities['Юрлицо'])
+        if level == 'Сегмент':
+            codes, units = pd.factorize(self.entities['Сегмент'])
+            return codes, pd.Index(units)
+        if level == 'Группа':
+            return np.zeros(self.n_entities, dtype=np.int64), pd.Index([GROUP_NAME])
+        raise ValueError(f"Неизвестный уровень свода: {level}. Допустимые значения: {LEVELS}")
+
+    def _rollup_parts(self, parts, codes, unit_of_entity, n_units, eliminate):
+        """Суммы (n_units, n_dates, n_counterparties) по контрагентам с исключением внутригрупповых"""
+        n_counterparties = len(self.counterparties)
+        result = np.zeros((n_units * n_counterparties, len(self.dates)))
+        present = np.zeros(n_units * n_counterparties, dtype=bool)
+        for slot in range(codes.shape[1]):
+            keys = unit_of_entity * n_counterparties + codes[:, slot]
+            np.add.at(result, keys, parts[:, :, slot])
+            present[keys] = True
+        result = result.reshape(n_units, n_counterparties, len(self.dates))
+        present = present.reshape(n_units, n_counterparties)
+        if eliminate:
+            # Контрагенты-юрлица той же единицы свода исключаются
+            entity_codes = self.counterparties.get_indexer(self.entities['Юрлицо'])
+            internal = np.zeros_like(present)
+            internal[unit_of_entity, entity_codes] = True
+            result[internal] = 0
+            present &= ~internal
+        return result.transpose(0, 2, 1), present
+
+    def rollup(self, level='Группа', eliminate=False):
+        """
+        Сводит панель на уровень юрлица, сегмента или группы
+
+        Суммы юрлиц единицы складываются по дате, статье и контрагенту;
+        итоги ДЗ/КЗ, Запасы и ЧОК пересчитываются по сведенным суммам.
+        При eliminate=True из ДЗ и КЗ исключаются расчеты с юрлицами той же
+        единицы свода (внутригрупповые остатки); расхождения встречных
+        остатков не сверяются.
+
+        Возвращает длинную таблицу (<level>, Дата, Статья, Контрагент, Сумма).
+        """
+        unit_of_entity, units = self.unit_codes(level)
+        n_units = len(units)
+
+        def by_unit(values):
+            result = np.zeros((n_units, len(self.dates)))
+            np.add.at(result, unit_of_entity, values)
+            return result
+
+        materials, finished_goods = by_unit(self.materials), by_unit(self.finished_goods)
+        debtors, debtors_present = self._rollup_parts(self.debtors, self.debtor_codes, unit_of_entity,
+                                                      n_units, eliminate)
+        creditors, creditors_present = self._rollup_parts(self.creditors, self.creditor_codes, unit_of_entity,
+                                                          n_units, eliminate)
+
+        labels = self._labels()
+        total_code = len(labels) - 1
+        frames = []
+        for unit in range(n_units):
+            debtor_idx = np.flatnonzero(debtors_present[unit])
+            creditor_idx = np.flatnonzero(creditors_present[unit])
+            receivables = debtors[unit][:, debtor_idx].sum(axis=1)
+            payables = creditors[unit][:, creditor_idx].sum(axis=1)
+            inventory = materials[unit] + finished_goods[unit]
+            values = np.column_stack([materials[unit], finished_goods[unit], debtors[unit][:, debtor_idx],
+                                      creditors[unit][:, creditor_idx], receivables, payables, inventory,
+                                      inventory + receivables - payables])
+            articles = np.array([MATERIALS, FINISHED_GOODS] + [RECEIVABLES] * len(debtor_idx)
+                                + [PAYABLES] * len(creditor_idx) + [RECEIVABLES, PAYABLES, INVENTORY, WORKING_CAPITAL])
+            counterparty_codes = np.concatenate([[0, 0], debtor_idx + 1, creditor_idx + 1,
+                                                 [total_code, total_code, 0, 0]])
+            frames.append(_long_frame(level, units, np.array([unit]), self.dates, values[None], articles,
+                                      counterparty_codes[None], labels))
+        return pd.concat(frames, ignore_index=True)
+
+
+def _long_frame(key_name, key_labels, key_codes, dates, values, articles, counterparty_codes, labels):
+    """
+    Длинная таблица из куба values (n_keys, n_dates, n_items)
+
+    articles - номера статей ARTICLES для каждого элемента (n_items),
+    counterparty_codes - номера подписей labels (n_keys, n_items).
+    """
+    n_keys, n_dates, n_items = values.shape
+    key_categories = pd.Index(key_labels)
+    return pd.DataFrame({
+        key_name: pd.Categorical.from_codes(np.repeat(key_codes, n_dates * n_items), key_categories),
+        'Дата': np.tile(np.repeat(dates, n_items), n_keys),
+        'Статья': pd.Categorical.from_codes(np.tile(articles, n_keys * n_dates), ARTICLES),
+        'Контрагент': pd.Categorical.from_codes(
+            np.broadcast_to(counterparty_codes[:, None, :], (n_keys, n_dates, n_items)).ravel(), labels),
+        'Сумма': values.ravel(),
+    })
+
+
+def _partners(rng, n_entities, count):
+    """count различных юрлиц-контрагентов для каждого юрлица (без самого себя)"""
+    count = min(count, n_entities - 1)
+    if count <= 0:
+        return np.zeros((n_entities, 0), dtype=np.int64)
+    # Случайный сдвиг 1..n-1 не совпадает с самим юрлицом
+    shifts = np.argsort(rng.random((n_entities, n_entities - 1)), axis=1)[:, :count] + 1
+    return (np.arange(n_entities)[:, None] + shifts) % n_entities
+
+
+def generate_panel(entities=50, segments=5, freq='M', start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE,
+                   series_spec=None, debtor_names=None, creditor_names=None, intragroup=2,
+                   size_range=(0.2, 5.0), seed=DEFAULT_SEED):
+    """
+    Генерирует панель ЧОК группы юрлиц одним векторным проходом
+
+    Параметры:
+    - entities: число юрлиц или список имен
+    - segments: число сегментов (юрлица распределяются по очереди) или
+      список сегментов по юрлицам
+    - freq, start_date, end_date, series_spec: как у generate_dataset
+    - debtor_names, creditor_names: внешние контрагенты (у каждого юрлица свои доли)
+    - intragroup: число юрлиц группы среди дебиторов и кредиторов каждого юрлица
+    - size_range: диапазон множителя масштаба юрлица (логравномерно)
+    - seed: зерно или numpy.random.Generator
+
+    Ряды всех юрлиц генерируются одним пакетным вызовом generate_series
+    (4 * n_entities рядов, отдельный поток шума на ряд); доли контрагентов
+    распределяются внешним произведением сразу для всего куба.
+    """
+    if isinstance(entities, int):
+        entities = [f"Юрлицо {i + 1:03d}" for i in range(entities)]
+    n_entities = len(entities)
+    if isinstance(segments, int):
+        segments = [f"Сегмент {i % segments + 1}" for i in range(n_entities)]
+    if len(segments) != n_entities:
+        raise ValueError(f"Количество сегментов ({len(segments)}) не совпадает с количеством юрлиц ({n_entities})")
+
+    settings = FREQUENCY_SETTINGS[freq]
+    spec = dict(DEFAULT_SERIES_SPEC, **(series_spec or {}))
+    debtor_names = list(DEBTOR_NAMES if debtor_names is None else debtor_names)
+    creditor_names = list(CREDITOR_NAMES if creditor_names is None else creditor_names)
+    dates = make_date_index(freq, start_date, end_date)
+    n_dates = len(dates)
+
+    structure_rng, *series_rngs = spawn_generators(seed, 1 + len(SERIES_ORDER) * n_entities)
+
+    # Масштаб юрлиц и контрагенты внутри группы
+    sizes = np.exp(structure_rng.uniform(*np.log(size_range), n_entities))
+    debtor_partners = _partners(structure_rng, n_entities, intragroup)
+    creditor_partners = _partners(structure_rng, n_entities, intragroup)
+
+    # Базовые ряды: строки упорядочены по юрлицу, внутри - по SERIES_ORDER
+    params = {key: np.tile([spec[name][key] for name in SERIES_ORDER], n_entities)
+              for key in ('base_value', 'trend_factor', 'seasonal_amplitude', 'noise_level')}
+    params['base_value'] = params['base_value'] * np.repeat(sizes, len(SERIES_ORDER))
+    series = generate_series(dates, freq=freq, seed=series_rngs, **params).reshape(n_entities, len(SERIES_ORDER), n_dates)
+    materials, finished_goods, total_receivables, total_payables = series.transpose(1, 0, 2)
+
+    counterparties = pd.Index(list(dict.fromkeys(debtor_names + creditor_names + list(entities))))
+    entity_codes = counterparties.get_indexer(entities)
+
+    def block(total, names, partners, period):
+        codes = np.concatenate([np.tile(counterparties.get_indexer(names), (n_entities, 1)),
+                                entity_codes[partners]], axis=1)
+        weights = structure_rng.uniform(0.05, 0.2, codes.shape)
+        weights /= weights.sum(axis=1, keepdims=True)
+        oscillation = 1 + 0.1 * np.sin(np.arange(n_dates) / period)
+        values = np.round(total[:, :, None] * weights[:, None, :] * oscillation[None, :, None], 2)
+        return values, codes
+
+    debtors, debtor_codes = block(total_receivables, debtor_names, debtor_partners, settings['debtor_period'])
+    creditors, creditor_codes = block(total_payables, creditor_names, creditor_partners, settings['creditor_period'])
+
+    return Panel(pd.DataFrame({'Юрлицо': entities, 'Сегмент': segments}), freq, dates,
+                 np.ascontiguousarray(materials), np.ascontiguousarray(finished_goods),
+                 debtors, creditors, debtor_codes, creditor_codes, counterparties)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Панель ЧОК группы компаний со сводом по сегментам и группе")
+    parser.add_argument('--entities', type=int, default=200, help="число юрлиц")
+    parser.add_argument('--segments', type=int, default=8, help="число сегментов")
+    parser.add_argument('--freq', choices=tuple(FREQUENCY_SETTINGS), default='M', help="частота индекса")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="зерно генератора")
+    parser.add_argument('--eliminate', action='store_true', help="исключать внутригрупповые остатки")
+    parser.add_argument('--output', default=None, help="файл .parquet для длинной таблицы юрлиц")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    panel = generate_panel(args.entities, args.segments, freq=args.freq, seed=args.seed)
+    generated = time.perf_counter()
+    df_long = panel.to_long()
+    print(f"Юрлиц: {panel.n_entities}, дат: {len(panel.dates)}, строк: {len(df_long)} "
+          f"(генерация {generated - start:.2f} с, длинная таблица {time.perf_counter() - generated:.2f} с)")
+
+    for level in ('Сегмент', 'Группа'):
+        start = time.perf_counter()
+        rolled = panel.rollup(level, eliminate=args.eliminate)
+        last = rolled[(rolled['Дата'] == rolled['Дата'].max()) & (rolled['Статья'] == 'ЧОК')]
+        print(f"\nСвод '{level}' ({time.perf_counter() - start:.2f} с), ЧОК на последнюю дату:")
+        print(last[[level, 'Сумма']].to_string(index=False))
+
+    if args.output:
+        df_long.to_parquet(args.output, index=False)
+        print(f"Данные записаны: {args.output}")
@@ -0,0 +1,21 @@
+import numpy as np
+
+# Зерно по умолчанию: одинаковые параметры дают одинаковые наборы данных
+DEFAULT_SEED = 2015
+
+
+def as_generator(seed=DEFAULT_SEED):
+    """
+    Возвращает numpy.random.Generator для зерна
+
+    seed может быть целым числом, SeedSequence, готовым Generator
+    (возвращается как есть) или None - тогда зерно берется из энтропии ОС.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def spawn_generators(seed, count):
+    """Порождает count независимых генераторов из зерна или генератора"""
+    return as_generator(seed).spawn(count)
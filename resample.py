@@ -0,0 +1,135 @@
+import argparse
+import datetime as dt
+import time
+
+import numpy as np
+import pandas as pd
+
+from chok_generator import DEFAULT_END_DATE, DEFAULT_START_DATE, FREQUENCY_SETTINGS, generate_dataset
+from compact import recompute_totals
+from instrumentation import traced
+from output_sinks import DEFAULT_OUTPUT_DIR, export_dataset
+from random_state import DEFAULT_SEED
+from series_engine import to_datetime64
+
+# Частоты агрегации: имя листа, формат дат Excel и имя файла по умолчанию
+RESAMPLE_SETTINGS = {
+    'M': {key: FREQUENCY_SETTINGS['M'][key] for key in ('sheet_name', 'date_format', 'filename')},
+    'Q': {key: FREQUENCY_SETTINGS['Q'][key] for key in ('sheet_name', 'date_format', 'filename')},
+    'Y': {'sheet_name': 'Данные ЧОК погодно', 'date_format': 'yyyy', 'filename': 'financial_dataset_yearly'},
+}
+
+# Способы агрегации остатков за период:
+# 'last' - на конец периода (последний рабочий день)
+# 'mean' - средний остаток
+# 'max'  - максимальный остаток
+AGGREGATIONS = ('last', 'mean', 'max')
+
+
+def period_starts(dates, freq='M'):
+    """Первое число месяца, квартала или года для каждой даты (datetime64[D])"""
+    months = dates.astype('datetime64[M]')
+    if freq == 'M':
+        return months.astype('datetime64[D]')
+    if freq == 'Q':
+        return (months - months.astype('int64') % 3).astype('datetime64[D]')
+    if freq == 'Y':
+        return dates.astype('datetime64[Y]').astype('datetime64[D]')
+    raise ValueError(f"Неизвестная частота: {freq}. Допустимые значения: {tuple(RESAMPLE_SETTINGS)}")
+
+
+@traced(rows=lambda result: result[0].shape[0])
+def resample_values(values, dates, columns, freq='M', how='last'):
+    """
+    Агрегирует массив значений (n_dates, n_columns) по периодам за один проход
+
+    Даты должны быть упорядочены. Границы периодов находятся по смене
+    первого числа периода, агрегаты считаются reduceat по всем столбцам сразу.
+
+    Итоговые столбцы (ИТОГО, Запасы, ЧОК) для 'mean' и 'max' пересчитываются
+    из агрегированных составляющих, поэтому тождества сохраняются: для 'max'
+    итог - сумма максимумов составляющих, а не максимум итога. Для 'last'
+    строки берутся из исходного массива без изменений.
+
+    Средние округляются до копейки; целые копейки сохраняют тип.
+    Возвращает (values, period_dates): значения (n_periods, n_columns) и
+    первые числа периодов.
+    """
+    if how not in AGGREGATIONS:
+        raise ValueError(f"Неизвестный способ агрегации: {how}. Допустимые значения: {AGGREGATIONS}")
+    dates = to_datetime64(dates)
+    values = np.asarray(values)
+    periods = period_starts(dates, freq)
+    if not len(dates):
+        return values[:0], periods
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+
+    if how == 'last':
+        ends = np.r_[starts[1:], len(dates)] - 1
+        return values[ends], periods[starts]
+    if how == 'mean':
+        counts = np.diff(np.r_[starts, len(dates)])
+        result = np.add.reduceat(values, starts, axis=0) / counts[:, None]
+        if np.issubdtype(values.dtype, np.integer):
+            # Копейки (compact.compact_frame) остаются целыми
+            result = np.rint(result).astype(values.dtype)
+        else:
+            result = np.round(result, 2)
+    else:
+        result = np.maximum.reduceat(values, starts, axis=0)
+    return recompute_totals(result, list(columns)), periods[starts]
+
+
+def resample_dataset(df, freq='M', how='last'):
+    """
+    Агрегирует дневной набор ЧОК (generate_dataset('D'), dataset.py) в помесячный,
+    поквартальный или годовой
+
+    Даты результата - первые числа периодов, как у помесячного набора
+    dataset2.py; значения сверяются с дневным набором по построению.
+    """
+    columns = [column for column in df.columns if column != 'Дата']
+    values, period_dates = resample_values(df[columns].to_numpy(), df['Дата'], columns, freq, how)
+    result = pd.DataFrame(values, columns=columns)
+    result.insert(0, 'Дата', pd.to_datetime(period_dates))
+    return result
+
+
+def resample_all(df, freqs=('M', 'Q', 'Y'), hows=('last',)):
+    """Все сочетания частот и способов агрегации: {(частота, способ): таблица}"""
+    return {(freq, how): resample_dataset(df, freq, how) for freq in freqs for how in hows}
+
+
+def resampled_name(freq, how):
+    """Имя файла по умолчанию: как у набора частоты, для 'mean'/'max' - с суффиксом"""
+    filename = RESAMPLE_SETTINGS[freq]['filename']
+    return filename if how == 'last' else f"{filename}_{how}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Помесячные, поквартальные и годовые наборы ЧОК из одного дневного")
+    parser.add_argument('--freqs', nargs='+', choices=tuple(RESAMPLE_SETTINGS), default=['M', 'Q', 'Y'],
+                        help="частоты агрегации")
+    parser.add_argument('--how', nargs='+', choices=AGGREGATIONS, default=['last'], help="способы агрегации")
+    parser.add_argument('--start', type=dt.date.fromisoformat, default=DEFAULT_START_DATE, help="начало периода (ГГГГ-ММ-ДД)")
+    parser.add_argument('--end', type=dt.date.fromisoformat, default=DEFAULT_END_DATE, help="конец периода (ГГГГ-ММ-ДД)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="зерно генератора")
+    parser.add_argument('--formats', nargs='+', default=['xlsx'], help="форматы вывода: xlsx parquet feather")
+    parser.add_argument('--engine', default='openpyxl', help="движок записи Excel")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help="каталог вывода")
+    args = parser.parse_args()
+
+    print("Генерация дневного набора данных...")
+    daily = generate_dataset('D', args.start, args.end, seed=args.seed)
+    start = time.perf_counter()
+    datasets = resample_all(daily, args.freqs, args.how)
+    print(f"Агрегация: {len(datasets)} наборов за {time.perf_counter() - start:.3f} с")
+
+    for (freq, how), df in datasets.items():
+        settings = RESAMPLE_SETTINGS[freq]
+        paths = export_dataset(df, resampled_name(freq, how), output_dir=args.output_dir, formats=args.formats,
+                               sheet_name=settings['sheet_name'], date_format=settings['date_format'],
+                               engine=args.engine)
+        for files in paths.values():
+            for file_path in files:
+                print(f"Данные успешно экспортированы в файл: {file_path}")
@@ -0,0 +1,138 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from random_state import DEFAULT_SEED, as_generator
+from compact import AMOUNT_MODES, compact_frame, compact_values
+from chok_generator import DEFAULT_SERIES_SPEC, FREQUENCY_SETTINGS, generate_dataset, generate_dataset_values
+
+
+def random_series_specs(count, seed=DEFAULT_SEED, trend_jitter=0.03, noise_multiplier=(0.5, 2.0)):
+    """
+    Генерирует параметры рядов для сценариев "что если"
+
+    Для каждого сценария годовой рост всех рядов смещается на равномерную
+    величину в пределах ±trend_jitter, а уровень шума умножается на
+    множитель из диапазона noise_multiplier.
+
+    Возвращает список словарей series_spec для generate_dataset.
+    """
+    rng = as_generator(seed)
+    specs = []
+    for _ in range(count):
+        spec = {}
+        for name, params in DEFAULT_SERIES_SPEC.items():
+            spec[name] = dict(
+                params,
+                trend_factor=params['trend_factor'] + rng.uniform(-trend_jitter, trend_jitter),
+                noise_level=params['noise_level'] * rng.uniform(*noise_multiplier)
+            )
+        specs.append(spec)
+    return specs
+
+
+def _run_scenario(task):
+    """Выполняет один сценарий в процессе-исполнителе"""
+    index, params, seed_sequence, output_dir, formats, amounts = task
+    if output_dir is None:
+        # Для сборки в массив таблица pandas не нужна
+        values, columns, dates = generate_dataset_values(seed=seed_sequence, **params)
+        if amounts is not None:
+            values = compact_values(values, columns, amounts)
+        return index, values, columns, dates
+
+    from output_sinks import export_dataset
+    df = generate_dataset(seed=seed_sequence, **params)
+    if amounts is not None:
+        df = compact_frame(df, amounts)
+    settings = FREQUENCY_SETTINGS[params.get('freq', 'D')]
+    paths = export_dataset(
+        df, f"scenario_{index:05d}", output_dir=output_dir, formats=formats,
+        sheet_name=settings['sheet_name'], date_format=settings['date_format']
+    )
+    return index, paths, None, None
+
+
+def run_scenarios(scenarios, seed=DEFAULT_SEED, n_workers=None, output_dir=None, formats=('parquet',), amounts=None,
+                  **common_params):
+    """
+    Генерирует независимые реализации набора данных ЧОК в пуле процессов
+
+    Каждый сценарий получает собственный генератор numpy.random.Generator,
+    порожденный из SeedSequence(seed).spawn(...), поэтому результат
+    воспроизводим и не зависит от числа процессов и порядка выполнения.
+
+    Параметры:
+    - scenarios: количество реализаций с одинаковыми параметрами или список
+      словарей параметров generate_dataset (например, series_spec из random_series_specs)
+    - seed: корневое зерно (None - случайное)
+    - n_workers: число процессов (по умолчанию os.cpu_count())
+    - output_dir: если задан, каждый сценарий сохраняется в файлы
+      scenario_NNNNN.<формат>, иначе результаты собираются в массив
+    - formats: форматы вывода для output_sinks.export_dataset
+    - amounts: компактное представление сумм из compact.AMOUNT_MODES
+      ('kopecks' - int64 копейки с точными итогами, 'float32'); None - float64
+    - common_params: параметры generate_dataset, общие для всех сценариев
+      (freq, start_date, end_date, debtor_names, creditor_names)
+
+    Возвращает:
+    - без output_dir: (values, columns, dates), где values - массив
+      (n_scenarios, n_dates, n_columns) без столбца 'Дата'
+    - с output_dir: список путей к файлам по сценариям
+    """
+    if isinstance(scenarios, int):
+        scenarios = [{} for _ in range(scenarios)]
+    params_list = [dict(common_params, **params) for params in scenarios]
+    if not params_list:
+        raise ValueError("Нужен хотя бы один сценарий")
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(params_list))
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    tasks = [(i, params, seed_sequences[i], output_dir, formats, amounts) for i, params in enumerate(params_list)]
+
+    n_workers = n_workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (n_workers * 4))
+    results = [None] * len(tasks)
+    columns = dates = None
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        for index, result, result_columns, result_dates in executor.map(_run_scenario, tasks, chunksize=chunksize):
+            results[index] = result
+            if output_dir is None:
+                if columns is None:
+                    columns, dates = result_columns, result_dates
+                elif result_columns != columns or len(result_dates) != len(dates):
+                    raise ValueError("Для сборки в массив все сценарии должны иметь одинаковые даты и столбцы")
+
+    if output_dir is not None:
+        return results
+    return np.stack(results), columns, dates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Параллельная генерация сценариев ЧОК")
+    parser.add_argument('--count', type=int, default=100, help="количество сценариев")
+    parser.add_argument('--freq', choices=tuple(FREQUENCY_SETTINGS), default='M', help="частота индекса")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="корневое зерно")
+    parser.add_argument('--workers', type=int, default=None, help="количество процессов")
+    parser.add_argument('--output-dir', default=None, help="каталог для файлов сценариев")
+    parser.add_argument('--formats', nargs='+', default=['parquet'], help="форматы вывода")
+    parser.add_argument('--amounts', choices=AMOUNT_MODES, default=None, help="компактное представление сумм")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    specs = [{'series_spec': spec} for spec in random_series_specs(args.count, seed=args.seed)]
+    result = run_scenarios(specs, seed=args.seed, n_workers=args.workers, output_dir=args.output_dir,
+                           formats=args.formats, amounts=args.amounts, freq=args.freq)
+    elapsed = time.perf_counter() - start
+
+    if args.output_dir is None:
+        values, columns, dates = result
+        print(f"Сценариев: {values.shape[0]}, дат: {values.shape[1]}, столбцов: {values.shape[2]}, "
+              f"память: {values.nbytes / 1024 ** 2:.1f} МБ ({values.dtype})")
+    else:
+        print(f"Сценариев записано: {len(result)} в каталог {args.output_dir}")
+    print(f"Время: {elapsed:.2f} с ({args.count / elapsed:.1f} сценариев/с)")
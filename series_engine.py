@@ -0,0 +1,96 @@
+import numpy as np
+
+from random_state import DEFAULT_SEED, as_generator
+from instrumentation import traced
+
+# Поддерживаемые частоты индекса:
+# 'D' - дневные данные (рабочие дни), годовая сезонность по дню года
+# 'W' - понедельные данные, тренд и сезонность как у дневных
+# 'M' - помесячные данные (первые числа месяцев), сезонность по номеру месяца
+# 'Q' - поквартальные данные (первые числа кварталов), как у помесячных
+FREQUENCIES = ('D', 'W', 'M', 'Q')
+
+
+def to_datetime64(dates):
+    """Приводит список дат, Series или DatetimeIndex к массиву datetime64[D]"""
+    values = getattr(dates, 'values', dates)
+    return np.asarray(values).astype('datetime64[D]')
+
+
+def years_passed(dates, freq='D', origin=None):
+    """Доля лет, прошедших с даты origin (по умолчанию - первой даты индекса), для каждой даты"""
+    origin = dates[0] if origin is None else np.datetime64(origin, 'D')
+    if freq in ('D', 'W'):
+        return (dates - origin).astype('int64') / 365.25
+    if freq in ('M', 'Q'):
+        months = dates.astype('datetime64[M]').astype('int64')
+        return (months - origin.astype('datetime64[M]').astype('int64')) / 12
+    raise ValueError(f"Неизвестная частота: {freq}. Допустимые значения: {FREQUENCIES}")
+
+
+def seasonal_phase(dates, freq='D'):
+    """Фаза годовой сезонности (в долях года) для каждой даты"""
+    if freq in ('D', 'W'):
+        day_of_year = (dates - dates.astype('datetime64[Y]')).astype('int64') + 1
+        return day_of_year / 365.25
+    if freq in ('M', 'Q'):
+        month_of_year = dates.astype('datetime64[M]').astype('int64') % 12 + 1
+        return month_of_year / 12
+    raise ValueError(f"Неизвестная частота: {freq}. Допустимые значения: {FREQUENCIES}")
+
+
+@traced(rows=lambda result: result.shape[-1])
+def generate_series(dates, base_value, trend_factor, seasonal_amplitude, noise_level, freq='D', n_series=None, seed=DEFAULT_SEED, origin=None):
+    """
+    Векторно генерирует временные ряды с трендом, сезонностью и шумом
+
+    Параметры:
+    - dates: даты индекса (список dt.date, Series, DatetimeIndex или массив datetime64)
+    - base_value: начальное значение
+    - trend_factor: коэффициент тренда (годовой рост)
+    - seasonal_amplitude: амплитуда сезонных колебаний
+    - noise_level: уровень случайного шума
+    - freq: частота индекса из FREQUENCIES
+    - n_series: количество рядов; если задано, результат - 2-D массив (n_series, len(dates))
+    - seed: зерно или numpy.random.Generator для шума; для пакета можно
+      передать список зерен/генераторов - по одному на ряд
+    - origin: дата начала тренда (по умолчанию - первая дата индекса); задается,
+      когда ряд генерируется частями
+
+    Параметры ряда могут быть скалярами или массивами длины n_series -
+    тогда каждый ряд пакета получает свои значения. Шум берется одним
+    вызовом генератора на весь пакет или на каждый ряд, если зерна заданы
+    списком.
+
+    Возвращает массив значений, округленных до копеек.
+    """
+    dates = to_datetime64(dates)
+    params = [np.asarray(p, dtype=float) for p in (base_value, trend_factor, seasonal_amplitude, noise_level)]
+    batched = n_series is not None or any(p.ndim > 0 for p in params)
+    if batched:
+        if n_series is None:
+            n_series = max(p.shape[0] for p in params if p.ndim > 0)
+        # Параметры - столбцы (n_series, 1), даты - строка (1, n_dates)
+        params = [np.broadcast_to(p, (n_series,))[:, np.newaxis] for p in params]
+    base_value, trend_factor, seasonal_amplitude, noise_level = params
+
+    if len(dates) == 0:
+        return np.zeros((n_series, 0) if batched else 0)
+
+    # Тренд (экспоненциальный рост с годовым коэффициентом)
+    trend = base_value * (1 + trend_factor) ** years_passed(dates, freq, origin)
+
+    # Сезонность (годовая)
+    seasonality = seasonal_amplitude * np.sin(2 * np.pi * seasonal_phase(dates, freq))
+
+    # Случайный шум
+    scale = noise_level * trend
+    if isinstance(seed, (list, tuple)):
+        if not batched or len(seed) != n_series:
+            raise ValueError("Список зерен допустим только для пакета и должен содержать по зерну на ряд")
+        noise = np.stack([as_generator(s).normal(0, row) for s, row in zip(seed, scale)])
+    else:
+        noise = as_generator(seed).normal(0, scale)
+
+    values = np.maximum(0, trend + seasonality * trend + noise)
+    return np.round(values, 2)
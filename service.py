@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import datetime as dt
+import io
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from chok_generator import DEFAULT_END_DATE, DEFAULT_START_DATE, FREQUENCY_SETTINGS, generate_dataset
+from counterparties import DEBTOR_NAMES, CREDITOR_NAMES
+from dataset_cache import DatasetCache, cached_generate_dataset, dataset_params
+from excel_export import ENGINES, write_workbook
+from long_format import build_long_format
+from random_state import DEFAULT_SEED
+
+logger = logging.getLogger('chok.service')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Предельный объем готовых ответов в памяти сервиса
+DEFAULT_RESULT_CACHE_BYTES = 256 * 1024 ** 2
+
+TABLES = ('wide', 'long')
+
+CONTENT_TYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error'}
+
+
+def _names(value, default, label):
+    """Контрагенты из параметра запроса: число (имена '<label> N') или имена через запятую"""
+    if value is None:
+        return None
+    if value.isdigit():
+        count = int(value)
+        if count < 1:
+            raise ValueError(f"Число контрагентов должно быть положительным: {value}")
+        return list(default) if count == len(default) else [f"{label} {i + 1}" for i in range(count)]
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if not names:
+        raise ValueError(f"Пустой список контрагентов: '{value}'")
+    return names
+
+
+def _date(value, default, name):
+    if value is None:
+        return default
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Неверная дата {name}: {value} (ожидается ГГГГ-ММ-ДД)")
+
+
+def parse_request(query):
+    """
+    Разбирает параметры запроса /dataset
+
+    - freq: частота индекса ('D', 'W', 'M', 'Q'; по умолчанию 'D')
+    - start, end: границы периода (ГГГГ-ММ-ДД)
+    - debtors, creditors: число контрагентов или имена через запятую
+    - seed: зерно генератора
+    - table: 'wide' или 'long' (для xlsx книга всегда содержит оба листа)
+    - format: 'parquet', 'csv' или 'xlsx'
+    - engine: движок записи Excel
+
+    Возвращает словарь {'params': параметры generate_dataset, 'table', 'format', 'engine'}.
+    """
+    values = {key: items[-1] for key, items in parse_qs(query, keep_blank_values=True).items()}
+    freq = values.get('freq', 'D')
+    if freq not in FREQUENCY_SETTINGS:
+        raise ValueError(f"Неизвестная частота: {freq}. Допустимые значения: {tuple(FREQUENCY_SETTINGS)}")
+    table = values.get('table', 'wide')
+    if table not in TABLES:
+        raise ValueError(f"Неизвестная таблица: {table}. Допустимые значения: {TABLES}")
+    fmt = values.get('format', 'parquet')
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"Неизвестный формат: {fmt}. Допустимые значения: {tuple(CONTENT_TYPES)}")
+    engine = values.get('engine', 'openpyxl')
+    if engine not in ENGINES:
+        raise ValueError(f"Неизвестный движок: {engine}. Допустимые значения: {ENGINES}")
+    try:
+        seed = int(values.get('seed', DEFAULT_SEED))
+    except ValueError:
+        raise ValueError(f"Зерно должно быть целым числом: {values['seed']}")
+
+    start_date = _date(values.get('start'), DEFAULT_START_DATE, 'start')
+    end_date = _date(values.get('end'), DEFAULT_END_DATE, 'end')
+    if end_date < start_date:
+        raise ValueError(f"Конец периода {end_date} раньше начала {start_date}")
+    params = {
+        'freq': freq, 'start_date': start_date, 'end_date': end_date, 'seed': seed,
+        'debtor_names': _names(values.get('debtors'), DEBTOR_NAMES, 'Дебитор'),
+        'creditor_names': _names(values.get('creditors'), CREDITOR_NAMES, 'Кредитор'),
+    }
+    return {'params': params, 'table': table, 'format': fmt, 'engine': engine}
+
+
+def request_key(request):
+    """
+    Ключ ответа: канонические параметры генерации (с умолчаниями) и параметры вывода
+
+    Движок записи входит в ключ только для xlsx: CSV и Parquet от него не зависят.
+    """
+    payload = {'params': dataset_params(**request['params']), 'table': request['table'],
+               'format': request['format']}
+    if request['format'] == 'xlsx':
+        payload['engine'] = request['engine']
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def render(request, disk_cache=True, cache_dir=None):
+    """
+    Генерирует набор и сериализует его в байты (выполняется в процессе-исполнителе)
+
+    С disk_cache набор берется из кэша dataset_cache, если уже был сгенерирован
+    с теми же параметрами. Возвращает (байты, тип содержимого, имя файла).
+    """
+    params, fmt = request['params'], request['format']
+    settings = FREQUENCY_SETTINGS[params['freq']]
+    df = cached_generate_dataset(DatasetCache(cache_dir), **params) if disk_cache else generate_dataset(**params)
+    long = request['table'] == 'long'
+    filename = settings['filename'] + ('_long' if long and fmt != 'xlsx' else '') + '.' + fmt
+
+    if fmt == 'xlsx':
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, filename)
+            write_workbook(df, file_path, sheet_name=settings['sheet_name'], date_format=settings['date_format'],
+                           engine=request['engine'])
+            with open(file_path, 'rb') as f:
+                body = f.read()
+    else:
+        frame = build_long_format(df) if long else df
+        if fmt == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("Для формата 'parquet' установите пакет: pip install pyarrow")
+            buffer = io.BytesIO()
+            frame.to_parquet(buffer, index=False)
+            body = buffer.getvalue()
+        else:
+            body = frame.to_csv(index=False, date_format='%Y-%m-%d').encode('utf-8')
+    return body, CONTENT_TYPES[fmt], filename
+
+
+class DatasetService:
+    """
+    Локальный HTTP-сервис генерации наборов данных ЧОК на asyncio
+
+    Генерация и сериализация выполняются в пуле процессов, цикл событий
+    только принимает запросы и отдает ответы. Одинаковые запросы,
+    пришедшие во время генерации, ждут один общий результат; готовые
+    ответы хранятся в LRU-кэше в памяти (до cache_bytes байт), за ним -
+    кэш наборов на диске (dataset_cache).
+
+    Запросы:
+    - GET /dataset?freq=M&start=2015-01-01&end=2024-12-31&seed=42&debtors=10
+      &table=wide&format=parquet - набор данных (параметры - parse_request);
+    - GET /stats - счетчики запросов и кэша в JSON.
+    """
+
+    def __init__(self, n_workers=None, cache_bytes=DEFAULT_RESULT_CACHE_BYTES, disk_cache=True, cache_dir=None):
+        # Исполнители не должны наследовать сокеты сервера и клиентов: при fork
+        # копия принятого сокета в дочернем процессе не дает клиенту получить
+        # EOF после закрытия соединения. forkserver/spawn запускают исполнители
+        # из чистого процесса
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self.executor = ProcessPoolExecutor(max_workers=n_workers or os.cpu_count() or 1, mp_context=context)
+        self.cache_bytes = cache_bytes
+        self.disk_cache = disk_cache
+        self.cache_dir = cache_dir
+        self.results = OrderedDict()
+        self.result_bytes = 0
+        self.in_flight = {}
+        self.stats = {'requests': 0, 'hits': 0, 'shared': 0, 'generated': 0, 'errors': 0}
+
+    def _store(self, key, future):
+        """Завершение генерации: снимает запрос из выполняемых и кэширует ответ"""
+        self.in_flight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        size = len(result[0])
+        if size > self.cache_bytes:
+            return
+        self.results[key] = result
+        self.result_bytes += size
+        while self.result_bytes > self.cache_bytes:
+            _, evicted = self.results.popitem(last=False)
+            self.result_bytes -= len(evicted[0])
+
+    async def get(self, request):
+        """Возвращает ((байты, тип, имя файла), источник: 'hit', 'shared' или 'miss')"""
+        key = request_key(request)
+        result = self.results.get(key)
+        if result is not None:
+            self.results.move_to_end(key)
+            self.stats['hits'] += 1
+            return result, 'hit'
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.stats['shared'] += 1
+            return await asyncio.shield(future), 'shared'
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, render, request, self.disk_cache, self.cache_dir)
+        self.in_flight[key] = future
+        # Результат кэшируется, даже если клиент отключился до ответа
+        future.add_done_callback(lambda done: self._store(key, done))
+        self.stats['generated'] += 1
+        return await asyncio.shield(future), 'miss'
+
+    async def handle(self, reader, writer):
+        """Обрабатывает одно соединение: один запрос GET, ответ, закрытие"""
+        start = time.perf_counter()
+        status, target, source = 500, '', ''
+        try:
+            request_line = (await reader.readline()).decode('latin-1')
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            method, target, _ = request_line.split(' ', 2)
+            url = urlsplit(target)
+            self.stats['requests'] += 1
+            if method != 'GET':
+                status, body, headers = 405, b'', {}
+            elif url.path == '/dataset':
+                (body, content_type, filename), source = await self.get(parse_request(url.query))
+                status, headers = 200, {'Content-Type': content_type, 'X-Cache': source,
+                                        'Content-Disposition': f'attachment; filename="{filename}"'}
+            elif url.path == '/stats':
+                stats = dict(self.stats, cached=len(self.results), cached_bytes=self.result_bytes,
+                             in_flight=len(self.in_flight))
+                status, body, headers = 200, json.dumps(stats).encode('utf-8'), {'Content-Type': 'application/json'}
+            else:
+                status, body, headers = 404, b'', {}
+        except (ValueError, ImportError) as error:
+            self.stats['errors'] += 1
+            status, body, headers = 400, str(error).encode('utf-8'), {'Content-Type': 'text/plain; charset=utf-8'}
+        except Exception as error:
+            logger.exception("Ошибка обработки запроса %s", target)
+            self.stats['errors'] += 1
+            status, body, headers = 500, str(error).encode('utf-8'), {'Content-Type': 'text/plain; charset=utf-8'}
+
+        try:
+            head = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", f"Content-Length: {len(body)}", "Connection: close"]
+            head += [f"{name}: {value}" for name, value in headers.items()]
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('utf-8') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        logger.info("%s %s %s %.3f с", status, target, source, time.perf_counter() - start)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Открывает сокет сервера и возвращает asyncio.Server (порт 0 - любой свободный)"""
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Запускает сервер и обслуживает запросы до остановки"""
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальный HTTP-сервис генерации наборов данных ЧОК")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="адрес")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="порт")
+    parser.add_argument('--workers', type=int, default=None, help="количество процессов генерации")
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_RESULT_CACHE_BYTES // 1024 ** 2,
+                        help="объем кэша ответов в памяти, МБ")
+    parser.add_argument('--cache-dir', default=None, help="каталог кэша наборов данных")
+    parser.add_argument('--no-disk-cache', action='store_true', help="не использовать кэш наборов на диске")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    service = DatasetService(args.workers, args.cache_mb * 1024 ** 2, not args.no_disk_cache, args.cache_dir)
+    print(f"Сервис запущен: http://{args.host}:{args.port}/dataset?freq=M&format=xlsx")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -0,0 +1,138 @@
+import argparse
+import datetime as dt
+import glob
+import os
+import time
+
+from chok_generator import DEFAULT_END_DATE, DEFAULT_START_DATE, FREQUENCY_SETTINGS, iter_dataset_chunks
+from long_format import build_long_format
+from output_sinks import DEFAULT_OUTPUT_DIR, LONG_SUFFIX
+from random_state import DEFAULT_SEED
+
+
+class CsvChunkWriter:
+    """
+    Дописывает части в <имя>.csv и <имя>_long.csv
+
+    Заголовок пишется только в новый файл; при append=True существующие
+    файлы дополняются.
+    """
+
+    def __init__(self, base_path, append=False):
+        self.paths = [base_path + '.csv', base_path + LONG_SUFFIX + '.csv']
+        self._new = [not (append and os.path.exists(path)) for path in self.paths]
+
+    def write(self, df, df_long):
+        for i, (path, frame) in enumerate(zip(self.paths, (df, df_long))):
+            frame.to_csv(path, mode='w' if self._new[i] else 'a', header=self._new[i], index=False,
+                         encoding='utf-8', date_format='%Y-%m-%d')
+            self._new[i] = False
+
+    def close(self):
+        pass
+
+
+class ParquetChunkWriter:
+    """
+    Пишет каждую часть отдельным файлом part-NNNNN.parquet в каталоги
+    <имя>.parquet и <имя>_long.parquet
+
+    Каталог читается целиком через pandas.read_parquet (или
+    output_sinks.read_columnar). При append=True нумерация частей
+    продолжается, иначе старые части удаляются.
+    """
+
+    def __init__(self, base_path, append=False):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Для формата 'parquet' установите пакет: pip install pyarrow")
+        self.paths = [base_path + '.parquet', base_path + LONG_SUFFIX + '.parquet']
+        for path in self.paths:
+            os.makedirs(path, exist_ok=True)
+            if not append:
+                for part in glob.glob(os.path.join(path, 'part-*.parquet')):
+                    os.remove(part)
+        self._part = max((len(glob.glob(os.path.join(path, 'part-*.parquet'))) for path in self.paths), default=0)
+
+    def write(self, df, df_long):
+        for path, frame in zip(self.paths, (df, df_long)):
+            frame.to_parquet(os.path.join(path, f'part-{self._part:05d}.parquet'), index=False)
+        self._part += 1
+
+    def close(self):
+        pass
+
+
+# Приемники для потоковой записи: формат -> класс (base_path, append)
+STREAM_WRITERS = {
+    'csv': CsvChunkWriter,
+    'parquet': ParquetChunkWriter,
+}
+
+
+def write_chunks(chunks, name, output_dir=None, formats=('parquet',), append=False):
+    """
+    Записывает поток частей широкой таблицы во все форматы
+
+    Длинная таблица строится для каждой части отдельно, поэтому память
+    ограничена размером одной части. Возвращает (словарь {формат: [пути]},
+    число записанных строк).
+    """
+    unknown = [fmt for fmt in formats if fmt not in STREAM_WRITERS]
+    if unknown:
+        raise ValueError(f"Неизвестные форматы: {unknown}. Допустимые значения: {tuple(STREAM_WRITERS)}")
+
+    output_dir = DEFAULT_OUTPUT_DIR if output_dir is None else output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    base_path = os.path.join(output_dir, name)
+    writers = {fmt: STREAM_WRITERS[fmt](base_path, append=append) for fmt in formats}
+
+    rows = 0
+    try:
+        for chunk in chunks:
+            chunk_long = build_long_format(chunk)
+            for writer in writers.values():
+                writer.write(chunk, chunk_long)
+            rows += len(chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {fmt: writer.paths for fmt, writer in writers.items()}, rows
+
+
+def stream_dataset(name, output_dir=None, formats=('parquet',), chunk_size=None, **params):
+    """
+    Генерирует набор данных частями и сразу записывает их в CSV/Parquet
+
+    Параметры generate_dataset передаются через params; результат совпадает
+    с генерацией в памяти. Возвращает (словарь {формат: [пути]}, число строк).
+    """
+    return write_chunks(iter_dataset_chunks(chunk_size=chunk_size, **params), name, output_dir, formats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Потоковая генерация больших наборов данных ЧОК")
+    parser.add_argument('--freq', choices=tuple(FREQUENCY_SETTINGS), default='D', help="частота индекса")
+    parser.add_argument('--start', type=dt.date.fromisoformat, default=DEFAULT_START_DATE, help="начало периода (ГГГГ-ММ-ДД)")
+    parser.add_argument('--end', type=dt.date.fromisoformat, default=DEFAULT_END_DATE, help="конец периода (ГГГГ-ММ-ДД)")
+    parser.add_argument('--debtors', type=int, default=None, help="число синтетических дебиторов")
+    parser.add_argument('--creditors', type=int, default=None, help="число синтетических кредиторов")
+    parser.add_argument('--chunk-size', type=int, default=None, help="число периодов в части")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="зерно генератора")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help="каталог вывода")
+    parser.add_argument('--name', default='financial_dataset_stream', help="имя набора")
+    parser.add_argument('--formats', nargs='+', default=['parquet'], help="форматы: csv parquet")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths, rows = stream_dataset(
+        args.name, output_dir=args.output_dir, formats=args.formats, chunk_size=args.chunk_size,
+        freq=args.freq, start_date=args.start, end_date=args.end, seed=args.seed,
+        debtor_names=[f"Дебитор {i + 1}" for i in range(args.debtors)] if args.debtors else None,
+        creditor_names=[f"Кредитор {i + 1}" for i in range(args.creditors)] if args.creditors else None
+    )
+    print(f"Строк: {rows}, время: {time.perf_counter() - start:.2f} с")
+    for fmt, files in paths.items():
+        for file_path in files:
+            print(f"Данные записаны: {file_path}")
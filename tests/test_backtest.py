@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from backtest import ARIMA_COLUMNS, VAR_COLUMNS, backtest, backtest_scenarios, forecast_errors, rolling_origins
+from chok_generator import generate_dataset
+
+
+@pytest.fixture(scope='module')
+def monthly():
+    return generate_dataset('M', seed=2)
+
+
+@pytest.mark.parametrize('model, columns', [('naive', ARIMA_COLUMNS), ('arima', ARIMA_COLUMNS),
+                                            ('var', VAR_COLUMNS)])
+def test_error_shapes(monthly, model, columns):
+    result = backtest(monthly, model=model, horizon=6, initial=96, step=6)
+    n_origins = len(rolling_origins(len(monthly), 96, 6))
+    assert result['columns'] == list(columns)
+    assert result['forecasts'].shape == (n_origins, 6, len(columns))
+    assert result['mae'].shape == result['mape'].shape == (6, len(columns))
+    assert np.isfinite(result['mae']).all() and (result['mae'] >= 0).all()
+
+
+def test_naive_forecast_is_last_value(monthly):
+    result = backtest(monthly, model='naive', horizon=3, initial=110)
+    values = monthly[list(ARIMA_COLUMNS)].to_numpy()
+    assert np.array_equal(result['forecasts'][:, 0], values[result['origins'] - 1])
+
+
+def test_errors_beyond_data_are_nan():
+    values = np.arange(1.0, 11.0)[:, None]
+    origins = np.array([8, 9])
+    forecasts = np.full((2, 3, 1), 5.0)
+    mae, mape = forecast_errors(values, origins, forecasts)
+    # Горизонт 1 есть у обеих точек, 2 - только у первой, 3 - ни у одной
+    assert mae[:, 0] == pytest.approx([(4 + 5) / 2, 5, np.nan], nan_ok=True)
+    assert mape[0, 0] == pytest.approx((4 / 9 + 5 / 10) / 2 * 100)
+    assert np.isnan(mape[2, 0])
+
+
+def test_arima_append_matches_filter_with_fitted_params(monthly):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    series = monthly['ЧОК'].to_numpy(dtype=float)
+    initial, horizon = 96, 4
+    reused = backtest(series[:, None], model='arima', horizon=horizon, initial=initial, refit_every=12)
+    refit = backtest(series[:, None], model='arima', horizon=horizon, initial=initial, refit_every=1)
+    n_origins = len(reused['origins'])
+    assert reused['fits'] == -(-n_origins // 12) and refit['fits'] == n_origins
+
+    # В точках переоценки результаты совпадают с полной переоценкой
+    for i in range(0, n_origins, 12):
+        assert np.allclose(reused['forecasts'][i], refit['forecasts'][i])
+    # Между переоценками - модель на всех известных данных с прежними параметрами
+    params = ARIMA(series[:initial], order=(1, 1, 1), trend='t').fit().params
+    for i in (1, 5, 11):
+        origin = reused['origins'][i]
+        expected = ARIMA(series[:origin], order=(1, 1, 1), trend='t').filter(params).forecast(horizon)
+        assert np.allclose(reused['forecasts'][i, :, 0], expected)
+
+
+def test_var_refits_every_n_origins(monthly):
+    reused = backtest(monthly, model='var', horizon=3, initial=90, refit_every=10)
+    refit = backtest(monthly, model='var', horizon=3, initial=90, refit_every=1)
+    assert reused['fits'] == 3 and refit['fits'] == 30
+    assert np.allclose(reused['forecasts'][::10], refit['forecasts'][::10])
+
+
+def test_scenarios_do_not_depend_on_workers():
+    serial = backtest_scenarios(3, 'naive', seed=5, n_workers=1, horizon=4, initial=100)
+    parallel = backtest_scenarios(3, 'naive', seed=5, n_workers=2, horizon=4, initial=100)
+    assert serial['mae'].shape == (3, 4, len(ARIMA_COLUMNS))
+    assert np.array_equal(serial['mae'], parallel['mae'])
+
+
+def test_scenarios_require_positive_count():
+    with pytest.raises(ValueError, match='Количество сценариев'):
+        backtest_scenarios(0, 'naive')
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from benchmark import STAGES, build_stages, compare, measure, run_benchmarks
+from date_index import make_date_index
+
+
+def test_stages_run(tmp_path):
+    stages = build_stages('M', years=2, counterparties=3, tmp_dir=str(tmp_path))
+    assert set(stages) == set(STAGES)
+    for stage in ('date_index', 'series', 'counterparties', 'totals', 'generate_dataset', 'long_format'):
+        stages[stage]()
+    # Индекс строится заново, а не берется из кэша make_date_index
+    dates = stages['date_index']()
+    assert dates is not make_date_index('M', '2015-01-01', '2016-12-31') and dates.flags.writeable
+    debtors, creditors = stages['counterparties']()
+    assert debtors.shape == creditors.shape == (24, 3)
+    assert stages['totals']().shape == (24, 2 + 3 + 3 + 4)
+
+
+def test_run_benchmarks_report():
+    report = run_benchmarks(freqs=('M',), years=(1,), stages=('date_index', 'totals'), repeat=1, memory=False,
+                            verbose=False)
+    assert [result['stage'] for result in report['results']] == ['date_index', 'totals']
+    assert report['results'][0]['case'] == {'freq': 'M', 'years': 1, 'counterparties': 10}
+
+
+def test_measure_reports_memory():
+    result = measure(lambda: np.ones(2 * 1024 ** 2 // 8), repeat=2)
+    assert result['seconds'] <= result['mean_seconds']
+    assert result['peak_mb'] == pytest.approx(2, abs=0.2)
+
+
+def test_compare_flags_only_real_regressions():
+    case = {'freq': 'M', 'years': 1, 'counterparties': 10}
+    baseline = {'results': [{'case': case, 'stage': 'series', 'seconds': 0.1},
+                            {'case': case, 'stage': 'totals', 'seconds': 0.001}]}
+    report = {'results': [{'case': case, 'stage': 'series', 'seconds': 0.2},
+                          {'case': case, 'stage': 'totals', 'seconds': 0.004},
+                          {'case': case, 'stage': 'long_format', 'seconds': 1.0}]}
+    regressions = compare(report, baseline)
+    # totals медленнее в 4 раза, но на 3 мс - ниже порога MIN_DELTA_SECONDS
+    assert [(r['stage'], r['ratio']) for r in regressions] == [('series', pytest.approx(2))]
+    assert compare(report, baseline, threshold=2.5) == []
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import chok_cli
+import chok_generator
+import instrumentation
+
+
+@pytest.mark.parametrize('freq', ['W', 'Q'])
+def test_check_accepts_generated_dataset(tmp_path, freq):
+    assert chok_cli.main(['generate', '--freq', freq, '--no-cache', '--formats', 'xlsx', 'parquet',
+                          '--output-dir', str(tmp_path), '--name', 'data']) == 0
+    paths = [str(tmp_path / 'data.xlsx'), str(tmp_path / 'data.parquet')]
+    assert chok_cli.main(['check'] + paths) == 0
+    assert chok_cli.main(['check', '--columns-only', paths[0]]) == 0
+
+
+def test_export_keeps_frequency_settings(tmp_path):
+    chok_cli.main(['generate', '--freq', 'W', '--no-cache', '--formats', 'parquet',
+                   '--output-dir', str(tmp_path), '--name', 'data'])
+    assert chok_cli.main(['export', str(tmp_path / 'data.parquet'), '--formats', 'xlsx',
+                          '--output-dir', str(tmp_path), '--name', 'copy']) == 0
+    assert os.path.exists(tmp_path / 'copy.xlsx')
+    assert chok_cli.main(['check', str(tmp_path / 'copy.xlsx')]) == 0
+
+
+def test_columns_only_rejects_columnar_files(capsys):
+    with pytest.raises(SystemExit) as error:
+        chok_cli.main(['check', '--columns-only', 'data.parquet'])
+    assert error.value.code == 2
+    assert '.xlsx' in capsys.readouterr().err
+
+
+def test_generate_reads_names_and_profiles(tmp_path, capsys):
+    names = tmp_path / 'debtors.txt'
+    names.write_text("Альфа\n\nБета\n", encoding='utf-8')
+    assert chok_generator.read_names(str(names)) == ['Альфа', 'Бета']
+    try:
+        assert chok_cli.main(['generate', '--freq', 'Q', '--no-cache', '--formats', 'parquet', '--profile',
+                              '--debtors-file', str(names), '--output-dir', str(tmp_path), '--name', 'data']) == 0
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+    assert 'Участок' in capsys.readouterr().out
+    columns = pd.read_parquet(tmp_path / 'data.parquet').columns
+    assert 'ДЗ: Альфа' in columns and 'ДЗ: Бета' in columns
+
+
+def test_generator_module_delegates_to_cli(tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, os.path.join(root, 'chok_generator.py'), '--freq', 'Q', '--no-cache',
+                             '--formats', 'parquet', '--output-dir', str(tmp_path), '--name', 'data'],
+                            cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert chok_cli.main(['check', str(tmp_path / 'data.parquet')]) == 0
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from chok_generator import generate_dataset
+from chok_validator import validate_dataset
+from date_index import infer_freq
+
+
+@pytest.mark.parametrize('freq', ['D', 'W', 'M', 'Q'])
+def test_generated_dataset_passes(freq):
+    df = generate_dataset(freq)
+    assert infer_freq(df['Дата']) == freq
+    assert validate_dataset(df) == []
+    assert validate_dataset(df, freq=freq) == []
+
+
+def test_weekly_dates_must_be_mondays():
+    df = generate_dataset('W')
+    df.loc[3, 'Дата'] += pd.Timedelta(days=1)
+    assert [issue['check'] for issue in validate_dataset(df, freq='W')] == ['Даты - понедельники']
+
+
+def test_quarterly_dates_must_start_quarters():
+    df = generate_dataset('Q')
+    df.loc[3, 'Дата'] += pd.DateOffset(months=1)
+    assert [issue['check'] for issue in validate_dataset(df, freq='Q')] == ['Даты - месяцы начала кварталов']
+
+
+def test_broken_identity_is_reported():
+    df = generate_dataset('M')
+    df.loc[5, 'ЧОК'] += 1
+    assert [issue['check'] for issue in validate_dataset(df)] == ['ЧОК = Запасы + ДЗ - КЗ']
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from counterparties import counterparty_matrix, random_weights
+
+
+def baseline_columns(total, weights, period, offset=0):
+    """Прежнее построение по столбцам: список по датам для каждого контрагента"""
+    return np.column_stack([
+        [round(value * weight * (1 + 0.1 * np.sin((offset + j) / period)), 2) for j, value in enumerate(total)]
+        for weight in weights
+    ])
+
+
+@pytest.mark.parametrize('period, offset', [(30, 0), (45, 0), (3, 17)])
+def test_matrix_matches_per_column_formula(period, offset):
+    rng = np.random.default_rng(8)
+    total = np.round(rng.uniform(1e6, 2e7, 500), 2)
+    weights = random_weights(10, seed=9)
+    result = counterparty_matrix(total, weights, period, offset)
+    expected = baseline_columns(total, weights, period, offset)
+    assert result.shape == (500, 10)
+    assert np.array_equal(result, expected)
+
+
+def test_weights_are_normalized_and_seeded():
+    weights = random_weights(7, seed=1)
+    assert weights.sum() == pytest.approx(1)
+    assert np.array_equal(weights, random_weights(7, seed=1))
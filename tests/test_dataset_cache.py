@@ -0,0 +1,72 @@
+import os
+import time
+
+import pandas as pd
+
+import dataset_cache
+import excel_export
+
+
+def test_export_key_covers_imported_modules():
+    # Модули, от которых зависит содержимое выгрузки, входят в хэш кода
+    assert {'long_format', 'compact', 'excel_export', 'output_sinks'} <= set(dataset_cache.EXPORT_MODULES)
+
+
+def test_cached_dataset_matches_generation(tmp_path):
+    cache = dataset_cache.DatasetCache(str(tmp_path))
+    first = dataset_cache.cached_generate_dataset(cache, freq='M', seed=7)
+    second = dataset_cache.cached_generate_dataset(cache, freq='M', seed=7)
+    assert first.equals(second)
+    assert len(cache.entries()) == 1
+
+
+def test_entry_larger_than_limit_is_returned(tmp_path):
+    # Запись больше max_bytes не удаляется сразу после сохранения
+    cache = dataset_cache.DatasetCache(str(tmp_path / 'cache'), max_bytes=1000)
+    paths = dataset_cache.cached_export_dataset('big', str(tmp_path / 'out'), formats=('parquet',), cache=cache,
+                                                freq='M', seed=7)
+    assert [os.path.basename(path) for path in paths['parquet']] == ['big.parquet', 'big_long.parquet']
+    assert all(os.path.getsize(path) for path in paths['parquet'])
+    assert len(cache.entries()) == 1
+
+
+def test_export_key_depends_on_engine_only_for_xlsx(tmp_path, monkeypatch):
+    calls = []
+    for engine, writer in list(excel_export._WRITERS.items()):
+        monkeypatch.setitem(excel_export._WRITERS, engine,
+                            lambda specs, path, engine=engine, writer=writer: calls.append(engine) or writer(specs, path))
+    cache = dataset_cache.DatasetCache(str(tmp_path / 'cache'))
+    out = str(tmp_path / 'out')
+    for engine in ('openpyxl', 'xlsxwriter', 'xlsxwriter'):
+        dataset_cache.cached_export_dataset('m', out, formats=('xlsx', 'parquet'), cache=cache, engine=engine,
+                                            freq='M', seed=7)
+    # Каждый движок записывает книгу один раз; parquet общий для движков
+    assert calls == ['openpyxl', 'xlsxwriter']
+    assert len(cache.entries()) == 4
+
+
+def test_export_key_depends_on_dataset_params(tmp_path):
+    cache = dataset_cache.DatasetCache(str(tmp_path / 'cache'))
+    out = str(tmp_path / 'out')
+    for params in ({'seed': 7}, {'seed': 8}, {'seed': 7, 'end_date': '2020-12-31'}, {'seed': 7}):
+        dataset_cache.cached_export_dataset('m', out, formats=('parquet',), cache=cache, freq='M', **params)
+    # По записи набора и parquet на каждый из трех различных наборов
+    assert len(cache.entries()) == 6
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = dataset_cache.DatasetCache(str(tmp_path))
+    keys = [cache.make_key({'seed': seed}) for seed in range(3)]
+    for key in keys:
+        cache.put_dataset(key, pd.DataFrame({'a': range(1000)}))
+    for age, key in zip((300, 200, 100), keys):
+        stamp = time.time() - age
+        os.utime(cache.entry_path(key), (stamp, stamp))
+    # Обращение к самой давней записи делает ее самой свежей
+    assert cache.lookup(keys[0]) is not None
+
+    entry_size = cache.size() // 3
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert cache.lookup(keys[1]) is None
+    assert cache.lookup(keys[0]) is not None and cache.lookup(keys[2]) is not None
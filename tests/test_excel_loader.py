@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from chok_generator import generate_dataset
+from excel_export import LONG_SHEET_NAME, write_workbook
+from excel_loader import check_file, read_columns, read_header
+
+
+def _workbook(tmp_path, df, name='book.xlsx'):
+    path = str(tmp_path / name)
+    write_workbook(df, path, sheet_name='Данные ЧОК помесячно', date_format='mm.yyyy')
+    return path
+
+
+def test_found_columns_and_preview(tmp_path):
+    df = generate_dataset('M', '2015-01-01', '2016-12-31')
+    result = check_file(_workbook(tmp_path, df), preview=3)
+    assert result['error'] is None
+    assert list(result['sheets']) == ['Данные ЧОК помесячно']
+    sheet = result['sheets']['Данные ЧОК помесячно']
+    assert sheet['columns'] == list(df.columns)
+    assert sheet['missing'] == []
+    assert sheet['preview']['ЧОК'] == pytest.approx(df['ЧОК'].iloc[:3].tolist())
+    assert sheet['preview']['Запасы'] == pytest.approx(df['Запасы'].iloc[:3].tolist())
+
+
+def test_missing_columns(tmp_path):
+    df = generate_dataset('M', '2015-01-01', '2015-12-31').drop(columns='ЧОК')
+    result = check_file(_workbook(tmp_path, df), all_sheets=True)
+    assert result['sheets']['Данные ЧОК помесячно']['missing'] == ['ЧОК']
+    assert list(result['sheets']['Данные ЧОК помесячно']['preview']) == ['Запасы']
+    # В длинной таблице нет столбцов широкой
+    assert result['sheets'][LONG_SHEET_NAME]['missing'] == ['Запасы', 'ЧОК']
+
+
+def test_unreadable_file_is_reported(tmp_path):
+    path = tmp_path / 'broken.xlsx'
+    path.write_bytes(b'not a workbook')
+    result = check_file(str(path))
+    assert result['error'] and result['sheets'] == {}
+
+
+def test_selective_read(tmp_path):
+    df = generate_dataset('M', '2015-01-01', '2015-12-31')
+    path = _workbook(tmp_path, df)
+    assert read_header(path)['Данные ЧОК помесячно'] == list(df.columns)
+    columns = read_columns(path, columns=['Дата', 'ЧОК'])
+    assert list(columns.columns) == ['Дата', 'ЧОК']
+    assert columns['ЧОК'].tolist() == pytest.approx(df['ЧОК'].tolist())
+    assert pd.to_datetime(columns['Дата']).tolist() == df['Дата'].tolist()
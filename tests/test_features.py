@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chok_generator import DatasetGenerator, generate_dataset, iter_dataset_chunks, make_date_index
+from features import FeatureBuilder, add_features, build_features, iter_features
+
+
+@pytest.mark.parametrize('freq, chunk_size', [('D', 100), ('D', 7), ('W', 30), ('M', 5), ('Q', 3)])
+def test_chunked_features_match_full_build(freq, chunk_size):
+    full = add_features(generate_dataset(freq, '2015-01-01', '2018-12-31', seed=4), freq)
+    chunks = iter_dataset_chunks(freq, '2015-01-01', '2018-12-31', seed=4, chunk_size=chunk_size)
+    chunked = pd.concat(iter_features(chunks, freq), ignore_index=True)
+    pd.testing.assert_frame_equal(chunked, full, check_dtype=False)
+
+
+def test_builder_state_round_trip():
+    generator = DatasetGenerator('M', seed=6)
+    dates = make_date_index('M', '2015-01-01', '2020-12-31')
+    values = generator.generate_values(dates)
+    expected, _ = build_features(values, dates, generator.columns, 'M')
+
+    builder = FeatureBuilder(generator.columns, 'M')
+    first = builder.update(values[:30], dates[:30])
+    restored = FeatureBuilder.from_state(json.loads(json.dumps(builder.state())))
+    second = restored.update(values[30:], dates[30:])
+    assert np.allclose(np.vstack([first, second]), expected, equal_nan=True)
+
+
+def test_inferred_frequency_and_names():
+    df = generate_dataset('W', '2015-01-01', '2016-12-31')
+    result = add_features(df)
+    builder = FeatureBuilder([c for c in df.columns if c != 'Дата'], 'W')
+    assert list(result.columns) == list(df.columns) + builder.names
+    assert result['ЧОК (лаг 1)'].iloc[1:].equals(df['ЧОК'].iloc[:-1].set_axis(df.index[1:]))
+
+
+def test_dates_must_continue():
+    generator = DatasetGenerator('M')
+    dates = make_date_index('M', '2015-01-01', '2015-12-31')
+    builder = FeatureBuilder(generator.columns, 'M')
+    values = generator.generate_values(dates)
+    builder.update(values, dates)
+    with pytest.raises(ValueError, match='продолжать'):
+        builder.update(values, dates)
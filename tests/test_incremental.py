@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+import pytest
+
+from chok_generator import generate_dataset
+from incremental import append_dataset, create_dataset, state_path
+from long_format import build_long_format
+import streaming
+
+
+def _read(path):
+    if path.endswith('.csv'):
+        return pd.read_csv(path, parse_dates=['Дата'])
+    return pd.read_parquet(path)
+
+
+@pytest.mark.parametrize('freq', ['D', 'W', 'M'])
+def test_append_matches_full_generation(tmp_path, freq):
+    output_dir = str(tmp_path)
+    create_dataset('inc', output_dir, formats=('parquet', 'csv'), chunk_size=50, freq=freq,
+                   start_date='2015-01-01', end_date='2016-06-30', seed=3)
+    _, rows = append_dataset('inc', '2017-03-31', output_dir, chunk_size=40)
+    _, more = append_dataset('inc', '2017-12-31', output_dir)
+
+    full = generate_dataset(freq, '2015-01-01', '2017-12-31', seed=3)
+    assert rows > 0 and more > 0
+    for ext in ('parquet', 'csv'):
+        df = _read(os.path.join(output_dir, 'inc.' + ext))
+        pd.testing.assert_frame_equal(df, full, check_dtype=False)
+        df_long = _read(os.path.join(output_dir, 'inc_long.' + ext))
+        assert len(df_long) == len(build_long_format(full))
+        assert df_long['Сумма'].sum() == pytest.approx(build_long_format(full)['Сумма'].sum())
+
+
+def test_append_without_new_periods(tmp_path):
+    output_dir = str(tmp_path)
+    create_dataset('inc', output_dir, freq='M', start_date='2015-01-01', end_date='2015-12-31')
+    assert append_dataset('inc', '2015-12-31', output_dir) == ({'parquet': []}, 0)
+
+
+def test_append_requires_state(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        append_dataset('missing', '2020-01-01', str(tmp_path))
+    assert not os.path.exists(state_path('missing', str(tmp_path)))
+
+
+def test_append_to_dataset_created_over_empty_range(tmp_path):
+    output_dir = str(tmp_path)
+    # Конец периода раньше первого понедельника: набор создается без строк
+    _, rows = create_dataset('inc', output_dir, formats=('parquet', 'csv'), freq='W',
+                             start_date='2015-01-01', end_date='2015-01-04', seed=3)
+    assert rows == 0
+    append_dataset('inc', '2015-12-31', output_dir)
+    full = generate_dataset('W', '2015-01-01', '2015-12-31', seed=3)
+    for ext in ('parquet', 'csv'):
+        pd.testing.assert_frame_equal(_read(os.path.join(output_dir, 'inc.' + ext)), full, check_dtype=False)
+
+
+def test_interrupted_append_is_rolled_back(tmp_path, monkeypatch):
+    output_dir = str(tmp_path)
+    create_dataset('inc', output_dir, formats=('parquet', 'csv'), chunk_size=50, freq='D',
+                   start_date='2015-01-01', end_date='2015-06-30', seed=3)
+
+    # Вторая часть дописывания падает: первая уже записана, состояние - нет
+    calls = []
+
+    def failing(chunk):
+        calls.append(len(chunk))
+        if len(calls) == 2:
+            raise OSError("диск заполнен")
+        return build_long_format(chunk)
+
+    monkeypatch.setattr(streaming, 'build_long_format', failing)
+    with pytest.raises(OSError):
+        append_dataset('inc', '2015-12-31', output_dir, chunk_size=50)
+    monkeypatch.undo()
+
+    append_dataset('inc', '2015-12-31', output_dir, chunk_size=50)
+    full = generate_dataset('D', '2015-01-01', '2015-12-31', seed=3)
+    for ext in ('parquet', 'csv'):
+        pd.testing.assert_frame_equal(_read(os.path.join(output_dir, 'inc.' + ext)), full, check_dtype=False)
+        assert len(_read(os.path.join(output_dir, 'inc_long.' + ext))) == len(build_long_format(full))
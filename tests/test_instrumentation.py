@@ -0,0 +1,68 @@
+import pytest
+
+import instrumentation
+from instrumentation import span, traced
+
+
+@traced(rows=lambda result: len(result))
+def _make_rows(n):
+    with span('inner', rows=n) as s:
+        s.set(kind='list')
+        return list(range(n))
+
+
+@pytest.fixture
+def profiling():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_spans_nest_and_record_rows(profiling):
+    with span('outer') as outer:
+        _make_rows(4)
+        outer.set(rows=4)
+    spans = {record['name']: record for record in instrumentation.report()['spans']}
+    traced_name = 'test_instrumentation._make_rows'
+    assert list(spans) == ['inner', traced_name, 'outer']
+    assert spans['outer']['depth'] == 0 and spans['outer']['parent'] is None
+    assert spans[traced_name]['depth'] == 1 and spans[traced_name]['parent'] == 'outer'
+    assert spans['inner']['depth'] == 2 and spans['inner']['parent'] == traced_name
+    assert spans['inner']['kind'] == 'list'
+    assert [spans[name]['rows'] for name in spans] == [4, 4, 4]
+    assert spans['outer']['seconds'] >= spans[traced_name]['seconds'] >= spans['inner']['seconds']
+
+
+def test_summary_aggregates_calls(profiling):
+    for n in (2, 3):
+        _make_rows(n)
+    item = instrumentation.summary()['test_instrumentation._make_rows']
+    assert item['calls'] == 2 and item['rows'] == 5
+
+
+def test_errors_are_recorded(profiling):
+    with pytest.raises(KeyError):
+        with span('failing'):
+            raise KeyError('x')
+    assert instrumentation.report()['spans'][-1]['error'] == 'KeyError'
+
+
+def test_nothing_is_recorded_when_disabled():
+    instrumentation.reset()
+    assert not instrumentation.enabled()
+    with span('outer') as s:
+        s.set(rows=1)
+        assert _make_rows(3) == [0, 1, 2]
+    assert instrumentation.report()['spans'] == []
+    assert instrumentation.summary() == {}
+
+
+def test_memory_fields(profiling):
+    instrumentation.enable(memory=True)
+    with span('alloc'):
+        data = bytearray(2 * 1024 ** 2)
+    del data
+    record = instrumentation.report()['spans'][-1]
+    assert record['memory_peak_mb'] >= 1.9
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from chok_generator import generate_dataset
+from compact import compact_frame
+from long_format import LONG_COLUMNS, build_long_format
+
+
+def baseline_long_format(df):
+    """Прежнее построение длинной таблицы: concat по столбцам и сортировка по дате"""
+    frames = []
+    for column in df.columns:
+        if column == 'Дата':
+            continue
+        if column.startswith(('ДЗ:', 'КЗ:')):
+            статья = 'Дебиторская задолженность' if column.startswith('ДЗ:') else 'Кредиторская задолженность'
+            контрагент = column[3:].strip()
+        elif column.endswith(' ИТОГО'):
+            статья, контрагент = column[:-len(' ИТОГО')], 'ИТОГО'
+        else:
+            статья, контрагент = column, 'Н/Д'
+        frames.append(pd.DataFrame({'Дата': df['Дата'], 'Статья': статья, 'Контрагент': контрагент,
+                                    'Сумма': df[column]}))
+    return pd.concat(frames, ignore_index=True).sort_values('Дата')
+
+
+def _sorted(df):
+    df = df.astype({'Статья': str, 'Контрагент': str})
+    return df.sort_values(LONG_COLUMNS[:3], ignore_index=True)
+
+
+@pytest.mark.parametrize('freq', ['D', 'M'])
+def test_matches_baseline_up_to_row_order(freq):
+    df = generate_dataset(freq, '2015-01-01', '2016-12-31', seed=6)
+    result = build_long_format(df)
+    assert list(result.columns) == LONG_COLUMNS
+    pd.testing.assert_frame_equal(_sorted(result), _sorted(baseline_long_format(df)))
+
+
+def test_rows_are_ordered_by_date_then_column():
+    df = generate_dataset('M', '2015-01-01', '2015-03-31')
+    result = build_long_format(df)
+    n_columns = len(df.columns) - 1
+    assert result['Дата'].is_monotonic_increasing
+    assert result['Сумма'].iloc[:n_columns].tolist() == df.iloc[0, 1:].tolist()
+
+
+def test_kopecks_keep_integer_type():
+    df = compact_frame(generate_dataset('M', '2015-01-01', '2015-12-31'), 'kopecks')
+    assert build_long_format(df)['Сумма'].dtype == 'int64'
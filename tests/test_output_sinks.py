@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from chok_generator import FREQUENCY_SETTINGS, generate_dataset
+from chok_validator import load_dataset, validate_dataset
+from excel_export import ENGINES, write_workbook
+from long_format import build_long_format
+from output_sinks import export_dataset, read_columnar
+
+
+@pytest.fixture(scope='module')
+def monthly():
+    return generate_dataset('M', '2015-01-01', '2019-12-31', seed=5)
+
+
+def _assert_same(loaded, expected):
+    # Форматы хранят даты с разной точностью (с, мс, нс) - тип дат не сравнивается
+    pd.testing.assert_frame_equal(loaded.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+@pytest.mark.parametrize('fmt', ['xlsx', 'parquet', 'feather'])
+def test_export_round_trip(tmp_path, monthly, fmt):
+    settings = FREQUENCY_SETTINGS['M']
+    paths = export_dataset(monthly, 'bench', output_dir=str(tmp_path), formats=(fmt,),
+                           sheet_name=settings['sheet_name'], date_format=settings['date_format'])
+    df, df_long = load_dataset(paths[fmt][0])
+    _assert_same(df, monthly)
+    _assert_same(df_long, build_long_format(monthly))
+    assert validate_dataset(df, df_long, freq='M') == []
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_workbook_engines_round_trip(tmp_path, monthly, engine):
+    path = str(tmp_path / f'{engine}.xlsx')
+    write_workbook(monthly, path, engine=engine)
+    df, df_long = load_dataset(path)
+    _assert_same(df, monthly)
+    assert len(df_long) == len(build_long_format(monthly))
+
+
+def test_split_sheets_are_joined_on_load(tmp_path, monthly):
+    path = str(tmp_path / 'split.xlsx')
+    write_workbook(monthly, path, max_rows=25)
+    df, df_long = load_dataset(path)
+    _assert_same(df, monthly)
+    assert validate_dataset(df, df_long, freq='M') == []
+
+
+def test_read_columnar_selects_columns(tmp_path, monthly):
+    paths = export_dataset(monthly, 'bench', output_dir=str(tmp_path), formats=('parquet', 'feather'))
+    for files in paths.values():
+        df = read_columnar(files[0], columns=['Дата', 'ЧОК'])
+        assert list(df.columns) == ['Дата', 'ЧОК']
+        assert df['ЧОК'].equals(monthly['ЧОК'])
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from chok_validator import validate_dataset
+from panel import GROUP_NAME, generate_panel
+
+
+@pytest.fixture(scope='module')
+def panel():
+    return generate_panel(entities=12, segments=3, freq='M', start_date='2015-01-01', end_date='2017-12-31',
+                          seed=9)
+
+
+def _totals(df_long, key):
+    """Итоговые статьи (Контрагент 'ИТОГО' и 'Н/Д') по единице, дате и статье"""
+    rows = df_long[df_long['Контрагент'].isin(['ИТОГО', 'Н/Д'])]
+    return rows.groupby([key, 'Дата', 'Статья', 'Контрагент'], observed=True)['Сумма'].sum()
+
+
+def test_entity_frames_are_valid_datasets(panel):
+    for entity in (0, panel.entities['Юрлицо'].iloc[-1]):
+        assert validate_dataset(panel.entity_frame(entity), freq='M') == []
+
+
+def test_entity_rollup_matches_long_format(panel):
+    rollup = panel.rollup('Юрлицо').sort_values(['Юрлицо', 'Дата', 'Статья', 'Контрагент'], ignore_index=True)
+    long = panel.to_long().sort_values(['Юрлицо', 'Дата', 'Статья', 'Контрагент'], ignore_index=True)
+    assert len(rollup) == len(long)
+    assert np.allclose(rollup['Сумма'], long['Сумма'])
+
+
+@pytest.mark.parametrize('level', ['Сегмент', 'Группа'])
+def test_rollup_is_sum_of_entities(panel, level):
+    long = panel.to_long()
+    if level == 'Сегмент':
+        long[level] = long['Юрлицо'].map(dict(zip(panel.entities['Юрлицо'], panel.entities['Сегмент']))).astype(str)
+    else:
+        long[level] = GROUP_NAME
+    expected = _totals(long, level)
+    result = _totals(panel.rollup(level), level)
+    result.index = result.index.set_levels(result.index.levels[0].astype(str), level=0)
+    assert np.allclose(result.sort_index(), expected.sort_index())
+
+
+def test_elimination_removes_intragroup_balances(panel):
+    group = panel.rollup('Группа', eliminate=True)
+    entities = set(panel.entities['Юрлицо'])
+    assert not set(group['Контрагент'].astype(str)) & entities
+
+    full = panel.rollup('Группа')
+    internal = full[full['Контрагент'].astype(str).isin(entities)]
+    assert len(internal)
+    for article in ('Дебиторская задолженность', 'Кредиторская задолженность'):
+        def total(df):
+            rows = df[(df['Статья'] == article) & (df['Контрагент'] == 'ИТОГО')]
+            return rows.set_index('Дата')['Сумма']
+        removed = internal[internal['Статья'] == article].groupby('Дата')['Сумма'].sum()
+        assert np.allclose(total(full) - total(group), removed.reindex(total(full).index))
+
+
+def test_unknown_level(panel):
+    with pytest.raises(ValueError, match='Неизвестный уровень'):
+        panel.rollup('Холдинг')
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from chok_generator import generate_dataset
+from chok_validator import validate_dataset
+from compact import TOTAL_COLUMNS, compact_frame
+from resample import AGGREGATIONS, resample_dataset
+
+
+@pytest.fixture(scope='module')
+def daily():
+    return generate_dataset('D', '2015-01-01', '2017-12-31')
+
+
+def _identity_error(df):
+    receivables = df[[c for c in df.columns if c.startswith('ДЗ:')]].sum(axis=1)
+    payables = df[[c for c in df.columns if c.startswith('КЗ:')]].sum(axis=1)
+    return max((receivables - df['Дебиторская задолженность ИТОГО']).abs().max(),
+               (payables - df['Кредиторская задолженность ИТОГО']).abs().max(),
+               (df['Материалы'] + df['Готовая продукция'] - df['Запасы']).abs().max(),
+               (df['Запасы'] + df['Дебиторская задолженность ИТОГО'] - df['Кредиторская задолженность ИТОГО']
+                - df['ЧОК']).abs().max())
+
+
+@pytest.mark.parametrize('how', AGGREGATIONS)
+@pytest.mark.parametrize('freq', ['M', 'Q', 'Y'])
+def test_identities_hold(daily, freq, how):
+    df = resample_dataset(daily, freq, how)
+    assert len(df) == {'M': 36, 'Q': 12, 'Y': 3}[freq]
+    assert _identity_error(df) < 1e-6
+    if freq != 'Y':
+        assert validate_dataset(df, freq=freq) == []
+
+
+def test_last_is_end_of_period_row(daily):
+    df = resample_dataset(daily, 'M', 'last')
+    ends = daily.groupby(daily['Дата'].dt.to_period('M')).tail(1)
+    assert np.array_equal(df.drop(columns='Дата').to_numpy(), ends.drop(columns='Дата').to_numpy())
+
+
+def test_mean_is_rounded_to_kopecks(daily):
+    # Итоги пересчитываются из округленных составляющих (суммы float, как в generate_dataset)
+    df = resample_dataset(daily, 'Q', 'mean')
+    values = df[[c for c in df.columns if c not in ('Дата',) + TOTAL_COLUMNS]].to_numpy()
+    assert np.array_equal(values, np.round(values, 2))
+
+
+def test_kopecks_stay_integer(daily):
+    df = resample_dataset(compact_frame(daily), 'M', 'mean')
+    assert df['ЧОК'].dtype == np.int64
+
+
+def test_empty_frame(daily):
+    df = resample_dataset(daily.iloc[:0], 'M', 'mean')
+    assert len(df) == 0 and list(df.columns) == list(daily.columns)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from chok_generator import generate_dataset_values
+from scenarios import random_series_specs, run_scenarios
+
+
+def test_result_does_not_depend_on_workers():
+    specs = [{'series_spec': spec} for spec in random_series_specs(5, seed=1)]
+    serial, columns, dates = run_scenarios(specs, seed=1, n_workers=1, freq='M')
+    parallel, parallel_columns, parallel_dates = run_scenarios(specs, seed=1, n_workers=2, freq='M')
+    assert serial.shape == (5, len(dates), len(columns))
+    assert np.array_equal(serial, parallel)
+    assert columns == parallel_columns and np.array_equal(dates, parallel_dates)
+    # Сценарии различны
+    assert not np.array_equal(serial[0], serial[1])
+
+
+def test_scenario_matches_its_seed_sequence():
+    values, _, _ = run_scenarios(3, seed=4, n_workers=2, freq='Q')
+    expected, _, _ = generate_dataset_values(freq='Q', seed=np.random.SeedSequence(4).spawn(3)[2])
+    assert np.array_equal(values[2], expected)
+
+
+@pytest.mark.parametrize('scenarios', [0, []])
+def test_empty_scenarios_are_rejected(scenarios):
+    with pytest.raises(ValueError, match='хотя бы один сценарий'):
+        run_scenarios(scenarios, n_workers=1)
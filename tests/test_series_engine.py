@@ -0,0 +1,52 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from chok_generator import DEFAULT_SERIES_SPEC, SERIES_ORDER
+from date_index import make_date_index
+from random_state import spawn_generators
+from series_engine import generate_series
+
+PARAMS = {key: [DEFAULT_SERIES_SPEC[name][key] for name in SERIES_ORDER]
+          for key in ('base_value', 'trend_factor', 'seasonal_amplitude', 'noise_level')}
+
+
+def baseline_series(dates, base_value, trend_factor, seasonal_amplitude, noise_level, rng):
+    """Прежний цикл по датам generate_time_series_with_trend_and_seasonality (шум - из rng)"""
+    values = []
+    for date in dates:
+        years_passed = (date - dates[0]).days / 365.25
+        trend = base_value * (1 + trend_factor) ** years_passed
+        day_of_year = date.timetuple().tm_yday
+        seasonality = seasonal_amplitude * np.sin(2 * np.pi * day_of_year / 365.25)
+        noise = rng.normal(0, noise_level * trend)
+        values.append(round(max(0, trend + seasonality * trend + noise), 2))
+    return np.array(values)
+
+
+@pytest.mark.parametrize('freq', ['D', 'W', 'M', 'Q'])
+def test_batch_matches_row_by_row(freq):
+    dates = make_date_index(freq, '2015-01-01', '2020-12-31')
+    batch = generate_series(dates, freq=freq, seed=spawn_generators(11, len(SERIES_ORDER)), **PARAMS)
+    rows = [generate_series(dates, *(PARAMS[key][i] for key in PARAMS), freq=freq, seed=rng)
+            for i, rng in enumerate(spawn_generators(11, len(SERIES_ORDER)))]
+    assert batch.shape == (len(SERIES_ORDER), len(dates))
+    assert np.array_equal(batch, np.stack(rows))
+
+
+def test_daily_series_matches_baseline_loop():
+    dates = make_date_index('D', '2015-01-01', '2018-12-31')
+    for i, (rng, baseline_rng) in enumerate(zip(spawn_generators(3, 4), spawn_generators(3, 4))):
+        params = [PARAMS[key][i] for key in PARAMS]
+        values = generate_series(dates, *params, seed=rng)
+        expected = baseline_series(dates.astype(dt.date).tolist(), *params, rng=baseline_rng)
+        assert np.array_equal(values, expected)
+
+
+def test_chunks_with_origin_match_full_series():
+    dates = make_date_index('D', '2015-01-01', '2016-12-31')
+    full = generate_series(dates, 1e6, 0.1, 0.2, 0.0)
+    head = generate_series(dates[:100], 1e6, 0.1, 0.2, 0.0)
+    tail = generate_series(dates[100:], 1e6, 0.1, 0.2, 0.0, origin=dates[0])
+    assert np.array_equal(np.concatenate([head, tail]), full)
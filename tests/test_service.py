@@ -0,0 +1,84 @@
+import asyncio
+import io
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from chok_generator import generate_dataset
+from excel_export import ENGINES
+from service import CONTENT_TYPES, DatasetService, parse_request, request_key
+
+
+@pytest.fixture(scope='module')
+def server():
+    service = DatasetService(n_workers=2, disk_cache=False)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(service.start('127.0.0.1', 0), loop).result(10)
+    yield service, server.sockets[0].getsockname()[1]
+    server.close()
+    asyncio.run_coroutine_threadsafe(server.wait_closed(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+    loop.close()
+    service.close()
+
+
+def fetch(port, target):
+    """GET с чтением ответа до EOF: зависает, если соединение не закрывается"""
+    with socket.create_connection(('127.0.0.1', port), timeout=20) as sock:
+        sock.sendall(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        data = b''
+        while chunk := sock.recv(65536):
+            data += chunk
+    head, body = data.split(b'\r\n\r\n', 1)
+    lines = head.decode('utf-8').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, body
+
+
+def test_dataset_is_served_and_connection_closed(server):
+    _, port = server
+    status, headers, body = fetch(port, '/dataset?freq=M&format=parquet&seed=11')
+    assert status == 200
+    # parquet хранит даты в мс, поэтому тип столбца 'Дата' не сравнивается
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(body)), generate_dataset('M', seed=11),
+                                  check_dtype=False)
+    status, headers, _ = fetch(port, '/dataset?freq=M&format=parquet&seed=11')
+    assert headers['X-Cache'] == 'hit'
+
+
+def test_concurrent_identical_requests_share_one_generation(server):
+    service, port = server
+    generated = service.stats['generated']
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: fetch(port, '/dataset?freq=D&format=csv&seed=12'), range(8)))
+    assert all(status == 200 for status, _, _ in results)
+    assert len({body for _, _, body in results}) == 1
+    assert [headers['X-Cache'] for _, headers, _ in results].count('miss') == 1
+    assert service.stats['generated'] == generated + 1
+
+
+def test_invalid_parameters(server):
+    _, port = server
+    status, _, body = fetch(port, '/dataset?freq=X')
+    assert status == 400 and 'Неизвестная частота' in body.decode('utf-8')
+    assert fetch(port, '/unknown')[0] == 404
+
+
+def test_engine_is_part_of_the_key_only_for_xlsx():
+    keys = {fmt: {request_key(parse_request(f'format={fmt}&engine={engine}')) for engine in ENGINES}
+            for fmt in CONTENT_TYPES}
+    assert len(keys['parquet']) == len(keys['csv']) == 1
+    assert len(keys['xlsx']) == len(ENGINES)
+
+
+@pytest.mark.parametrize('query', ['debtors=', 'creditors=', 'debtors=,%20,', 'debtors=0'])
+def test_empty_counterparties_are_rejected(server, query):
+    _, port = server
+    status, _, body = fetch(port, '/dataset?' + query)
+    assert status == 400 and 'контрагент' in body.decode('utf-8')
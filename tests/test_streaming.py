@@ -0,0 +1,32 @@
+import os
+
+import pandas as pd
+import pytest
+
+from chok_generator import generate_dataset
+from long_format import build_long_format
+from output_sinks import read_columnar
+from streaming import stream_dataset
+
+
+@pytest.mark.parametrize('chunk_size', [7, 37, 250, None])
+def test_stream_matches_generation(tmp_path, chunk_size):
+    params = {'freq': 'D', 'start_date': '2015-01-01', 'end_date': '2016-06-30', 'seed': 13}
+    paths, rows = stream_dataset('s', str(tmp_path), formats=('csv', 'parquet'), chunk_size=chunk_size, **params)
+    full = generate_dataset(**params)
+    full_long = build_long_format(full)
+    assert rows == len(full)
+
+    csv_wide, csv_long = (pd.read_csv(path, parse_dates=['Дата']) for path in paths['csv'])
+    parquet_wide, parquet_long = (read_columnar(path) for path in paths['parquet'])
+    for wide, long in ((csv_wide, csv_long), (parquet_wide, parquet_long)):
+        pd.testing.assert_frame_equal(wide, full, check_dtype=False)
+        pd.testing.assert_frame_equal(long, full_long, check_dtype=False, check_categorical=False)
+
+
+def test_rewrite_replaces_previous_parts(tmp_path):
+    stream_dataset('s', str(tmp_path), formats=('parquet',), chunk_size=10, freq='M', seed=1)
+    paths, _ = stream_dataset('s', str(tmp_path), formats=('parquet',), chunk_size=60, freq='M', seed=1)
+    assert len(os.listdir(paths['parquet'][0])) == 2
+    pd.testing.assert_frame_equal(read_columnar(paths['parquet'][0]), generate_dataset('M', seed=1),
+                                  check_dtype=False)
@@ -0,0 +1,58 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from working_calendar import RU_CALENDAR, RU_HOLIDAYS, WorkingDayCalendar
+
+
+def baseline_is_holiday_or_weekend(date):
+    """Прежняя проверка по одной дате (dataset.py до векторного календаря)"""
+    if date.weekday() >= 5:
+        return True
+    if (date.day, date.month) in RU_HOLIDAYS:
+        return True
+    for day, month in RU_HOLIDAYS:
+        holiday_date = dt.date(date.year, month, day)
+        if holiday_date.weekday() >= 5:
+            next_workday = holiday_date + dt.timedelta(days=(7 - holiday_date.weekday() + 1))
+            if date == next_workday:
+                return True
+    return False
+
+
+def baseline_working_days(start_date, end_date):
+    days = (start_date + dt.timedelta(days=i) for i in range((end_date - start_date).days + 1))
+    return [day for day in days if not baseline_is_holiday_or_weekend(day)]
+
+
+@pytest.mark.parametrize('start, end', [(dt.date(2024, 1, 1), dt.date(2024, 12, 31)),
+                                        (dt.date(1999, 12, 15), dt.date(2030, 1, 20))])
+def test_working_days_match_baseline_loop(start, end):
+    expected = np.array(baseline_working_days(start, end), dtype='datetime64[D]')
+    assert np.array_equal(WorkingDayCalendar().working_days(start, end), expected)
+
+
+def test_weekend_holidays_are_transferred():
+    # 6 и 7 января 2024 - суббота и воскресенье: перенос на вторник 9 января
+    assert not RU_CALENDAR.is_working_day(dt.date(2024, 1, 9))
+    assert RU_CALENDAR.is_working_day(dt.date(2024, 1, 10))
+    # 4 ноября 2023 - суббота: по упрощенному правилу перенос тоже на вторник
+    assert RU_CALENDAR.is_working_day(dt.date(2023, 11, 6))
+    assert not RU_CALENDAR.is_working_day(dt.date(2023, 11, 7))
+
+
+@pytest.mark.parametrize('date, expected', [
+    (dt.date(2023, 12, 29), dt.date(2024, 1, 10)),  # новогодние каникулы и перенос
+    (dt.date(2024, 1, 9), dt.date(2024, 1, 10)),
+    (dt.date(2024, 12, 31), dt.date(2025, 1, 9)),   # через границу года
+    (dt.date(2021, 5, 10), dt.date(2021, 5, 12)),   # 9 мая - воскресенье, перенос на 11 мая
+    (dt.date(2024, 3, 6), dt.date(2024, 3, 7)),
+])
+def test_next_working_day(date, expected):
+    assert RU_CALENDAR.next_working_day(date) == expected
+    # Совпадает с перебором дней по прежним правилам
+    day = date + dt.timedelta(days=1)
+    while baseline_is_holiday_or_weekend(day):
+        day += dt.timedelta(days=1)
+    assert day == expected
@@ -0,0 +1,125 @@
+import datetime as dt
+import numpy as np
+
+from instrumentation import traced
+
+# Основные российские праздники (день, месяц)
+RU_HOLIDAYS = [
+    # Новогодние каникулы
+    (1, 1), (2, 1), (3, 1), (4, 1), (5, 1), (6, 1), (7, 1), (8, 1),
+    # Рождество
+    (7, 1),
+    # День защитника отечества
+    (23, 2),
+    # Международный женский день
+    (8, 3),
+    # Праздник Весны и Труда
+    (1, 5),
+    # День Победы
+    (9, 5),
+    # День России
+    (12, 6),
+    # День народного единства
+    (4, 11)
+]
+
+
+def _to_day(date):
+    """Приводит дату (dt.date, строку, datetime64, Timestamp) к numpy.datetime64[D]"""
+    if isinstance(date, dt.datetime):
+        date = date.date()
+    return np.datetime64(date, 'D')
+
+
+def _weekday(days):
+    """Номер дня недели (0 - понедельник) для массива datetime64[D]"""
+    # 1970-01-01 - четверг
+    return (days.astype('int64') + 3) % 7
+
+
+class WorkingDayCalendar:
+    """
+    Производственный календарь с предрасчитанными масками рабочих дней по годам
+
+    Маска года строится один раз векторно и кэшируется, поэтому построение
+    индекса рабочих дней за десятилетия и точечные проверки не пересчитывают
+    список праздников для каждой даты.
+
+    Правила совпадают с прежней функцией is_holiday_or_weekend:
+    - суббота и воскресенье - выходные;
+    - праздники из списка holidays - нерабочие дни;
+    - праздник, выпавший на выходной, переносится на день
+      holiday + (8 - weekday) (упрощенная логика переносов).
+    """
+
+    def __init__(self, holidays=None):
+        self.holidays = list(RU_HOLIDAYS if holidays is None else holidays)
+        self._masks = {}
+
+    def year_mask(self, year):
+        """Возвращает булеву маску рабочих дней года (индекс - номер дня в году с 0)"""
+        mask = self._masks.get(year)
+        if mask is None:
+            mask = self._build_year_mask(year)
+            self._masks[year] = mask
+        return mask
+
+    def _build_year_mask(self, year):
+        year_start = np.datetime64(f'{year:04d}-01-01', 'D')
+        days = np.arange(year_start, np.datetime64(f'{year + 1:04d}-01-01', 'D'))
+        mask = _weekday(days) < 5
+
+        holiday_dates = np.array(
+            sorted({np.datetime64(dt.date(year, month, day), 'D') for day, month in self.holidays}),
+            dtype='datetime64[D]'
+        )
+        # Перенос праздников, выпавших на выходные
+        holiday_weekdays = _weekday(holiday_dates)
+        on_weekend = holiday_weekdays >= 5
+        transfers = holiday_dates[on_weekend] + (8 - holiday_weekdays[on_weekend])
+
+        off_days = np.concatenate([holiday_dates, transfers])
+        offsets = (off_days - year_start).astype('int64')
+        mask[offsets[offsets < len(mask)]] = False
+        return mask
+
+    def _range_mask(self, start, end):
+        """Маска рабочих дней и массив дат в интервале [start, end]"""
+        days = np.arange(start, end + 1)
+        if len(days) == 0:
+            return days, np.zeros(0, dtype=bool)
+        first_year = start.astype('datetime64[Y]').astype(int) + 1970
+        last_year = end.astype('datetime64[Y]').astype(int) + 1970
+        mask = np.concatenate([self.year_mask(year) for year in range(first_year, last_year + 1)])
+        offset = (start - np.datetime64(f'{first_year:04d}-01-01', 'D')).astype('int64')
+        return days, mask[offset:offset + len(days)]
+
+    @traced('working_calendar.working_days')
+    def working_days(self, start_date, end_date):
+        """Возвращает массив datetime64[D] рабочих дней между датами включительно"""
+        days, mask = self._range_mask(_to_day(start_date), _to_day(end_date))
+        return days[mask]
+
+    def is_working_day(self, date):
+        """Проверяет, является ли дата рабочим днем"""
+        day = _to_day(date)
+        year = day.astype('datetime64[Y]').astype(int) + 1970
+        offset = (day - np.datetime64(f'{year:04d}-01-01', 'D')).astype('int64')
+        return bool(self.year_mask(year)[offset])
+
+    def next_working_day(self, date):
+        """Возвращает первый рабочий день строго после указанной даты"""
+        day = _to_day(date) + 1
+        while True:
+            year = day.astype('datetime64[Y]').astype(int) + 1970
+            year_start = np.datetime64(f'{year:04d}-01-01', 'D')
+            mask = self.year_mask(year)
+            offset = (day - year_start).astype('int64')
+            found = np.flatnonzero(mask[offset:])
+            if len(found):
+                return (day + found[0]).astype(object)
+            day = np.datetime64(f'{year + 1:04d}-01-01', 'D')
+
+
+# Общий календарь РФ, маски лет накапливаются между вызовами
+RU_CALENDAR = WorkingDayCalendar()